@@ -0,0 +1,89 @@
+"""
+AI 响应分发延迟基准：对比 10 ms 轮询与事件驱动两种分发方式的 请求→应用 延迟
+
+用法: python -m benchmark.bench_ai_dispatch
+"""
+
+import asyncio
+import multiprocessing as mp
+import queue
+import statistics
+import time
+
+from core.kernel import Kernel
+from core.ai_interface import AIRequest, AIResponse
+
+REQUESTS = 300
+VESSELS = 10
+INTERVAL = 0.02  # 请求间隔 (s)，低于旧版轮询周期时旧版会持续积压
+
+
+def echo_service(req_queue, res_queue):
+    """最小 AI 服务：原样回传请求信封"""
+    while True:
+        req = req_queue.get()
+        if req is None:
+            return
+        res_queue.put(AIResponse(req.vessel_id, req.seq, req.deadline, [0, 0, 0, 0]))
+
+
+class _Probe:
+    """记录响应应用时刻的 RockerCore 替身"""
+
+    def __init__(self, sent, latencies):
+        self.sent = sent
+        self.latencies = latencies
+
+    def on_ai_response(self, res):
+        self.latencies.append(time.perf_counter() - self.sent.pop((res.vessel_id, res.seq)))
+
+
+async def legacy_dispatch(kernel):
+    """旧版实现：empty() 轮询 + 10 ms 休眠"""
+    while True:
+        try:
+            if not kernel.ai_res_queue.empty():
+                res = kernel.ai_res_queue.get_nowait()
+                kernel._route_ai_responses([res])
+        except queue.Empty:
+            pass
+        await asyncio.sleep(0.01)
+
+
+async def run_case(dispatcher):
+    req_queue, res_queue = mp.Queue(), mp.Queue()
+    service = mp.Process(target=echo_service, args=(req_queue, res_queue), daemon=True)
+    service.start()
+
+    kernel = Kernel.__new__(Kernel)
+    kernel.ai_res_queue = res_queue
+    sent, latencies = {}, []
+    kernel.vessels = {f"v{i}": _Probe(sent, latencies) for i in range(VESSELS)}
+
+    task = asyncio.create_task(dispatcher(kernel))
+    for n in range(REQUESTS):
+        req = AIRequest(f"v{n % VESSELS}", n, asyncio.get_running_loop().time() + 1.0, {}, time.time() + 1.0)
+        sent[(req.vessel_id, req.seq)] = time.perf_counter()
+        req_queue.put(req)
+        await asyncio.sleep(INTERVAL)
+    while sent:
+        await asyncio.sleep(0.01)
+
+    task.cancel()
+    req_queue.put(None)
+    service.join()
+    return latencies
+
+
+def report(name, latencies):
+    q = statistics.quantiles(latencies, n=100)
+    print(f"{name:<10} p50: {q[49] * 1e3:7.3f} ms   p99: {q[98] * 1e3:7.3f} ms")
+
+
+def main():
+    report("轮询 10ms", asyncio.run(run_case(legacy_dispatch)))
+    report("事件驱动", asyncio.run(run_case(Kernel._dispatch_ai_responses)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+非阻塞 kRPC 基准：在模拟 RPC 往返延迟的离线仿真 (真实时间) 上运行多艘 RockerCore，
+对比 RPC 直接在事件循环线程上执行 (旧版) 与经由连接池 RPC 线程执行时的 tick 延迟
+(从截止时间到 tick 结束，包含被其他飞行器阻塞的等待)。
+场景为高空下降段 (每个 tick 写入自动驾驶方向，2 次 RPC)。
+
+用法: python -m benchmark.bench_async_rpc
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from core.RockerCore import RockerCore
+from core.rpc import RPCPool
+from core.scheduler import RateScheduler
+from core.simkrpc import SimConnection, WallClock, DEFAULT_SCENARIO
+
+RPC_LATENCY = 0.002
+WARMUP = 1.5
+DURATION = 4.0
+CONNECTIONS = 8
+
+
+class _RecordingScheduler(RateScheduler):
+    """固定 10 Hz，并记录每个 tick 从截止时间到结束的延迟"""
+
+    def __init__(self):
+        super().__init__(terminal_rate=10.0, active_rate=10.0, coast_rate=10.0, idle_rate=10.0)
+        self.latencies = []  # (结束时刻, 延迟)
+
+    def update(self, rocker, started, deadline, cost):
+        now = asyncio.get_running_loop().time()
+        self.latencies.append((now, now - deadline))
+        return super().update(rocker, started, deadline, cost)
+
+
+def _scenario(count):
+    base = dict(DEFAULT_SCENARIO[0], altitude=60000.0, vertical_speed=-150.0)
+    return [dict(base, name=f"RSP Booster {i + 1}", altitude=base["altitude"] + 100.0 * i) for i in range(count)]
+
+
+async def run(count, pooled):
+    conn = SimConnection(_scenario(count), WallClock(), step=0.05, rpc_latency=RPC_LATENCY)
+    pool = RPCPool(conn, None, CONNECTIONS) if pooled else None
+    scheduler = _RecordingScheduler()
+    rockers = []
+    for vessel in conn.space_center.vessels:
+        rocker = RockerCore(vessel, conn)
+        rocker.scheduler = scheduler
+        if pool:
+            rocker.rpc = pool.assign()
+        rockers.append(rocker)
+
+    tasks = [asyncio.ensure_future(r.run_auto_logic()) for r in rockers]
+    await asyncio.sleep(WARMUP + DURATION)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if pool:
+        pool.close()
+
+    measured_from = time.monotonic() - DURATION
+    latencies = np.array([d for end, d in scheduler.latencies if end >= measured_from])
+    ticks_per_s = len(latencies) / count / DURATION
+    return np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3, ticks_per_s
+
+
+def main():
+    print(f"模拟 RPC 往返 {RPC_LATENCY * 1e3:.1f} ms，连接池 {CONNECTIONS} 条连接")
+    print(f"{'飞行器':>6} | {'方式':<8} | {'tick p50 (ms)':>13} | {'tick p99 (ms)':>13} | {'每舰 tick/s':>11}")
+    for count in (1, 20):
+        for label, pooled in (("事件循环", False), ("连接池", True)):
+            p50, p99, rate = asyncio.run(run(count, pooled))
+            print(f"{count:>6} | {label:<8} | {p50:>13.2f} | {p99:>13.2f} | {rate:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+飞行器发现基准 (基于离线 kRPC 仿真)：
+1. 碎片密集场景下每次扫描的 RPC 次数：旧版全量分类 vs 增量发现索引
+2. 新分离助推器从出现到被发现的延迟：旧版 2 s 扫描周期 vs 按控制周期扫描
+
+用法: python -m benchmark.bench_discovery
+"""
+
+import random
+
+from core.discovery import VesselIndex
+from core.kernel import Kernel
+from core.simkrpc import SimConnection, DEFAULT_SCENARIO
+
+SCANS = 20
+LEGACY_INTERVAL = 2.0
+BOOSTER = DEFAULT_SCENARIO[0]
+
+
+def _scene(debris):
+    scenario = [BOOSTER] + [
+        dict(name=f"Debris {i + 1}", type="debris", altitude=1000.0 * (i % 50))
+        for i in range(debris)
+    ]
+    return SimConnection(scenario)
+
+
+def legacy_scan(conn, tracked):
+    """复现旧版 _watch_vessels 的一次扫描 (只分类，不创建控制器)"""
+    sc = conn.space_center
+    active_vessel = sc.active_vessel
+    accepted = []
+    for v in sc.vessels:
+        if v.id in tracked:
+            continue
+        is_valid_type = v.type in [sc.VesselType.ship, sc.VesselType.probe,
+                                   sc.VesselType.lander, sc.VesselType.relay]
+        is_target_name = "Booster" in v.name or "Stage" in v.name or "RSP" in v.name
+        if (is_valid_type or is_target_name) and v.orbit.body == active_vessel.orbit.body:
+            accepted.append(v)
+    return accepted
+
+
+def bench_scan():
+    print(f"{'碎片数':>6} | {'旧版 RPC/扫描':>12} | {'索引首次扫描':>12} | {'索引稳态 RPC/扫描':>16}")
+    for debris in (10, 100, 1000):
+        conn = _scene(debris)
+        tracked = {v.id for v in legacy_scan(conn, set())}
+        start = conn.rpc_count
+        for _ in range(SCANS):
+            legacy_scan(conn, tracked)
+        legacy = (conn.rpc_count - start) / SCANS
+
+        conn = _scene(debris)
+        start = conn.rpc_count
+        index = VesselIndex(conn)
+        found = index.scan()
+        first = conn.rpc_count - start
+        assert [v.id for v in found] == sorted(tracked)
+        start = conn.rpc_count
+        for _ in range(SCANS):
+            assert not index.scan()
+        steady = (conn.rpc_count - start) / SCANS
+        index.close()
+        print(f"{debris:>6} | {legacy:>12.1f} | {first:>12} | {steady:>16.1f}")
+
+
+def bench_latency():
+    """在两次扫描之间的随机时刻分离助推器，统计到被扫描发现的延迟"""
+    conn = _scene(100)
+    index = VesselIndex(conn)
+    index.scan()
+    interval = Kernel.discovery_interval
+    rng = random.Random(0)
+    delays = []
+    for i in range(20):
+        phase = rng.random()
+        conn.advance(interval * phase)
+        spawned = conn.spawn(dict(BOOSTER, name=f"RSP Booster {i + 2}"))
+        t0 = conn.sim_time
+        conn.advance(interval * (1 - phase))
+        while spawned not in index.scan():
+            conn.advance(interval)
+        delays.append(conn.sim_time - t0)
+    index.close()
+    print(f"新助推器发现延迟: 旧版 ≤ {LEGACY_INTERVAL:.1f} s (平均约 {LEGACY_INTERVAL / 2:.1f} s), "
+          f"索引按 {interval:.1f} s 扫描 平均 {sum(delays) / len(delays):.3f} s / 最大 {max(delays):.3f} s")
+
+
+def main():
+    bench_scan()
+    bench_latency()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+落点预测基准：RK4 / RK45 单舰预测耗时与精度 (相对小步长 RK4 参考解)、热启动命中耗时、批量预测吞吐
+
+用法: python -m benchmark.bench_impact
+"""
+
+import math
+import time
+
+import numpy as np
+
+from core.impact import ImpactPredictor
+from core.simkrpc import EARTH
+
+ROTATION = 7.2921159e-5
+MASS = 25000.0
+DRAG_AREA = 0.8 * 10.0  # Cd·A (m²)
+REPEAT = 50
+
+
+def density(altitude):
+    return EARTH["rho0"] * math.exp(-altitude / EARTH["scale_height"])
+
+
+def predictor(**kwargs):
+    return ImpactPredictor(
+        EARTH["radius"], EARTH["mu"], ROTATION, density=density,
+        atmosphere_depth=EARTH["atmosphere_depth"], **kwargs,
+    )
+
+
+def _timed(func, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    # 下降中的助推器：高度 25 km，北纬 28.5°，下降 450 m/s，东向 80 m/s
+    state = dict(altitude=25000.0, velocity=(-450.0, 0.0, 80.0), latitude=28.5, longitude=-80.6)
+    reference = predictor(dt=0.01, budget=None).predict_local(**state, mass=MASS, drag_area=DRAG_AREA, warm=False)
+    print(f"参考解 (RK4 dt=0.01): 落地 {reference.time:.2f} s, 速度 {reference.speed:.1f} m/s, "
+          f"偏移 北 {reference.north:.1f} m / 东 {reference.east:.1f} m")
+
+    print(f"{'方法':<16} | {'耗时 (ms)':>9} | {'步数':>5} | {'落点误差 (m)':>12} | {'完成':>4}")
+    for name, kwargs in (
+        ("RK4 dt=0.5", dict(method="rk4", dt=0.5)),
+        ("RK4 dt=1.0", dict(method="rk4", dt=1.0)),
+        ("RK45 rtol=1e-9", dict(method="rk45", dt=1.0)),
+        ("RK45 rtol=1e-7", dict(method="rk45", dt=1.0, rtol=1e-7)),
+    ):
+        p = predictor(**kwargs)
+        result, elapsed = _timed(lambda: p.predict_local(**state, mass=MASS, drag_area=DRAG_AREA, warm=False))
+        error = math.dist(result.position, reference.position)
+        print(f"{name:<16} | {elapsed * 1e3:>9.3f} | {result.steps:>5} | {error:>12.3f} | {str(result.complete):>4}")
+
+    # 热启动：取上一次预测轨迹上 1 s 后的状态再次预测 (无动力滑行时即为此情形)
+    p = predictor()
+    first = p.predict_local(**state, mass=MASS, drag_area=DRAG_AREA, now=0.0)
+    t, s, _ = p._trajectory[2]
+    position, velocity = p._to_body(s, t)
+    result, elapsed = _timed(lambda: p.predict(position, velocity, MASS, DRAG_AREA, now=t))
+    print(f"热启动命中: {elapsed * 1e6:.1f} µs (完整预测 {first.steps} 步), "
+          f"剩余时间 {first.time:.2f} -> {result.time:.2f} s")
+
+    # 批量预测
+    for n in (10, 100, 1000):
+        rng = np.random.default_rng(0)
+        lat = np.radians(rng.uniform(-30, 30, n))
+        alt = rng.uniform(10000, 40000, n)
+        r = EARTH["radius"] + alt
+        positions = np.column_stack([r * np.cos(lat), r * np.sin(lat), np.zeros(n)])
+        up = positions / r[:, None]
+        velocities = up * rng.uniform(-600, -200, n)[:, None]
+        p = predictor(budget=None)
+        result, elapsed = _timed(lambda: p.predict_batch(positions, velocities, MASS, DRAG_AREA), repeat=3)
+        scalar = p.predict(positions[0], velocities[0], MASS, DRAG_AREA, warm=False)
+        error = math.dist(scalar.position, result["position"][0])
+        print(f"批量 RK4 {n:>5} 舰: {elapsed * 1e3:8.2f} ms ({elapsed / n * 1e3:.3f} ms/舰), "
+              f"与标量版本差异 {error:.2e} m, 全部完成: {bool(result['complete'].all())}")
+
+
+if __name__ == "__main__":
+    main()
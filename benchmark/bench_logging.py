@@ -0,0 +1,82 @@
+"""
+日志开销基准：控制周期内一次日志调用的耗时分布。
+比较本进程直接写文件 (FileHandler，每条记录写入并刷新) 与经队列交给日志写入进程 (LogWriter) 两种方式，
+以及限频日志 (LogThrottle) 被抑制时的耗时。
+"连续" 为背靠背调用 (压力场景，后台转发与写入同时争用 CPU)；"间隔" 为每 PACE 秒一次调用、其间忙等模拟控制计算。
+
+用法: python -m benchmark.bench_logging
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utility.log import LogThrottle, LogWriter, _QueueHandler, DEFAULT_FORMAT, DEFAULT_DATE_FMT
+
+CALLS = 20_000
+PACED_CALLS = 4_000
+PACE = 0.0005
+
+
+def _measure(logger, call, calls=CALLS, pace=0.0):
+    """逐次计时 calls 次日志调用 (每次间隔至少 pace 秒)，返回耗时数组 (s)"""
+    samples = np.empty(calls)
+    start = time.perf_counter()
+    for i in range(calls):
+        while time.perf_counter() - start < pace:
+            pass
+        start = time.perf_counter()
+        call(logger, i)
+        samples[i] = time.perf_counter() - start
+    return samples
+
+
+def _info(logger, i):
+    logger.info("着陆点火! Alt: %.0f m, 点火高度: %.0f m", 1000.0 + i, 980.0)
+
+
+def _report(label, samples):
+    print(f"  {label:<28} 均值 {samples.mean() * 1e6:7.2f} µs | p99 {np.percentile(samples, 99) * 1e6:7.2f} µs"
+          f" | 最大 {samples.max() * 1e6:8.1f} µs")
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="rsp_log_bench_")
+    logger = logging.getLogger("Bench")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    print(f"{os.cpu_count()} 个 CPU | 连续 {CALLS} 次 / 间隔 {PACE * 1e3:.1f} ms {PACED_CALLS} 次日志调用")
+
+    # 1. 本进程直接写文件
+    handler = logging.FileHandler(os.path.join(directory, "direct.log"), encoding="utf-8")
+    handler.setFormatter(logging.Formatter(DEFAULT_FORMAT, DEFAULT_DATE_FMT))
+    logger.addHandler(handler)
+    _report("FileHandler 连续", _measure(logger, _info))
+    _report("FileHandler 间隔", _measure(logger, _info, PACED_CALLS, PACE))
+    logger.removeHandler(handler)
+    handler.close()
+
+    # 2. 经队列交给日志写入进程
+    writer = LogWriter(os.path.join(directory, "writer.log"), {})
+    handler = _QueueHandler(writer.queue)
+    logger.addHandler(handler)
+    _report("LogWriter 队列 连续", _measure(logger, _info))
+    time.sleep(1.0)  # 等后台写完积压，避免影响下一组
+    _report("LogWriter 队列 间隔", _measure(logger, _info, PACED_CALLS, PACE))
+
+    # 3. 限频日志：同一键在间隔内被抑制，不创建记录也不格式化
+    throttle = LogThrottle(logger, interval=60.0)
+    _report("LogThrottle (被抑制)", _measure(throttle, lambda t, i: t.debug("tick", "更新 AI 控制指令: %s", i)))
+    logger.handlers.clear()
+    handler.close()
+
+    start = time.perf_counter()
+    writer.close(timeout=10.0)
+    print(f"  写入进程写完剩余记录用时 {time.perf_counter() - start:.2f} s -> {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+轨道计算批量接口基准：标量 OrbitCalc 循环 与 向量化 *_batch 版本的吞吐对比，并校验结果一致性 (1e-12)
+
+用法: python -m benchmark.bench_orbit_batch
+"""
+
+import time
+
+import numpy as np
+
+from core.orbit import OrbitCalc
+
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+SCALAR_LIMIT = 10**5  # 标量循环只测到该规模，更大规模按单次耗时外推
+MU = 3.986004418e14
+TOLERANCE = 1e-12
+
+
+def _inputs(n, rng):
+    r1 = rng.uniform(6.5e6, 7.5e6, n)
+    r2 = rng.uniform(7.5e6, 4.2e7, n)
+    v_vertical = rng.uniform(-600.0, 0.0, n)
+    v_horizontal = rng.uniform(0.0, 200.0, n)
+    thrust = rng.uniform(1e5, 2e6, n)  # 含推重比 < 1 的样本
+    mass = rng.uniform(2e4, 4e4, n)
+    return {
+        "vis_viva": ((r1, r2, MU), lambda r, a, mu: OrbitCalc.vis_viva(r, a, mu)),
+        "hohmann_transfer": ((r1, r2, MU), OrbitCalc.hohmann_transfer),
+        "phase_angle": ((r1, r2, MU), OrbitCalc.phase_angle),
+        "suicide_burn_height": ((v_vertical, v_horizontal, thrust, mass, 9.81), OrbitCalc.suicide_burn_height),
+    }
+
+
+def _scalar(func, args, n):
+    columns = [a.tolist() if isinstance(a, np.ndarray) else [a] * n for a in args]
+    start = time.perf_counter()
+    results = [func(*row) for row in zip(*columns)]
+    return results, time.perf_counter() - start
+
+
+def _max_rel_error(scalar, batch):
+    expected = np.array(scalar, dtype=np.float64)
+    if expected.ndim == 2:  # hohmann_transfer 返回元组
+        expected = expected.T
+        batch = np.array(batch)
+    finite = np.isfinite(expected)
+    if not np.array_equal(finite, np.isfinite(batch)):
+        return np.inf
+    err = np.abs(batch[finite] - expected[finite]) / np.maximum(np.abs(expected[finite]), 1e-300)
+    return float(err.max()) if err.size else 0.0
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'函数':<20} {'规模':>9} | {'标量 次/s':>12} | {'批量 次/s':>12} | {'加速比':>7} | {'最大相对误差':>12}")
+    for n in SIZES:
+        for name, (args, scalar_func) in _inputs(n, rng).items():
+            batch_func = getattr(OrbitCalc, f"{name}_batch")
+
+            start = time.perf_counter()
+            batch = batch_func(*args)
+            batch_rate = n / (time.perf_counter() - start)
+
+            m = min(n, SCALAR_LIMIT)
+            sub = tuple(a[:m] if isinstance(a, np.ndarray) else a for a in args)
+            scalar, elapsed = _scalar(scalar_func, sub, m)
+            scalar_rate = m / elapsed
+
+            sub_batch = tuple(b[:m] for b in batch) if isinstance(batch, tuple) else batch[:m]
+            err = _max_rel_error(scalar, sub_batch)
+            flag = "" if err <= TOLERANCE else "  超出容差!"
+            print(
+                f"{name:<20} {n:>9.0e} | {scalar_rate:>12.3e} | {batch_rate:>12.3e} | "
+                f"{batch_rate / scalar_rate:>6.0f}x | {err:>12.2e}{flag}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+部件扫描 RPC 基准：对比整流罩检测的逐部件扫描与部件索引两种方式 (基于离线 kRPC 仿真)
+1. 不同部件规模下单次整流罩模块扫描 / isFActive 的 RPC 次数
+2. 分级 (部件数量变化) 后索引失效重建
+3. 可展开部件状态查询：逐部件读取 vs 流订阅，以及分级丢失部件后的状态
+
+用法: python -m benchmark.bench_parts
+"""
+
+from core.simkrpc import SimConnection
+from utility import Utils
+
+SCANS = 20
+STAGE = dict(name="RSP Payload Stage", altitude=45000.0, vertical_speed=900.0, horizontal_speed=2000.0,
+             dry_mass=8000.0, fuel_mass=20000.0, max_thrust=9.0e5, isp=348.0,
+             fairings=2, solar_panels=4, antennas=2, legs=4)
+
+
+def _connect(parts):
+    conn = SimConnection([dict(STAGE, structural_parts=parts)])
+    return conn, conn.space_center.vessels[0]
+
+
+def legacy_scan(vessel):
+    """旧版 jettison 的整流罩模块扫描 (不触发事件)"""
+    found = []
+    for part in vessel.parts.all:
+        for module in part.modules:
+            if module.name == "ModuleProceduralFairing":
+                module.events
+                found.append(module)
+    return found
+
+
+def legacy_active(vessel):
+    return any(not f.jettisoned for f in vessel.parts.fairings)
+
+
+def legacy_landed(vessel):
+    """旧版 isLanded：每次重新枚举并逐个读取 deployed"""
+    legs = vessel.parts.legs
+    wheels = vessel.parts.wheels
+    if not legs and not wheels:
+        return False
+    return all(l.deployed for l in legs) and all(w.deployed for w in wheels)
+
+
+def _rpc_per_call(conn, func):
+    start = conn.rpc_count
+    for _ in range(SCANS):
+        func()
+    return (conn.rpc_count - start) / SCANS
+
+
+def bench_scan():
+    print(f"{'部件数':>6} | {'旧版扫描':>8} | {'索引扫描':>8} | {'旧版 isFActive':>14} | {'索引 isFActive':>14}")
+    for parts in (10, 100, 300, 1000):
+        conn, vessel = _connect(parts)
+        utils = Utils(vessel)
+        utils.part_index.check_interval = 0.0  # 每次都检查部件数量 (最坏情况)
+
+        def indexed_scan():
+            return [m.events for m in utils.part_index.modules("ModuleProceduralFairing")]
+
+        assert len(legacy_scan(vessel)) == len(indexed_scan())
+        legacy = _rpc_per_call(conn, lambda: legacy_scan(vessel))
+        indexed = _rpc_per_call(conn, indexed_scan)
+        legacy_f = _rpc_per_call(conn, lambda: legacy_active(vessel))
+        indexed_f = _rpc_per_call(conn, lambda: utils.isFActive)
+        print(f"{len(vessel.parts.all):>6} | {legacy:>8.1f} | {indexed:>8.1f} | {legacy_f:>14.1f} | {indexed_f:>14.1f}")
+
+
+def bench_staging():
+    conn, vessel = _connect(300)
+    utils = Utils(vessel)
+    utils.part_index.check_interval = 0.0
+    before = len(utils.part_index.modules("ModuleProceduralFairing"))
+    generation = utils.part_index.generation
+
+    # 抛掉一个整流罩部件：部件数量变化，索引应当重建
+    fairing = vessel.parts.fairings[0]
+    vessel.parts.remove(fairing.part)
+    after = len(utils.part_index.modules("ModuleProceduralFairing"))
+    print(f"分级后: 重建 {utils.part_index.generation - generation} 次, 整流罩模块 {before} -> {after}")
+
+
+def bench_deployables():
+    conn, vessel = _connect(300)
+    utils = Utils(vessel, conn)
+    legacy = _rpc_per_call(conn, lambda: legacy_landed(vessel))
+    utils.isLanded  # 首次查询：发现部件并注册流
+    streamed = _rpc_per_call(conn, lambda: utils.isLanded)
+    print(f"isLanded: 旧版 {legacy:.1f} RPC/次 -> 流订阅 {streamed:.1f} RPC/次")
+
+    start = conn.rpc_count
+    utils.landSwap()
+    print(f"landSwap: {conn.rpc_count - start} RPC (仅写入), 展开后 isLanded={utils.isLanded}")
+
+    # 分级丢失一条着陆腿：索引重建后注销其状态流，剩余部件仍为已展开
+    utils.part_index.check_interval = 0.0
+    streams = len(conn.streams)
+    vessel.parts.remove(vessel.parts.legs[0].part)
+    landed = utils.isLanded
+    print(f"分级后: 着陆腿 {len(utils.deployables.components('landing'))} 条, isLanded={landed}, "
+          f"部件状态流 {streams} -> {len(conn.streams)}")
+    utils.deployables.close()
+
+
+def main():
+    bench_scan()
+    bench_staging()
+    bench_deployables()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+性能计数开销基准：同一批 RockerCore 在离线仿真上交替以“不计时”和“接入 PerfCounters”运行控制周期，
+比较单个 tick 的平均耗时 (与内核中一样，tick 及其各阶段都被计时)。
+
+用法: python -m benchmark.bench_perf
+"""
+
+import asyncio
+import time
+
+from core.RockerCore import RockerCore
+from core.simkrpc import SimConnection, DEFAULT_SCENARIO
+from utility.perf import PerfCounters
+
+VESSELS = 20
+TICKS = 200
+ROUNDS = 5
+DT = 0.02
+
+
+def _scenario(count):
+    # 高空下降段：测量期间不会着陆，每个 tick 执行的分支一致
+    base = dict(DEFAULT_SCENARIO[0], altitude=60000.0, vertical_speed=-100.0)
+    return [dict(base, name=f"RSP Booster {i + 1}", altitude=base["altitude"] + 50.0 * i) for i in range(count)]
+
+
+async def _run(conn, rockers, ticks):
+    """推进仿真并依次执行每艘飞行器的 tick，返回单个 tick 的平均耗时 (s)"""
+    elapsed = 0.0
+    for _ in range(ticks):
+        conn.advance(DT)
+        for rocker in rockers:
+            start = time.perf_counter()
+            with rocker._stage("tick"):
+                await rocker.tick()
+            elapsed += time.perf_counter() - start
+    return elapsed / (ticks * len(rockers))
+
+
+async def bench():
+    conn = SimConnection(_scenario(VESSELS))
+    rockers = [RockerCore(v, conn) for v in conn.space_center.vessels]
+    perf = PerfCounters()
+    stages = {rocker: perf.stages(rocker) for rocker in rockers}
+    await _run(conn, rockers, 20)  # 预热 (建表等一次性开销)
+
+    results = {"off": [], "on": []}
+    for _ in range(ROUNDS):
+        for mode in ("off", "on"):
+            for rocker in rockers:
+                rocker._stages = stages[rocker] if mode == "on" else None
+            results[mode].append(await _run(conn, rockers, TICKS))
+
+    for rocker in rockers:
+        rocker.telemetry.close()
+        rocker.deployables.close()
+    # 关闭计数时每个阶段只剩一次空 with 语句：单独测量其耗时
+    rocker = rockers[0]
+    rocker._stages = None
+    start = time.perf_counter()
+    for _ in range(100_000):
+        with rocker._stage("tick"):
+            pass
+    results["null_stage"] = [(time.perf_counter() - start) / 100_000]
+    return {mode: min(values) for mode, values in results.items()}, perf
+
+
+def main():
+    results, perf = asyncio.run(bench())
+    off, on = results["off"], results["on"]
+    print(f"{VESSELS} 艘 × {TICKS} tick × {ROUNDS} 轮 (取各轮最小值)")
+    print(f"  不计时:       {off * 1e6:8.1f} µs/tick")
+    print(f"  PerfCounters: {on * 1e6:8.1f} µs/tick  (开销 {(on - off) / off:+.1%}, {(on - off) * 1e6:+.2f} µs)")
+    stages = sum(1 for c in perf.count if c) or 1
+    null = results["null_stage"] * stages
+    print(f"  关闭计数时的空阶段: {results['null_stage'] * 1e9:.0f} ns/阶段 × {stages} 阶段 = "
+          f"{null * 1e6:.2f} µs/tick ({null / off:.1%})")
+
+
+if __name__ == "__main__":
+    main()
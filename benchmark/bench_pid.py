@@ -0,0 +1,50 @@
+"""
+PID 批量更新基准：N 艘飞行器 × M 轴，逐个调用标量 PID 对象与 PIDBank 一次向量化更新的耗时对比。
+
+用法: python -m benchmark.bench_pid
+"""
+
+import time
+
+import numpy as np
+
+from core.ai_interface import PID, PIDBank
+
+AXES = 4
+REPEAT = 200
+GAINS = (1.0, 0.01, 0.5)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{AXES} 轴，每次更新全部飞行器 (平均 {REPEAT} 次)")
+    for vessels in (1, 8, 32, 128):
+        error = rng.uniform(-1, 1, (vessels, AXES))
+        dt = rng.uniform(0.05, 0.2, vessels)
+        phases = ["DESCENT"] * vessels
+
+        pids = [[PID(*GAINS) for _ in range(AXES)] for _ in range(vessels)]
+        error_list, dt_list = error.tolist(), dt.tolist()
+
+        def scalar():
+            for row, axes in enumerate(pids):
+                for axis, pid in enumerate(axes):
+                    pid.update(error_list[row][axis], 0.0, dt_list[row])
+
+        bank = PIDBank(axes=AXES, gains=GAINS, schedule={"DESCENT": {"kp": 1.5}})
+        rows = [bank.row(i) for i in range(vessels)]
+        elapsed_scalar = _timed(scalar)
+        elapsed_bank = _timed(lambda: bank.update(rows, error, dt, phases))
+        print(f"  {vessels:>4} 艘: 标量 PID {elapsed_scalar * 1e6:8.1f} µs | PIDBank {elapsed_bank * 1e6:8.1f} µs"
+              f" ({elapsed_scalar / elapsed_bank:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+转移窗口搜索基准：
+1. 共面圆轨道下 porkchop 最优解与 OrbitCalc 霍曼转移 (Δv / 飞行时间 / 相位角) 对比
+2. 地球 -> 火星 (近似开普勒根数) 网格规模 100² ~ 500²，单进程与进程池耗时对比
+
+用法: python -m benchmark.bench_porkchop
+"""
+
+import math
+import time
+
+import numpy as np
+
+from core.orbit import OrbitCalc
+from core.transfer import KeplerOrbit, TransferPlanner
+
+MU_SUN = 1.32712440018e20
+AU = 1.495978707e11
+DAY = 86400.0
+
+# J2000 附近的近似根数 (平近点角取自同一历元)
+EARTH = KeplerOrbit(a=1.00000261 * AU, e=0.01671123, mu=MU_SUN, inclination=math.radians(-0.00001531),
+                    raan=0.0, arg_periapsis=math.radians(102.93768193), mean_anomaly=math.radians(357.52688))
+MARS = KeplerOrbit(a=1.52371034 * AU, e=0.09339410, mu=MU_SUN, inclination=math.radians(1.84969142),
+                   raan=math.radians(49.55953891), arg_periapsis=math.radians(286.4968315),
+                   mean_anomaly=math.radians(19.39019754))
+
+
+def check_hohmann():
+    r1, r2 = AU, 1.524 * AU
+    dv1, dv2, hohmann_time = OrbitCalc.hohmann_transfer(r1, r2, MU_SUN)
+    phase = OrbitCalc.phase_angle(r1, r2, MU_SUN)
+
+    origin = KeplerOrbit(a=r1, e=0.0, mu=MU_SUN)
+    target = KeplerOrbit(a=r2, e=0.0, mu=MU_SUN, mean_anomaly=phase + 0.3)
+    # 目标超前 phase + 0.3 rad，两者相对角速度决定最优出发时刻
+    planner = TransferPlanner(origin, target, workers=1)
+    result = planner.porkchop(np.linspace(0, 120 * DAY, 481), np.linspace(0.8, 1.2, 401) * hohmann_time)
+
+    t = result.best_departure
+    p1, _ = origin.state(t)
+    p2, _ = target.state(t)
+    departure_phase = math.atan2(p2[1], p2[0]) - math.atan2(p1[1], p1[0])
+    print("共面圆轨道 (1 AU -> 1.524 AU):")
+    print(f"  Δv      porkchop {result.best_dv:9.1f} m/s   霍曼 {dv1 + dv2:9.1f} m/s")
+    print(f"  飞行时间 porkchop {result.best_tof / DAY:9.2f} d     霍曼 {hohmann_time / DAY:9.2f} d")
+    print(f"  相位角   porkchop {math.degrees(departure_phase):9.2f}°      霍曼 {math.degrees(phase):9.2f}°")
+
+
+def bench_grid():
+    # 以 J2000 为零点，搜索 2000-2002 年出发窗口
+    print("地球 -> 火星 porkchop:")
+    for n in (100, 250, 500):
+        deps = np.linspace(0, 800 * DAY, n)
+        tofs = np.linspace(100 * DAY, 400 * DAY, n)
+        timings = {}
+        for label, workers in (("单进程", 1), ("进程池", None)):
+            planner = TransferPlanner(EARTH, MARS, workers=workers, parallel_threshold=0)
+            start = time.perf_counter()
+            result = planner.porkchop(deps, tofs)
+            timings[label] = time.perf_counter() - start
+        print(f"  {n:>3}×{n:<3} 单进程 {timings['单进程']:6.2f} s | 进程池 ({planner.workers} 进程) {timings['进程池']:6.2f} s"
+              f" | 最优 Δv {result.best_dv / 1e3:.2f} km/s, 出发 第 {result.best_departure / DAY:.0f} 天,"
+              f" 飞行 {result.best_tof / DAY:.0f} 天")
+
+
+def main():
+    check_hohmann()
+    bench_grid()
+
+
+if __name__ == "__main__":
+    main()
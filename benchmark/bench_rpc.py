@@ -0,0 +1,120 @@
+"""
+控制周期 RPC 次数基准：对比逐属性直读与流快照两种读取方式 (基于离线 kRPC 仿真)
+
+用法: python -m benchmark.bench_rpc
+"""
+
+import asyncio
+
+from core.RockerCore import RockerCore
+from core.simkrpc import SimConnection, DEFAULT_SCENARIO
+
+TICKS = 50
+DT = 0.1
+BOOSTER = dict(DEFAULT_SCENARIO[0], altitude=15000.0)
+
+
+def _connect():
+    conn = SimConnection([BOOSTER])
+    return conn, conn.space_center.vessels[0]
+
+
+def legacy_tick_reads(vessel):
+    """复现旧版每个控制周期的遥测读取序列 (_update_state / 回收 / 展开 / 着陆)"""
+    # _update_state
+    flight = vessel.flight()
+    alt = flight.mean_altitude
+    vessel.situation
+    vessel.situation
+    flight.vertical_speed
+    flight.vertical_speed
+    # _run_recovery_loop
+    flight = vessel.flight()
+    flight.mean_altitude
+    flight.mean_altitude
+    flight.velocity
+    flight.mean_altitude
+    vessel.orbit.body.surface_gravity
+    vessel.available_thrust
+    flight.vertical_speed
+    flight.horizontal_speed
+    vessel.mass
+    flight.surface_altitude
+    # auto_land
+    flight = vessel.flight(vessel.orbit.body.reference_frame)
+    flight.surface_altitude
+    flight.vertical_speed
+    # auto_deploy
+    flight = vessel.flight()
+    flight.mean_altitude
+    return alt
+
+
+def bench_legacy():
+    conn, vessel = _connect()
+    start = conn.rpc_count
+    for _ in range(TICKS):
+        conn.advance(DT)
+        legacy_tick_reads(vessel)
+    return (conn.rpc_count - start) / TICKS
+
+
+async def bench_snapshot():
+    conn, vessel = _connect()
+    start = conn.rpc_count
+    rocker = RockerCore(vessel, conn)
+    setup = conn.rpc_count - start
+    start = conn.rpc_count
+    for _ in range(TICKS):
+        conn.advance(DT)
+        rocker.snap = rocker.telemetry.snapshot()
+        rocker._update_state()
+    reads = (conn.rpc_count - start) / TICKS
+
+    start = conn.rpc_count
+    for _ in range(TICKS):
+        conn.advance(DT)
+        await rocker.tick()
+    total = (conn.rpc_count - start) / TICKS
+    rocker.telemetry.close()
+    rocker.deployables.close()
+    return setup, reads, total, len(conn.streams)
+
+
+def legacy_push_reads(vessel):
+    """复现旧版 Kernel._stream_telemetry 的逐舰读取"""
+    flight = vessel.flight(vessel.surface_reference_frame)
+    return (flight.mean_altitude, flight.speed, flight.vertical_speed, flight.g_force)
+
+
+def bench_push():
+    """遥测推送每轮的 RPC 次数：旧版重复读取 vs 复用采样阶段发布的快照"""
+    conn, vessel = _connect()
+    start = conn.rpc_count
+    legacy_push_reads(vessel)
+    legacy = conn.rpc_count - start
+
+    rocker = RockerCore(vessel, conn)
+    start = conn.rpc_count
+    sample = rocker.telemetry.latest
+    (sample.mean_altitude, sample.speed, sample.vertical_speed, sample.g_force, sample.seq, sample.age())
+    shared = conn.rpc_count - start
+    rocker.telemetry.close()
+    rocker.deployables.close()
+    return legacy, shared
+
+
+def main():
+    legacy = bench_legacy()
+    setup, reads, total, leaked = asyncio.run(bench_snapshot())
+    print(f"旧版逐属性读取: {legacy:.1f} RPC/周期 (仅遥测读取)")
+    print(f"流快照注册开销: {setup} RPC (一次性)")
+    print(f"流快照遥测读取: {reads:.1f} RPC/周期")
+    print(f"流快照完整周期: {total:.1f} RPC/周期 (含控制写入与部件检查)")
+    print(f"注销后残留流数量: {leaked}")
+    legacy_push, shared_push = bench_push()
+    print(f"遥测推送 (每舰每轮): 旧版 {legacy_push} RPC -> 共享快照 {shared_push} RPC")
+
+
+if __name__ == "__main__":
+    main()
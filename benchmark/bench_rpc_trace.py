@@ -0,0 +1,117 @@
+"""
+kRPC 调用跟踪离线演示：以 RPCTracer 包装仿真连接，让一批 RockerCore 运行若干控制周期，
+输出按远程过程 / 调用点排序的报告，并比较跟踪与不跟踪时单个 tick 的耗时。
+运行前先执行 check() 自检：跟踪得到的调用次数与仿真连接自身的 RPC 计数一致，调用点与 folded 调用栈指向发起调用的源码行。
+
+用法: python -m benchmark.bench_rpc_trace [输出目录]
+      (给出输出目录时同时写出报告与 folded 调用栈文件，可用 flamegraph.pl 等工具生成火焰图)
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import time
+from collections import Counter
+
+from core.RockerCore import RockerCore
+from core.rpctrace import RPCTracer
+from core.simkrpc import SimConnection, DEFAULT_SCENARIO
+
+VESSELS = 10
+TICKS = 200
+DT = 0.02
+
+
+def _scenario(count):
+    # 高空下降段：测量期间不会着陆，每个 tick 执行的分支一致
+    base = dict(DEFAULT_SCENARIO[0], altitude=60000.0, vertical_speed=-100.0)
+    return [dict(base, name=f"RSP Booster {i + 1}", altitude=base["altitude"] + 50.0 * i) for i in range(count)]
+
+
+async def _run(tracer, conn=None, ticks=TICKS):
+    """在 (可能被跟踪的) 仿真连接上运行 ticks 个控制周期，返回单个 tick 的平均耗时 (s)"""
+    if conn is None:
+        connect = tracer.connector(SimConnection) if tracer else SimConnection
+        conn = connect(_scenario(VESSELS))
+    rockers = [RockerCore(v, conn) for v in conn.space_center.vessels]
+    elapsed = 0.0
+    for _ in range(ticks):
+        conn.advance(DT)
+        for rocker in rockers:
+            start = time.perf_counter()
+            await rocker.tick()
+            elapsed += time.perf_counter() - start
+    for rocker in rockers:
+        rocker.telemetry.close()
+        rocker.deployables.close()
+    return elapsed / (ticks * len(rockers))
+
+
+def _probe(conn, reads):
+    """自检用的固定调用序列"""
+    vessel = conn.space_center.vessels[0]
+    flight = vessel.flight()
+    for _ in range(reads):
+        flight.mean_altitude
+    vessel.control.throttle = 0.5
+
+
+def check():
+    """自检：逐过程的调用次数、调用点归属与 folded 调用栈 (失败时抛出 AssertionError)"""
+    reads = 7
+    tracer = RPCTracer()
+    conn = tracer.connector(SimConnection)(_scenario(2))
+    _probe(conn, reads)
+
+    # 逐过程次数
+    assert tracer.procedures.get("SimFlight.mean_altitude", [0])[0] == reads, tracer.procedures
+    assert tracer.procedures.get("SimControl.throttle=", [0])[0] == 1, tracer.procedures
+    assert tracer.procedures.get("SimVessel.flight()", [0])[0] == 1, tracer.procedures
+
+    # 调用点：归属到 _probe 中读取高度的那一行
+    lines, first = inspect.getsourcelines(_probe)
+    line = first + next(i for i, text in enumerate(lines) if "flight.mean_altitude" in text)
+    site = f"{os.path.join('benchmark', 'bench_rpc_trace.py')}:{line} (_probe)"
+    assert tracer.sites.get((site, "SimFlight.mean_altitude"), [0])[0] == reads, sorted(tracer.sites)
+
+    # folded 调用栈：由外向内以 check -> _probe -> 过程结尾，各栈次数之和等于总调用次数
+    folded = {stack: int(n) for stack, n in (row.rsplit(" ", 1) for row in tracer.collapsed().splitlines())}
+    tail = "bench_rpc_trace.py:check;bench_rpc_trace.py:_probe;SimFlight.mean_altitude"
+    assert [n for stack, n in folded.items() if stack.endswith(tail)] == [reads], folded
+    assert sum(folded.values()) == sum(c for c, _ in tracer.procedures.values())
+
+    # 完整控制周期：按远程过程名汇总的次数与仿真连接自身的 RPC 计数一致，且每次调用都归属到仓库内的调用点
+    tracer = RPCTracer()
+    conn = tracer.connector(SimConnection)(_scenario(3))
+    asyncio.run(_run(tracer, conn, ticks=20))
+    traced = Counter()
+    for procedure, (count, _) in tracer.procedures.items():
+        traced[procedure.split(".", 1)[-1].rstrip("()=")] += count
+    assert traced == conn._conn.rpc_calls, (traced, conn._conn.rpc_calls)
+    assert all(site != "?" for site, _ in tracer.sites), sorted(tracer.sites)
+
+
+def main():
+    check()
+    print("自检通过: 调用次数、调用点与 folded 调用栈一致")
+    print()
+    tracer = RPCTracer()
+    plain = asyncio.run(_run(None))
+    traced = asyncio.run(_run(tracer))
+
+    print(tracer.report(limit=15))
+    print()
+    print("== folded 调用栈 (按次数，前 5 行) ==")
+    print("".join(tracer.collapsed().splitlines(keepends=True)[:5]), end="")
+    print()
+    print(f"{VESSELS} 艘 × {TICKS} tick")
+    print(f"  不跟踪: {plain * 1e6:8.1f} µs/tick")
+    print(f"  跟踪:   {traced * 1e6:8.1f} µs/tick  ({(traced - plain) / plain:+.0%})")
+    if len(sys.argv) > 1:
+        for path in tracer.dump(sys.argv[1], "bench"):
+            print(f"  -> {path}")
+
+
+if __name__ == "__main__":
+    main()
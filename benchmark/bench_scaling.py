@@ -0,0 +1,357 @@
+"""
+系统扩展性基准：在离线仿真 (真实时间) 上驱动完整的 Kernel (RockerCore) + AIService + Dashboard，
+按飞行器数量扫描，统计控制周期抖动、每周期 RPC 数、AI 请求→响应延迟分位数、
+遥测帧率以及各进程 CPU / RSS。结果输出为 JSON，便于在不同提交之间比对回归。
+
+用法:
+    python -m benchmark.bench_scaling                                   # 扫描 1, 10, 50, 100, 200 艘
+    python -m benchmark.bench_scaling --counts 1 20 --duration 5 -o new.json
+    python -m benchmark.bench_scaling --compare old.json new.json       # 比对两次结果
+    python -m benchmark.bench_scaling --counts 1 20 --rpc-latency 1 --connections 1   # 模拟 1 ms RPC 往返、单连接
+
+说明: 内核进程的 CPU 包含仿真物理积分 (相当于 KSP 服务端) 的开销。
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from utility import Dashboard, TelemetryRing
+from core.kernel import Kernel
+from core.RockerCore import RockerCore
+from core.ai_service import AIService
+from core.simkrpc import Simulation
+
+COUNTS = (1, 10, 50, 100, 200)
+
+
+def process_usage(pid):
+    """
+    读取进程累计 CPU 时间 (s) 与常驻内存 (MB)。
+    优先使用 psutil；未安装时在 Linux 上读取 /proc，其余平台返回 None。
+    """
+    try:
+        if psutil is not None:
+            proc = psutil.Process(pid)
+            cpu = proc.cpu_times()
+            return cpu.user + cpu.system, proc.memory_info().rss / 2**20
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        return cpu, rss / 1024
+    except Exception:
+        return None
+
+
+class _MeasuredSimulation(Simulation):
+    """保留子进程中创建的仿真连接，以便读取 RPC 计数"""
+
+    conn = None
+
+    def __call__(self, name=None, **kwargs):
+        self.conn = super().__call__(name, **kwargs)
+        return self.conn
+
+
+class TimedRocker(RockerCore):
+    """记录每个控制周期的开始时刻/耗时与 AI 往返延迟的 RockerCore"""
+
+    ticks = []  # (vessel_id, 开始时刻, 耗时)
+    ai_latencies = []
+
+    async def tick(self):
+        start = time.perf_counter()
+        await super().tick()
+        self.ticks.append((self.vessel_id, start, time.perf_counter() - start))
+
+    def on_ai_response(self, res):
+        # deadline = 请求发出时刻 + ai_timeout
+        self.ai_latencies.append(self.now() - (res.deadline - self.ai_timeout))
+        super().on_ai_response(res)
+
+
+class BenchKernel(Kernel):
+    """运行固定时长后回报测量结果的内核"""
+
+    rocker_cls = TimedRocker
+
+    def __init__(self, *args, warmup, duration, results, connections=None, **kwargs):
+        self.warmup = warmup
+        self.duration = duration
+        self.results = results
+        self.rpc_connections = connections
+        super().__init__(*args, **kwargs)
+
+    def _open_recorder(self):
+        return None
+
+    async def _worker_loop(self):
+        worker = asyncio.ensure_future(super()._worker_loop())
+        await asyncio.sleep(self.warmup)
+
+        # 预热结束 (飞行器已全部接管)，开始测量窗口
+        TimedRocker.ticks.clear()
+        TimedRocker.ai_latencies.clear()
+        conn = self.connect.conn
+        rpc_start = conn.rpc_count
+        usage_start = process_usage(os.getpid())
+        start = time.perf_counter()
+        await asyncio.sleep(self.duration)
+        elapsed = time.perf_counter() - start
+
+        self.results.put({
+            "elapsed": elapsed,
+            "tracked": len(self.vessels),
+            "ticks": list(TimedRocker.ticks),
+            "ai_latencies": list(TimedRocker.ai_latencies),
+            "ai_dropped": sum(sum(r.ai_stats.values()) for r in self.vessels.values()),
+            "rpc": conn.rpc_count - rpc_start,
+            "usage": _cpu_rss(usage_start, process_usage(os.getpid()), elapsed),
+            "scheduler": {"load": self.scheduler.load, "vessels": list(self.scheduler.metrics().values())},
+        })
+        worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await worker
+
+
+class CountingDashboard(Dashboard):
+    """统计渲染帧数，画面输出到内存而非终端"""
+
+    def __init__(self, telemetry_ring, cmd_queue):
+        with contextlib.redirect_stdout(io.StringIO()):
+            super().__init__(telemetry_ring, cmd_queue)
+        self.out = io.StringIO()
+        self.frames = 0
+        self.vessels_seen = 0
+
+    def render(self, all_telemetry):
+        self.frames += 1
+        self.vessels_seen = len(all_telemetry)
+        super().render(all_telemetry)
+        self.out.seek(0)
+        self.out.truncate()
+
+
+def _ms(values, q):
+    return round(float(np.percentile(values, q)) * 1e3, 3) if len(values) else None
+
+
+def _tick_stats(ticks):
+    """
+    按飞行器计算周期 (相邻两次开始时刻之差)，汇总全部飞行器的分布。
+    各飞行器的目标频率随飞行阶段不同，抖动按各自周期中位数的偏差计算。
+    """
+    starts = {}
+    durations = []
+    for vid, start, duration in ticks:
+        starts.setdefault(vid, []).append(start)
+        durations.append(duration)
+    diffs = [np.diff(s) for s in starts.values() if len(s) > 1]
+    if not diffs:
+        return {"count": len(ticks)}
+    periods = np.concatenate(diffs)
+    deviations = np.concatenate([np.abs(d - np.median(d)) for d in diffs])
+    return {
+        "count": len(ticks),
+        "period_mean_ms": round(float(periods.mean()) * 1e3, 3),
+        "period_p50_ms": _ms(periods, 50),
+        "period_p99_ms": _ms(periods, 99),
+        "period_max_ms": round(float(periods.max()) * 1e3, 3),
+        "jitter_std_ms": round(float(deviations.std()) * 1e3, 3),
+        "jitter_p99_ms": _ms(deviations, 99),
+        "duration_p50_ms": _ms(durations, 50),
+        "duration_p99_ms": _ms(durations, 99),
+    }
+
+
+def _scheduler_stats(scheduler):
+    """调度器指标：负载、被降频的飞行器数、超期次数与各飞行器的平均抖动/延迟"""
+    vessels = scheduler["vessels"]
+    if not vessels:
+        return {"load": scheduler["load"]}
+    return {
+        "load": round(scheduler["load"], 4),
+        "shed": sum(v["shed"] for v in vessels),
+        "overruns": sum(v["overruns"] for v in vessels),
+        "rates_hz": sorted({round(v["rate"], 2) for v in vessels}),
+        "jitter_p99_ms": _ms([v["jitter"] for v in vessels], 99),
+        "lateness_p99_ms": _ms([v["lateness"] for v in vessels], 99),
+    }
+
+
+def _cpu_rss(before, after, elapsed):
+    if before is None or after is None:
+        return None
+    return {
+        "cpu_percent": round((after[0] - before[0]) / elapsed * 100, 1),
+        "rss_mb": round(after[1], 1),
+    }
+
+
+async def run_case(count, warmup, duration, rpc_latency=0.0, connections=None):
+    """启动三进程系统，运行 warmup + duration 秒并汇总单个飞行器数量下的结果"""
+    ring = TelemetryRing.create(max_vessels=max(count, 1))
+    cmd_queue, ai_req_queue, ai_res_queue, results = mp.Queue(), mp.Queue(), mp.Queue(), mp.Queue()
+    ai_service = AIService(ai_req_queue, ai_res_queue)
+    kernel = BenchKernel(
+        ring, cmd_queue, ai_req_queue, ai_res_queue,
+        connect=_MeasuredSimulation.boosters(count, realtime=True, step=0.05, rpc_latency=rpc_latency),
+        warmup=warmup, duration=duration, results=results, connections=connections,
+    )
+    ui = CountingDashboard(ring, cmd_queue)
+    watcher = asyncio.create_task(ui.watch())
+    # 内核在测量窗口结束后即退出，由其自行采样并随结果回报
+    pids = {"ai_service": ai_service._process.pid, "dashboard": os.getpid()}
+
+    try:
+        await asyncio.sleep(warmup)
+        usage_start = {name: process_usage(pid) for name, pid in pids.items()}
+        frames_start, seq_start, start = ui.frames, ring.seq, time.perf_counter()
+
+        # 等待内核在测量窗口结束时回报结果
+        loop = asyncio.get_running_loop()
+        report = await loop.run_in_executor(None, results.get)
+        elapsed = time.perf_counter() - start
+        usage_end = {name: process_usage(pid) for name, pid in pids.items()}
+        frames, written = ui.frames - frames_start, ring.seq - seq_start
+    finally:
+        watcher.cancel()
+        kernel._process.join(timeout=5)
+        ai_service._process.terminate()
+        ai_service._process.join()
+        ring.close()
+
+    ticks = report["ticks"]
+    return {
+        "vessels": count,
+        "tracked": report["tracked"],
+        "tick": _tick_stats(ticks),
+        "rpc": {
+            "total": report["rpc"],
+            "per_tick": round(report["rpc"] / len(ticks), 2) if ticks else None,
+        },
+        "ai": {
+            "responses": len(report["ai_latencies"]),
+            "dropped": report["ai_dropped"],
+            "latency_p50_ms": _ms(report["ai_latencies"], 50),
+            "latency_p90_ms": _ms(report["ai_latencies"], 90),
+            "latency_p99_ms": _ms(report["ai_latencies"], 99),
+        },
+        "scheduler": _scheduler_stats(report["scheduler"]),
+        "telemetry": {
+            "frames_written_per_s": round(written / elapsed, 2),
+            "frames_rendered_per_s": round(frames / elapsed, 2),
+            "vessels_per_frame": ui.vessels_seen,
+        },
+        "processes": {
+            "kernel": report["usage"],
+            **{name: _cpu_rss(usage_start[name], usage_end[name], elapsed) for name in pids},
+        },
+    }
+
+
+def _meta(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "warmup": args.warmup,
+        "duration": args.duration,
+        "rpc_latency_ms": args.rpc_latency,
+        "connections": args.connections,
+    }
+
+
+def print_summary(result):
+    tick, ai, tel = result["tick"], result["ai"], result["telemetry"]
+    cpu = " ".join(
+        f"{name}={usage['cpu_percent']}%/{usage['rss_mb']}MB"
+        for name, usage in result["processes"].items() if usage
+    )
+    print(
+        f"{result['vessels']:>4} 艘 | 周期 p50 {tick.get('period_p50_ms')} ms  抖动 p99 {tick.get('jitter_p99_ms')} ms"
+        f" | 负载 {result['scheduler']['load']} 降频 {result['scheduler'].get('shed', 0)} 艘"
+        f" | RPC/周期 {result['rpc']['per_tick']} | AI p50/p99 {ai['latency_p50_ms']}/{ai['latency_p99_ms']} ms"
+        f" | 遥测 {tel['frames_written_per_s']} 帧/s | {cpu}",
+        file=sys.stderr,
+    )
+
+
+# 比对时关注的指标 (越小越好)
+COMPARE_KEYS = (
+    ("tick", "jitter_p99_ms"),
+    ("tick", "duration_p99_ms"),
+    ("rpc", "per_tick"),
+    ("ai", "latency_p99_ms"),
+)
+
+
+def compare(old_path, new_path):
+    """按飞行器数量比对两份结果，打印关键指标的变化百分比"""
+    with open(old_path, encoding="utf-8") as f:
+        old = {r["vessels"]: r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {r["vessels"]: r for r in json.load(f)["results"]}
+    for count in sorted(old.keys() & new.keys()):
+        changes = []
+        for section, key in COMPARE_KEYS:
+            a, b = old[count][section].get(key), new[count][section].get(key)
+            if a and b is not None:
+                changes.append(f"{key} {a} -> {b} ({(b - a) / a * 100:+.1f}%)")
+        print(f"{count:>4} 艘 | " + " | ".join(changes))
+
+
+async def main(args):
+    results = []
+    for count in args.counts:
+        result = await run_case(count, args.warmup, args.duration, args.rpc_latency / 1e3, args.connections)
+        print_summary(result)
+        results.append(result)
+
+    output = json.dumps({"meta": _meta(args), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSP 系统扩展性基准")
+    parser.add_argument("--counts", type=int, nargs="+", default=COUNTS, help="飞行器数量扫描点")
+    parser.add_argument("--warmup", type=float, default=2.0, help="预热时长 (s)，不计入统计")
+    parser.add_argument("--duration", type=float, default=10.0, help="每个扫描点的测量时长 (s)")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="模拟的单次 RPC 往返延迟 (ms)")
+    parser.add_argument("--connections", type=int, help="kRPC 连接数 (默认读取 [rpc].connections)")
+    parser.add_argument("-o", "--output", help="结果 JSON 文件 (默认输出到 stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比对两份结果 JSON")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        asyncio.run(main(args))
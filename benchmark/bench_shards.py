@@ -0,0 +1,83 @@
+"""
+分片内核吞吐基准：在真实时间离线仿真上分别以单进程 Kernel 与 N 个分片的 ShardedKernel 控制同一批飞行器，
+由合并后的遥测帧中各飞行器的样本序号增量统计全系统的控制吞吐 (tick/s)。
+飞行器数量足够多时单进程受 GIL 限制 (调度器开始降频)，多核机器上吞吐应随分片数近似线性增长。
+
+用法:
+    python -m benchmark.bench_shards                      # 200 艘，分片数 1, 2, 4
+    python -m benchmark.bench_shards --count 100 --shards 1 2
+
+说明: 每个分片进程各自积分一份完整的仿真世界 (相当于 KSP 服务端)，该开销不随分片数减少。
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+from utility import TelemetryRing
+from core import Kernel, ShardedKernel
+from core.simkrpc import Simulation, DEFAULT_SCENARIO
+
+
+def _scenario(count):
+    # 高空缓慢下降：测量期间全部处于常规下降段 (10 Hz)
+    base = dict(DEFAULT_SCENARIO[0], altitude=60000.0, vertical_speed=-100.0)
+    return [dict(base, name=f"RSP Booster {i + 1}", altitude=base["altitude"] + 50.0 * i) for i in range(count)]
+
+
+def _ticks(ring):
+    """合并遥测帧中各飞行器的样本序号 {vid: seq}"""
+    _, rows = ring.read()
+    if rows is None:
+        return {}
+    return dict(zip(rows["vid"].tolist(), rows["seq"].tolist()))
+
+
+def run_case(count, shards, warmup, duration):
+    ring = TelemetryRing.create(max_vessels=max(count, 64))
+    connect = Simulation(_scenario(count), realtime=True)
+    if shards > 1:
+        kernel = ShardedKernel(ring, mp.Queue(), connect=connect, shards=shards)
+        processes = [kernel._process] + [s._process for s in kernel.shards]
+    else:
+        kernel = Kernel(ring, mp.Queue(), connect=connect)
+        processes = [kernel._process]
+
+    try:
+        time.sleep(warmup)
+        start, t0 = _ticks(ring), time.monotonic()
+        time.sleep(duration)
+        end, t1 = _ticks(ring), time.monotonic()
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.join(timeout=5)
+        if shards > 1:
+            kernel.close()
+        ring.close()
+
+    ticks = sum(seq - start[vid] for vid, seq in end.items() if vid in start)
+    return {"vessels": len(end), "ticks_per_s": ticks / (t1 - t0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="飞行器数量")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4], help="分片数 (1 表示单进程 Kernel)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="预热时长 (s)")
+    parser.add_argument("--duration", type=float, default=5.0, help="测量时长 (s)")
+    args = parser.parse_args()
+
+    print(f"CPU 核数 {os.cpu_count()}，飞行器 {args.count} 艘 (目标 10 Hz，理想吞吐 {args.count * 10} tick/s)")
+    print(f"{'分片':>4} | {'遥测飞行器':>8} | {'tick/s':>8} | {'相对单进程':>8}")
+    baseline = None
+    for shards in args.shards:
+        result = run_case(args.count, shards, args.warmup, args.duration)
+        baseline = baseline or result["ticks_per_s"]
+        print(f"{shards:>4} | {result['vessels']:>10} | {result['ticks_per_s']:>8.0f} | "
+              f"{result['ticks_per_s'] / baseline:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+遥测格式基准：字典 + pickle + Queue 与 结构化记录数组 + 共享内存环形缓冲区 的内存与吞吐对比
+
+用法: python -m benchmark.bench_telemetry_format
+"""
+
+import pickle
+import time
+
+import numpy as np
+
+from utility import TelemetryRing, TELEMETRY_DTYPE
+from utility.telemetry_record import set_record, to_dicts
+
+FRAMES = 2000
+
+
+def _sample(i):
+    return ("Booster-%d" % i, "RECOVERY", "DESCENT", 12000.0 + i, 310.5, -298.2, 1.2, 0.05, 42)
+
+
+def bench_dict(n):
+    """旧版：每帧重建字典并 pickle (Queue.put 的主要开销)"""
+    samples = [_sample(i) for i in range(n)]
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        telemetry = {
+            f"v{i}": {
+                "name": name, "mode": mode, "state": state,
+                "alt": alt, "spd": spd, "v_spd": v_spd, "g": g, "age": age, "seq": seq,
+            }
+            for i, (name, mode, state, alt, spd, v_spd, g, age, seq) in enumerate(samples)
+        }
+        payload = pickle.dumps(telemetry)
+        pickle.loads(payload)
+    elapsed = time.perf_counter() - start
+    return len(payload), FRAMES / elapsed
+
+
+def bench_records(n, ring):
+    """新版：就地填充预分配记录数组并写入共享内存，读端直接映射"""
+    samples = [_sample(i) for i in range(n)]
+    records = np.zeros(n, dtype=TELEMETRY_DTYPE)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for i, sample in enumerate(samples):
+            set_record(records, i, f"v{i}", *sample)
+        ring.write(records)
+        ring.read()
+    elapsed = time.perf_counter() - start
+    return records.nbytes, FRAMES / elapsed
+
+
+def bench_decode(n, ring):
+    """兼容层：记录数组 -> 旧版字典 (Dashboard 使用)"""
+    _, rows = ring.read()
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        to_dicts(rows)
+    return FRAMES / (time.perf_counter() - start)
+
+
+def main():
+    ring = TelemetryRing.create(max_vessels=128)
+    try:
+        print(f"{'飞行器数':>8} | {'字典+pickle 字节':>16} {'帧/s':>10} | {'记录数组 字节':>14} {'帧/s':>10} | {'转字典 帧/s':>12}")
+        for n in (1, 10, 100):
+            d_bytes, d_rate = bench_dict(n)
+            r_bytes, r_rate = bench_records(n, ring)
+            decode_rate = bench_decode(n, ring)
+            print(f"{n:>8} | {d_bytes:>16} {d_rate:>10.0f} | {r_bytes:>14} {r_rate:>10.0f} | {decode_rate:>12.0f}")
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,12 @@
 import asyncio
 import math
 import time
-from utility import Utils, Rlogger
+from utility import Utils, Rlogger, config
+from utility.perf import NO_STAGE
 from .orbit import OrbitCalc
-from .ai_interface import AIController
+from .ai_interface import AIController, AIRequest
+from .telemetry import VesselTelemetry
+from .landing import SuicideBurnTable, landing_throttle
 
 class RockerCore(Utils):
     """
@@ -15,18 +18,57 @@ class RockerCore(Utils):
     每个实例对应一个 kRPC vessel 对象，并维护其自身的控制逻辑。
     """
 
-    def __init__(self, vessel, ai_req_queue=None):
-        super().__init__(vessel)
+    def __init__(self, vessel, conn, ai_req_queue=None, recorder=None):
+        # logger 只查找一次；控制周期内反复出现的日志经 log_throttle 按键限频
+        self.log = Rlogger(f"Rocker-{vessel.name}")
+        super().__init__(vessel, conn, log=self.log)
         self.vessel_id = vessel.id
         self.name = vessel.name
         self.is_active = True
+        self.recorder = recorder # 飞行数据记录器 (可选)
+
+        # 最近一次下发的控制输出 (供记录器/回放比对)
+        self.controls = {"throttle": None, "sas_mode": None, "ap_direction": None}
+
+        # 遥测快照：流只注册一次，每个控制周期共享同一份快照
+        self.telemetry = VesselTelemetry(conn, vessel)
+        self.snap = self.telemetry.snapshot()
         
         # AI 相关
         self.ai = AIController() # 本地 AI 控制器 (兜底)
         self.ai_req_queue = ai_req_queue # 远程 AI 请求队列
         self.ai_control_input = None # 最新收到的 AI 控制指令
         self.last_ai_req_time = 0
+        self.ai_timeout = config.get("ai", {}).get("request_timeout", 1.0) # 请求有效期 (s)
+        self.ai_seq = 0 # 已发出请求的最大序号
+        self.ai_pending = None # 尚未收到响应的请求 (每艘飞行器至多一个在途)
+        self.ai_applied_seq = 0 # 已应用响应的最大序号
+        self.ai_stats = {"stale": 0, "expired": 0} # 被丢弃的响应计数
         
+        # 着陆点火：查找表在下降开始时构建，分级后重建
+        landing_cfg = config.get("landing", {})
+        self.touchdown_speed = landing_cfg.get("touchdown_speed", 2.0) # 接地速度 (m/s)
+        self.burn_table = None
+        self.burn_table_failed = False # 当前级无法建表时退回解析估算，不再反复重试
+        self.burning = False
+
+        # 控制周期：由内核的 RateScheduler 按飞行阶段分配，未接入调度器时固定为 period
+        self.period = 0.1 # 控制周期 (s)
+        self.scheduler = None
+        self._fairing_task = None # 整流罩监测 (跨多个周期等待，独立于控制周期运行)
+
+        # RPC 通道 (RPCLane)：由内核分配，阻塞的 kRPC 调用在通道线程上执行；为 None 时直接调用
+        self.rpc = None
+        self.rpc_wait = 0.0 # 累计等待 RPC 通道的时间 (s)，不计入 tick 的事件循环耗时
+        self.rpc_calls = 0 # 累计阻塞 kRPC 调用次数 (经由 _call)
+        self.control = vessel.control
+        self.auto_pilot = vessel.auto_pilot
+        self._pilot_frame_set = False
+
+        # 性能计数 (PerfCounters)：由内核分配，为 None 时各阶段不计时
+        self.perf = None
+        self._stages = None
+
         # 状态标记
         self.state = "IDLE" 
         self.mission_mode = "DEFAULT" # DEFAULT, RECOVERY, ORBIT
@@ -39,54 +81,162 @@ class RockerCore(Utils):
         name_lower = self.name.lower()
         if "booster" in name_lower or "stage" in name_lower:
             self.mission_mode = "RECOVERY"
-            Rlogger(f"Rocker-{self.name}").info("识别为助推器/回收级，进入回收模式")
+            self.log.info("识别为助推器/回收级，进入回收模式")
         elif "debris" in name_lower:
              self.mission_mode = "DEBRIS"
         else:
             self.mission_mode = "ORBIT" # 默认为入轨级
 
     def on_ai_response(self, res):
-        """处理来自 Kernel 分发的 AI 响应"""
-        # res: {"id": "vid:ts", "action": [...], "duration": ...}
-        action = res.get("action")
-        if action:
-            self.ai_control_input = action
-            # Rlogger(f"Rocker-{self.name}").debug(f"更新 AI 控制指令: {action}")
+        """处理来自 Kernel 分发的 AI 响应 (AIResponse)，丢弃过时或过期的结果"""
+        if self.perf:
+            # 请求的发出时刻 = 截止时间 - 有效期
+            self.perf.record_ai(self.now() - (res.deadline - self.ai_timeout))
+        if self.ai_pending and res.seq >= self.ai_pending.seq:
+            self.ai_pending = None
+
+        if res.seq <= self.ai_applied_seq:
+            # 已有更新的指令被应用
+            self.ai_stats["stale"] += 1
+            return
+        if res.expired(self.now()):
+            self.ai_stats["expired"] += 1
+            return
+
+        self.ai_applied_seq = res.seq
+        if res.action is not None:
+            self.ai_control_input = res.action
+            self.log_throttle.debug("ai_action", "更新 AI 控制指令: %s", res.action)
 
     async def run_auto_logic(self):
         """
         每枚火箭独立的自动化逻辑：采用异步并发监测
         """
-        Rlogger(f"Rocker-{self.name}").info(f"启动自动控制逻辑 (模式: {self.mission_mode})...")
+        self.log.info("启动自动控制逻辑 (模式: %s)...", self.mission_mode)
+        loop = asyncio.get_running_loop()
+        # 限频、AI 请求有效期与部件检查均按事件循环时钟计时 (离线仿真时为虚拟时间，结果与宿主机速度无关)
+        self.clock = loop.time
+        deadline = loop.time()
+        if self.perf:
+            self._stages = self.perf.stages(self)
+        if self.mission_mode != "DEBRIS":
+            # 整流罩监测会持续等待抛离条件，放到独立任务中，避免阻塞控制周期
+            self._fairing_task = asyncio.ensure_future(self.jettison())
         try:
             while self.is_active:
-                # 0. 状态更新
-                self._update_state()
+                started = loop.time()
+                cost_start, wait_start = time.perf_counter(), self.rpc_wait
+                with self._stage("tick"):
+                    await self.tick()
+                # 事件循环耗时：扣除等待 RPC 线程的时间 (等待期间事件循环在运行其他飞行器)
+                cost = max(time.perf_counter() - cost_start - (self.rpc_wait - wait_start), 0.0)
+                if self.scheduler:
+                    self.period = self.scheduler.update(self, started, deadline, cost)
 
-                # 1. 核心任务逻辑
-                if self.mission_mode == "RECOVERY":
-                    await self._run_recovery_loop()
-                else:
-                    await self._run_default_loop()
-                
-                # 2. 通用辅助逻辑 (整流罩/展开)
-                if self.mission_mode != "DEBRIS":
-                    await self.jettison()
-                    await self.auto_deploy()
-
-                await asyncio.sleep(0.1) # 提高控制频率
+                # 截止时间调度：下一截止时间从本周期截止时间起算，tick 耗时不累积为漂移；
+                # 已落后超过一个周期时从当前时刻重新起算，不补发积压的周期
+                deadline = max(deadline + self.period, loop.time())
+                await asyncio.sleep(deadline - loop.time())
         except Exception as e:
-            Rlogger(f"Rocker-{self.name}").error(f"控制逻辑异常: {e}")
+            self.log.error("控制逻辑异常: %s", e)
             self.is_active = False
+        finally:
+            if self._fairing_task:
+                self._fairing_task.cancel()
+            if self.scheduler:
+                self.scheduler.remove(self.vessel_id)
+            self.telemetry.close()
+            self.deployables.close()
+
+    async def tick(self):
+        """执行单个控制周期"""
+        await self.decide()
+
+        # 2. 通用辅助逻辑 (展开；整流罩由独立任务监测)
+        if self.mission_mode != "DEBRIS":
+            with self._stage("deploy"):
+                await self.auto_deploy()
+
+        # 3. 记录本周期的样本与控制输出
+        if self.recorder:
+            with self._stage("record"):
+                self.recorder.record(self)
+
+    async def decide(self):
+        """核心决策：刷新快照、更新状态并执行任务逻辑 (回放时单独驱动)"""
+        # 0. 刷新快照并更新状态
+        with self._stage("update_state"):
+            self.snap = self.telemetry.snapshot()
+            self._update_state()
+
+        # 1. 核心任务逻辑
+        if self.mission_mode == "RECOVERY":
+            with self._stage("recovery"):
+                await self._run_recovery_loop()
+        else:
+            with self._stage("default"):
+                await self._run_default_loop()
+
+    def _stage(self, name):
+        """覆盖 Utils：接入内核的性能计数后返回该阶段的计时器"""
+        stages = self._stages
+        return stages[name] if stages is not None else NO_STAGE
+
+    async def _call(self, func, *args):
+        """覆盖 Utils：阻塞的 kRPC 调用交给本舰的 RPC 通道线程执行"""
+        self.rpc_calls += 1
+        if self.rpc is None:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return await self.rpc.call(func, *args)
+        finally:
+            self.rpc_wait += time.perf_counter() - start
+
+    async def _set_throttle(self, value):
+        """下发油门并记录 (与上次下发值相同时不再写入)"""
+        if self.controls["throttle"] != value:
+            await self._call(setattr, self.control, "throttle", value)
+        self.controls["throttle"] = value
+
+    async def _set_direction(self, direction):
+        """接管自动驾驶并指向目标方向"""
+        await self._call(self._write_direction, direction)
+        self.controls["ap_direction"] = direction
+
+    def _write_direction(self, direction):
+        pilot = self.auto_pilot
+        if not self._pilot_frame_set:
+            # 目标方向由天体参考系下的速度得出：自动驾驶按同一参考系解释 (默认为地表参考系)
+            pilot.reference_frame = self.telemetry.reference_frame
+            self._pilot_frame_set = True
+        pilot.engage()
+        pilot.target_direction = direction
+
+    async def _set_sas_mode(self, mode):
+        """开启 SAS 并切换到指定模式 (如 "retrograde")，已处于该模式时不再写入"""
+        if self.controls["sas_mode"] != mode:
+            await self._call(self._write_sas_mode, mode)
+        self.controls["sas_mode"] = mode
+
+    def _write_sas_mode(self, mode):
+        control = self.control
+        control.sas = True
+        control.sas_mode = getattr(control.sas_mode, mode)
+
+    def _flight(self):
+        """覆盖 Utils 的飞行数据来源：读取本地流缓存而非发起 RPC"""
+        return self.telemetry.snapshot()
 
     def _update_state(self):
         """更新当前飞行状态"""
-        flight = self.vessel.flight()
+        flight = self.snap
         alt = flight.mean_altitude
-        
-        if self.vessel.situation == self.vessel.situation.landed:
+        situation = flight.situation.name
+
+        if situation == "landed":
             self.state = "LANDED"
-        elif self.vessel.situation == self.vessel.situation.splashed:
+        elif situation == "splashed":
             self.state = "SPLASHED"
         elif alt > 140000:
             self.state = "SPACE"
@@ -97,7 +247,7 @@ class RockerCore(Utils):
 
     async def _request_ai_update(self, flight):
         """发送 AI 请求"""
-        now = time.time()
+        now = self.now()
         # 限制请求频率，例如每 0.5 秒一次
         if now - self.last_ai_req_time < 0.5:
             return
@@ -106,13 +256,24 @@ class RockerCore(Utils):
             'altitude': flight.mean_altitude,
             'vertical_speed': flight.vertical_speed,
             'horizontal_speed': flight.horizontal_speed,
-            'mass': self.vessel.mass,
-            'mode': self.mission_mode
+            'mass': flight.mass,
+            'mode': self.mission_mode,
+            'phase': self.state,  # 飞行阶段 (PID 增益调度)
         }
 
         if self.ai_req_queue:
-            req_id = f"{self.vessel_id}:{now}"
-            self.ai_req_queue.put({"id": req_id, "state": state})
+            # 仅保留最新请求：上一个请求仍在有效期内时不再追加，避免 AI 积压
+            if self.ai_pending and not self.ai_pending.expired(now):
+                return
+            self.ai_seq += 1
+            self.ai_pending = AIRequest(
+                vessel_id=self.vessel_id,
+                seq=self.ai_seq,
+                deadline=now + self.ai_timeout,
+                state=state,
+                expires=time.time() + self.ai_timeout,
+            )
+            self.ai_req_queue.put(self.ai_pending)
         else:
             # 本地计算
             self.ai_control_input = self.ai.predict(state)
@@ -121,12 +282,12 @@ class RockerCore(Utils):
 
     async def _run_recovery_loop(self):
         """助推器回收逻辑"""
-        flight = self.vessel.flight()
+        flight = self.snap
         
         if self.state in ["LANDED", "SPLASHED"]:
             if self.is_active:
-                Rlogger(f"Rocker-{self.name}").info("回收成功: 已着陆/溅落")
-                self.vessel.control.throttle = 0
+                self.log.info("回收成功: 已着陆/溅落")
+                await self._set_throttle(0)
                 self.is_active = False 
             return
 
@@ -144,49 +305,75 @@ class RockerCore(Utils):
             try:
                 # 仅在大气层外或高空使用 RCS/SAS
                 if flight.mean_altitude > 30000:
-                    self.vessel.auto_pilot.engage()
                     # 简化的逆行向量
-                    self.vessel.auto_pilot.target_direction = tuple(-x for x in flight.velocity)
+                    await self._set_direction(tuple(-x for x in flight.velocity))
                 elif flight.mean_altitude < 30000:
                      # 大气层内主要靠气动稳定 (Grid fins)
                      # 如果有 SAS，设置为 Retrograde
                      try:
-                         self.vessel.control.sas = True
-                         self.vessel.control.sas_mode = self.vessel.control.sas_mode.retrograde
+                         await self._set_sas_mode("retrograde")
                      except:
                          pass
             except:
                 pass
 
-            # 4. 自杀燃烧计算 (最高优先级，覆盖 AI 油门)
-            if flight.mean_altitude < 20000: 
-                surface_gravity = self.vessel.orbit.body.surface_gravity
-                available_thrust = self.vessel.available_thrust
-                # 考虑大气阻力影响，available_thrust 在 RSS 中随高度变化
-                # 这里取当前推力 (如果引擎开启) 或最大推力
-                
-                burn_height = OrbitCalc.suicide_burn_height(
-                    flight.vertical_speed, 
-                    flight.horizontal_speed, 
-                    available_thrust, 
-                    self.vessel.mass, 
-                    surface_gravity
-                )
-                
+            # 4. 自杀燃烧计算 (最高优先级，覆盖 AI 油门)；查找表只在点火判定高度以下构建/查询
+            if flight.mean_altitude < 20000:
+                with self._stage("burn_table"):
+                    table = await self._burn_table(flight)
+                if table:
+                    burn_height = table.burn_height(flight)
+                else:
+                    burn_height = OrbitCalc.suicide_burn_height(
+                        flight.vertical_speed,
+                        flight.horizontal_speed,
+                        flight.available_thrust,
+                        flight.mass,
+                        flight.surface_gravity
+                    )
+
                 radar_alt = flight.surface_altitude
-                
-                # 简单的开关控制 (Bang-Bang Control)
-                if radar_alt < burn_height * 1.1:
-                    self.vessel.control.throttle = 1.0
-                    if radar_alt < burn_height * 1.05:
-                         Rlogger(f"Rocker-{self.name}").debug(f"着陆点火! Alt: {radar_alt:.0f}")
+
+                # 预留一个控制周期的下落量：等到下一周期再点火就来不及时立即点火
+                # (点火高度为 inf 表示按当前速度推进剂不足以刹停，此时先依靠气动减速)
+                if (not self.burning and math.isfinite(burn_height)
+                        and radar_alt + flight.vertical_speed * self.period <= burn_height):
+                    self.burning = True
+                    self.log.info("着陆点火! Alt: %.0f m, 点火高度: %.0f m", radar_alt, burn_height)
+
+                # 点火后按剩余高度调节油门，落地前收敛到接地速度
+                if self.burning:
+                    await self._set_throttle(landing_throttle(flight, self.touchdown_speed))
                 else:
-                    # 在着陆点火前保持低推力或关闭
-                    # 如果 AI 建议了油门，使用 AI 的，否则 0
-                    self.vessel.control.throttle = 0.0
-            
+                    await self._set_throttle(0.0)
+
             # 5. 自动展开着陆腿
-            await self.auto_land()
+            with self._stage("land"):
+                await self.auto_land()
+
+    async def _burn_table(self, flight):
+        """
+        获取当前级的点火高度查找表：首次降至点火判定高度以下时构建 (速度轴覆盖预测的峰值下降速度)，
+        分级 (推力/质量不再匹配) 后重建
+        """
+        table = self.burn_table
+        if table is not None and not table.stale(flight):
+            return table
+        if table is None and self.burn_table_failed:
+            return None
+        try:
+            # 建表需读取发动机参数 (RPC) 并积分数十毫秒，交给 RPC 通道线程执行
+            self.burn_table = await self._call(SuicideBurnTable.for_vessel, self.vessel, flight)
+            self.burn_table_failed = False
+            self.log.info(
+                "着陆点火查找表已就绪: 下降速度 ≤ %.0f m/s, 质量 %.0f-%.0f kg",
+                self.burn_table.max_speed, *self.burn_table.mass_range,
+            )
+        except Exception as e:
+            self.log.warning("着陆点火查找表构建失败，使用解析估算: %s", e)
+            self.burn_table = None
+            self.burn_table_failed = True
+        return self.burn_table
 
     async def _run_default_loop(self):
         """默认/入轨逻辑"""
@@ -194,12 +381,13 @@ class RockerCore(Utils):
 
     async def auto_deploy(self):
         """自动展开载荷 (太阳能/天线)"""
-        flight = self.vessel.flight()
-        if flight.mean_altitude > 70000 and not self.isDeployed:
-             self.deploySwap() 
+        flight = self.snap
+        if flight.mean_altitude > 70000 and not await self._call(self._payload_deployed):
+             await self._call(self.deploySwap)
 
     async def auto_land(self):
         """自动展开着陆架"""
-        flight = self.vessel.flight(self.vessel.orbit.body.reference_frame)
-        if flight.surface_altitude < 2000 and flight.vertical_speed < -1 and not self.isLanded:
-             self.landSwap() 
+        # 快照的速度字段取自天体参考系 (与原先的 vessel.flight(body.reference_frame) 读取一致)
+        flight = self.snap
+        if flight.surface_altitude < 2000 and flight.vertical_speed < -1 and not await self._call(self._gear_deployed):
+             await self._call(self.landSwap)
@@ -1,3 +1,4 @@
 from .kernel import Kernel
+from .shard import ShardedKernel
 
-__all__ = ["Kernel"]
+__all__ = ["Kernel", "ShardedKernel"]
@@ -1,14 +1,68 @@
 """
 AI 智能控制接口模块
 """
+import math
+import time
+from dataclasses import dataclass
 import numpy as np
-from utility import Rlogger
+from utility import Rlogger, config
+
+
+@dataclass(frozen=True, slots=True)
+class AIRequest:
+    """
+    AI 请求信封 (Kernel -> AIService)
+    seq 为每艘飞行器单调递增的序号，deadline 为内核事件循环时钟的时刻 (离线仿真时为虚拟时间)，过期后结果不再有意义；
+    AI 服务进程读不到内核的时钟，按 expires (time.time() 时间戳) 丢弃在队列中等待过久的请求
+    """
+    vessel_id: object
+    seq: int
+    deadline: float
+    state: dict
+    expires: float = math.inf
+
+    def expired(self, now) -> bool:
+        """now 为内核事件循环时钟的当前时刻"""
+        return now > self.deadline
+
+
+@dataclass(frozen=True, slots=True)
+class AIResponse:
+    """
+    AI 响应信封 (AIService -> Kernel)
+    batch_size / batch_latency / dropped 用于观察与调优微批窗口
+    (duration 为推理耗时；batch_latency 从该批首个请求到达算起，到推理完成为止，不含服务空闲等待)
+    """
+    vessel_id: object
+    seq: int
+    deadline: float
+    action: object
+    duration: float = 0.0
+    batch_size: int = 1
+    batch_latency: float = 0.0
+    dropped: int = 0
+
+    def expired(self, now) -> bool:
+        """now 为内核事件循环时钟的当前时刻 (deadline 沿用请求的 deadline)"""
+        return now > self.deadline
+
+
+@dataclass(frozen=True, slots=True)
+class AIRelease:
+    """飞行器控制结束通知 (Kernel -> AIService)：释放该飞行器在 AI 服务中的控制器状态"""
+    vessel_id: object
+
 
 class AIController:
     """
     AI 控制器接口
     支持接入外部深度学习模型 (PyTorch/TensorFlow) 或使用经典控制算法 (PID)
     """
+    # 状态字典打包为特征矩阵时的列顺序
+    FEATURES = ('altitude', 'vertical_speed', 'horizontal_speed', 'mass', 'error', 'dt')
+    # 缺省值 (未给出 dt 时为 NaN：由 PIDBank 按该飞行器上次更新至今的时间计算)
+    DEFAULTS = {'dt': math.nan}
+
     def __init__(self, model_path=None):
         self.model = None
         self.use_deep_learning = False
@@ -23,53 +77,206 @@ class AIController:
             except Exception as e:
                 Rlogger("AI").error(f"AI 模型加载失败，回退到经典控制算法: {e}")
 
-        # PID 控制器状态
-        self.pid_state = {
-            'integral': 0,
-            'prev_error': 0
-        }
+        # PID 控制器状态：每艘飞行器一行 (按 vessel_id 分配)，积分/微分互不干扰
+        self.pid = PIDBank()
 
-    def predict(self, state):
+    def predict(self, state, key=None):
         """
         根据当前状态预测控制输入
         state: 包含飞行数据的字典或向量 (e.g., [alt, vel, pitch, ...])
+        key: 控制器状态所属的飞行器 (本地单艘使用时可省略)
         返回: control_input (e.g., [throttle, pitch, yaw, roll])
         """
+        return self.predict_batch([state], [key])[0]
+
+    def predict_batch(self, states, keys=None):
+        """
+        批量预测：将多个状态字典打包为一个特征矩阵，执行一次向量化推理
+        keys: 与 states 一一对应的飞行器标识 (同一批内不重复)，只有单个状态时可省略
+        返回: 与 states 顺序一致的控制输入列表
+        """
+        features = self.pack(states)
         if self.use_deep_learning and self.model:
-            return self._predict_dl(state)
+            return self._predict_dl(features).tolist()
         else:
-            return self._predict_classic(state)
+            if keys is None:
+                if len(states) > 1:
+                    raise ValueError("批量预测需为每个状态给出飞行器标识 (keys)")
+                keys = [None] * len(states)
+            elif len(set(keys)) != len(keys):
+                raise ValueError("同一批内的飞行器标识 (keys) 不能重复")
+            rows = [self.pid.row(key) for key in keys]
+            phases = [state.get('phase') for state in states]
+            return self._predict_classic(features, rows, phases).tolist()
 
-    def _predict_dl(self, state):
-        """深度学习模型预测"""
-        # tensor_state = torch.tensor(state)
+    def release(self, key):
+        """飞行器控制结束：释放其控制器状态"""
+        self.pid.release(key)
+
+    @classmethod
+    def pack(cls, states):
+        """状态字典列表 -> (N, len(FEATURES)) float64 矩阵"""
+        features = np.empty((len(states), len(cls.FEATURES)), dtype=np.float64)
+        for row, state in enumerate(states):
+            for col, key in enumerate(cls.FEATURES):
+                features[row, col] = state.get(key, cls.DEFAULTS.get(key, 0))
+        return features
+
+    def _predict_dl(self, features):
+        """深度学习模型预测 (批量)"""
+        # tensor_state = torch.from_numpy(features)
         # return self.model(tensor_state).detach().numpy()
-        return [0, 0, 0, 0] # 占位
+        return np.zeros((len(features), 4)) # 占位
 
-    def _predict_classic(self, state):
+    def _predict_classic(self, features, rows, phases):
         """
-        经典控制算法 (PID / 状态机逻辑)
-        这里作为一个简单的示例，实际应根据任务阶段调用不同的 PID 参数
+        经典控制算法 (PID / 状态机逻辑)：每行使用所属飞行器的 PID 状态，按飞行阶段调度增益，一次向量化求解。
         """
         # 假设 state 包含目标误差
-        target_error = state.get('error', 0)
-        dt = state.get('dt', 0.1)
-        
-        # 简单的 PID 计算
-        kp = 1.0
-        ki = 0.1
-        kd = 0.05
-        
-        self.pid_state['integral'] += target_error * dt
-        derivative = (target_error - self.pid_state['prev_error']) / dt
-        
-        output = (kp * target_error) + (ki * self.pid_state['integral']) + (kd * derivative)
-        
-        self.pid_state['prev_error'] = target_error
-        
-        # 限制输出范围
-        output = max(min(output, 1.0), -1.0)
-        
+        target_error = features[:, self.FEATURES.index('error')]
+        dt = features[:, self.FEATURES.index('dt')]
+        # 输出已在 PIDBank 中限幅
+        return self.pid.update(rows, target_error[:, None], dt, phases)[:, 0]
+
+
+class PIDBank:
+    """
+    多飞行器 × 多轴的 PID 控制器组：增益、积分与前一误差存放在 (行, 轴) NumPy 数组中，
+    一次 update 向量化更新任意多行 (每行有自己的 dt)。
+    - 行按 key (vessel_id) 分配、释放后复用，容量不足时翻倍扩容
+    - 增益按飞行阶段调度：阶段变化的行从调度表载入该阶段的增益，未配置的阶段使用默认增益
+    - 抗积分饱和：积分限幅在 ±integral_limit 内；输出饱和且误差会加深饱和时本次不累积积分
+    - 首次更新的行没有前一误差，微分项为 0 (避免微分冲击)
+    默认参数取自 config.toml 的 [pid]，阶段增益取自 [pid.schedule.<阶段>]。
+    """
+
+    DEFAULT_PHASE = None
+
+    def __init__(self, axes=1, capacity=16, gains=None, schedule=None, integral_limit=None,
+                 min_out=None, max_out=None):
+        pid_cfg = config.get("pid", {})
+        default = gains or (pid_cfg.get("kp", 1.0), pid_cfg.get("ki", 0.0), pid_cfg.get("kd", 0.0))
+        if schedule is None:
+            schedule = pid_cfg.get("schedule", {})
+        # 阶段调度表：第 0 项为默认增益，其余按阶段名；表项形状 (3, axes)，依次为 kp / ki / kd
+        self.phases = (self.DEFAULT_PHASE, *schedule)
+        self._phase_index = {phase: i for i, phase in enumerate(self.phases)}
+        self.table = np.empty((len(self.phases), 3, axes))
+        self.table[0] = np.asarray(default, dtype=np.float64).reshape(3, -1)
+        for i, phase in enumerate(self.phases[1:], start=1):
+            cfg = schedule[phase]
+            self.table[i] = [np.broadcast_to(cfg.get(name, self.table[0, j]), axes)
+                             for j, name in enumerate(("kp", "ki", "kd"))]
+
+        self.axes = axes
+        self.integral_limit = integral_limit if integral_limit is not None else pid_cfg.get("integral_limit", 1.0)
+        self.min_out = min_out if min_out is not None else pid_cfg.get("min_output", -1.0)
+        self.max_out = max_out if max_out is not None else pid_cfg.get("max_output", 1.0)
+
+        self.rows = {}  # key -> 行号
+        self._free = []  # 已释放、可复用的行号
+        self.capacity = 0
+        self._allocate_arrays(capacity)
+
+    def _allocate_arrays(self, capacity):
+        """按容量 (重新) 分配状态数组，保留已有行"""
+        old = self.capacity
+        fields = {
+            "kp": 0.0, "ki": 0.0, "kd": 0.0,  # 各行当前增益 (行, 轴)
+            "integral": 0.0, "prev_error": 0.0,  # 积分与前一误差 (行, 轴)
+        }
+        for name, fill in fields.items():
+            array = np.full((capacity, self.axes), fill)
+            if old:
+                array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        for name, fill, dtype in (("phase", -1, np.intp), ("started", False, bool), ("last_used", 0.0, np.float64)):
+            array = np.full(capacity, fill, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def row(self, key) -> int:
+        """取 key 对应的行，首次出现时分配一行 (状态清零，使用默认增益)"""
+        row = self.rows.get(key)
+        if row is None:
+            if not self._free:
+                self._allocate_arrays(self.capacity * 2)
+            row = self.rows[key] = self._free.pop()
+            self._reset(row)
+        return row
+
+    def release(self, key):
+        """释放 key 的行供后续飞行器复用"""
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self._free.append(row)
+
+    def release_idle(self, before):
+        """释放最近一次更新早于 before (time.monotonic()) 的行，返回释放数量"""
+        idle = [key for key, row in self.rows.items() if self.last_used[row] < before]
+        for key in idle:
+            self.release(key)
+        return len(idle)
+
+    def _reset(self, row):
+        self.kp[row], self.ki[row], self.kd[row] = self.table[0]
+        self.integral[row] = 0.0
+        self.prev_error[row] = 0.0
+        self.phase[row] = 0
+        self.started[row] = False
+        self.last_used[row] = time.monotonic()
+
+    def schedule(self, rows, phases):
+        """按飞行阶段设置各行增益 (只更新阶段发生变化的行)"""
+        rows = np.asarray(rows, dtype=np.intp)
+        index = np.fromiter((self._phase_index.get(phase, 0) for phase in phases), dtype=np.intp, count=len(rows))
+        changed = index != self.phase[rows]
+        if changed.any():
+            rows, index = rows[changed], index[changed]
+            self.kp[rows] = self.table[index, 0]
+            self.ki[rows] = self.table[index, 1]
+            self.kd[rows] = self.table[index, 2]
+            self.phase[rows] = index
+
+    def update(self, rows, error, dt=None, phases=None):
+        """
+        向量化更新多行 PID
+        rows: 行号序列 (同一次调用内不重复)
+        error: 误差，形状 (len(rows), axes)
+        dt: 每行距上次更新的时间 (s)，形状 (len(rows),)；dt <= 0 的行不累积积分、不计微分。
+            为 None 或 NaN 的行按该行上次更新至今的时间计算 (首次更新为 0)
+        phases: 每行当前的飞行阶段 (可选)，用于增益调度
+        返回: 限幅后的输出，形状 (len(rows), axes)
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        error = np.asarray(error, dtype=np.float64).reshape(len(rows), self.axes)
+        now = time.monotonic()
+        dt = np.full(len(rows), math.nan) if dt is None else np.asarray(dt, dtype=np.float64).reshape(len(rows))
+        missing = np.isnan(dt)
+        if missing.any():
+            elapsed = np.where(self.started[rows], now - self.last_used[rows], 0.0)
+            dt = np.where(missing, elapsed, dt)
+        dt = dt[:, None]
+        if phases is not None:
+            self.schedule(rows, phases)
+
+        valid = dt > 0
+        previous = self.integral[rows]
+        integral = np.clip(previous + np.where(valid, error * dt, 0.0), -self.integral_limit, self.integral_limit)
+        started = self.started[rows][:, None] & valid
+        derivative = np.where(started, (error - self.prev_error[rows]) / np.where(valid, dt, 1.0), 0.0)
+
+        raw = self.kp[rows] * error + self.ki[rows] * integral + self.kd[rows] * derivative
+        output = np.clip(raw, self.min_out, self.max_out)
+        # 条件积分：输出已饱和且误差与输出同号 (继续积分只会加深饱和) 时保留原积分
+        windup = (raw != output) & (error * raw > 0)
+        self.integral[rows] = np.where(windup, previous, integral)
+        self.prev_error[rows] = error
+        self.started[rows] = True
+        self.last_used[rows] = now
         return output
 
 class PID:
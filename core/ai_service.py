@@ -2,50 +2,126 @@
 AI 服务进程模块
 """
 import multiprocessing as mp
+import queue
 import time
-from utility import Rlogger
-from .ai_interface import AIController
+from utility import Rlogger, MissionLogger, config
+from .ai_interface import AIController, AIRequest, AIResponse, AIRelease
 
 class AIService:
     """
     独立运行的 AI 计算服务进程
+    采用微批处理：一次取出队列中积压的请求，合并为一次向量化推理；
+    同一飞行器在一批中只保留最新序号的请求，已过期的请求直接丢弃
     """
-    def __init__(self, req_queue: mp.Queue, res_queue: mp.Queue):
+    def __init__(self, req_queue: mp.Queue, res_queue: mp.Queue, batch_size=None, batch_window=None):
         self.req_queue = req_queue
         self.res_queue = res_queue
+
+        ai_cfg = config.get("ai", {})
+        # 单批最大请求数
+        self.batch_size = batch_size or ai_cfg.get("batch_size", 32)
+        # 收到首个请求后最多再等待的时间窗口 (s)，0 表示只合并已积压的请求
+        self.batch_window = batch_window if batch_window is not None else ai_cfg.get("batch_window", 0.0)
+        # 长时间没有请求的飞行器 (未收到结束通知，如内核进程异常退出) 的控制器状态在此时长后释放 (s)
+        self.idle_timeout = ai_cfg.get("idle_timeout", 60.0)
+        self.log_queue = MissionLogger.queue  # 日志写入进程的队列 (主进程未启动写入进程时为 None)
+
         self._process = mp.Process(target=self._run_worker, daemon=True)
         self._process.start()
         Rlogger("AI_Service").info(f"AI 计算服务进程已启动 (PID: {self._process.pid})")
 
+    def _collect_batch(self):
+        """
+        阻塞等待首个请求，然后在批大小/时间窗口内收集后续请求
+        返回: (请求列表, 首个请求到达时刻)
+        """
+        batch = [self.req_queue.get()]
+        started = time.perf_counter()
+        deadline = started + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self.req_queue.get(timeout=remaining))
+                else:
+                    batch.append(self.req_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch, started
+
+    @staticmethod
+    def _coalesce(batch):
+        """
+        按飞行器合并请求：只保留每艘飞行器序号最大的未过期请求
+        返回: (保留的请求列表, 被新请求取代的数量, 已过期的数量)
+        """
+        latest = {}
+        superseded = 0
+        for req in batch:
+            current = latest.get(req.vessel_id)
+            if current is None:
+                latest[req.vessel_id] = req
+                continue
+            superseded += 1
+            if req.seq > current.seq:
+                latest[req.vessel_id] = req
+
+        now = time.time()
+        fresh = [req for req in latest.values() if req.expires >= now]
+        return fresh, superseded, len(latest) - len(fresh)
+
     def _run_worker(self):
         """AI 服务主循环"""
+        MissionLogger.attach(self.log_queue)
         # 在子进程中初始化 AI 控制器（加载模型）
         controller = AIController(model_path="model.pth")
-        Rlogger("AI_Service").info("AI 模型初始化完成，等待请求...")
-        
+        Rlogger("AI_Service").info(
+            f"AI 模型初始化完成，等待请求... (批大小: {self.batch_size}, 窗口: {self.batch_window}s)"
+        )
+        # 累计丢弃计数
+        self.stats = {"superseded": 0, "expired": 0}
+
         while True:
             try:
-                # 阻塞式获取请求，避免空转
-                # request format: {"id": "req_id", "state": {...}}
-                req = self.req_queue.get()
-                
-                req_id = req.get("id")
-                state = req.get("state")
-                
-                if req_id and state:
-                    start_time = time.time()
-                    # 执行预测
-                    action = controller.predict(state)
-                    duration = time.time() - start_time
-                    
-                    # 发送结果
-                    # response format: {"id": "req_id", "action": [...]}
-                    self.res_queue.put({
-                        "id": req_id,
-                        "action": action,
-                        "duration": duration
-                    })
-                    
+                requests, first_arrival = self._collect_batch()
+                # 控制已结束的飞行器：同批中的请求不再推理，随后释放其控制器状态
+                released = {req.vessel_id for req in requests if isinstance(req, AIRelease)}
+                batch, superseded, expired = self._coalesce(
+                    req for req in requests
+                    if isinstance(req, AIRequest) and req.state and req.vessel_id not in released
+                )
+                for vessel_id in released:
+                    controller.release(vessel_id)
+                controller.pid.release_idle(time.monotonic() - self.idle_timeout)
+                self.stats["superseded"] += superseded
+                self.stats["expired"] += expired
+                if superseded or expired:
+                    Rlogger("AI_Service").debug(
+                        f"丢弃请求: 被取代 {superseded}, 已过期 {expired} (累计 {self.stats})"
+                    )
+                if not batch:
+                    continue
+
+                # 执行一次向量化预测
+                infer_start = time.perf_counter()
+                actions = controller.predict_batch([req.state for req in batch], [req.vessel_id for req in batch])
+                duration = time.perf_counter() - infer_start
+                # 批延迟从首个请求到达算起 (阻塞等待首个请求的空闲时间不计入)
+                batch_latency = time.perf_counter() - first_arrival
+
+                # 按飞行器/序号扇出结果
+                for req, action in zip(batch, actions):
+                    self.res_queue.put(AIResponse(
+                        vessel_id=req.vessel_id,
+                        seq=req.seq,
+                        deadline=req.deadline,
+                        action=action,
+                        duration=duration,
+                        batch_size=len(batch),
+                        batch_latency=batch_latency,
+                        dropped=superseded + expired,
+                    ))
+
             except Exception as e:
                 Rlogger("AI_Service").error(f"AI 推理异常: {e}")
                 time.sleep(0.1)
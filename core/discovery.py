@@ -0,0 +1,95 @@
+"""
+飞行器发现模块
+"""
+
+from utility import Rlogger
+
+
+class VesselIndex:
+    """
+    增量式飞行器发现索引。
+    飞行器列表与当前激活飞行器通过 kRPC 流订阅，scan() 只做本地 id 集合差分，
+    仅对新出现的 id 读取 type / name / orbit.body 进行分类；
+    分类结果 (包括被拒绝的碎片等) 一直缓存到该 id 离开飞行器列表或被 forget() 为止。
+    激活飞行器所在天体在激活飞行器切换、有新飞行器待分类时以及每 BODY_CHECK_SCANS 次扫描时重新读取
+    (同一激活飞行器也会进入其他天体的引力范围)；天体变化时只重新分类因“不在同一天体”而被拒绝的飞行器。
+    """
+
+    TARGET_TYPES = ("ship", "probe", "lander", "relay")
+    TARGET_NAMES = ("Booster", "Stage", "RSP")
+
+    # 分类结果
+    ACCEPTED = "accepted"
+    REJECTED_TYPE = "type"
+    REJECTED_BODY = "body"
+
+    BODY_CHECK_SCANS = 20  # 没有新飞行器时，每隔多少次扫描重新读取一次激活飞行器所在天体
+
+    def __init__(self, conn):
+        self.conn = conn
+        space_center = conn.space_center
+        self._valid_types = {getattr(space_center.VesselType, t) for t in self.TARGET_TYPES}
+        self._vessels = conn.add_stream(getattr, space_center, "vessels")
+        self._active = conn.add_stream(getattr, space_center, "active_vessel")
+        self._active_vessel = None
+        self._body = None
+        self.known = {}  # vessel_id -> 分类结果
+        self.classified = 0  # 累计分类次数 (诊断用)
+        self._scans = 0
+
+    def _active_body(self, refresh=False):
+        """激活飞行器所在天体：激活飞行器切换或 refresh 时重新读取 (1-2 次 RPC)"""
+        active = self._active()
+        if refresh or active != self._active_vessel:
+            self._active_vessel = active
+            body = active.orbit.body if active is not None else None
+            if body != self._body:
+                self._body = body
+                for vid in [vid for vid, result in self.known.items() if result == self.REJECTED_BODY]:
+                    del self.known[vid]
+        return self._body
+
+    def _classify(self, vessel, body):
+        self.classified += 1
+        if not (vessel.type in self._valid_types or any(k in vessel.name for k in self.TARGET_NAMES)):
+            return self.REJECTED_TYPE
+        if vessel.orbit.body != body:
+            return self.REJECTED_BODY
+        return self.ACCEPTED
+
+    def scan(self):
+        """返回自上次扫描以来新出现且符合条件的飞行器 (稳态下只有定期读取天体的 RPC)"""
+        current = {v.id: v for v in self._vessels()}
+        self._scans += 1
+        refresh = self._scans % self.BODY_CHECK_SCANS == 0 or any(vid not in self.known for vid in current)
+        body = self._active_body(refresh)
+
+        for vid in [vid for vid in self.known if vid not in current]:
+            del self.known[vid]
+
+        accepted = []
+        for vid, vessel in current.items():
+            if vid in self.known:
+                continue
+            try:
+                result = self._classify(vessel, body)
+            except Exception as e:
+                # 分类途中飞行器被销毁等：不缓存，下次扫描重试
+                Rlogger("Kernel.Discovery").debug("飞行器 %s 分类失败: %s", vid, e)
+                continue
+            self.known[vid] = result
+            if result == self.ACCEPTED:
+                accepted.append(vessel)
+        return accepted
+
+    def forget(self, vessel_id):
+        """丢弃某艘飞行器的分类结果 (如接管失败)，下次扫描时重新分类"""
+        self.known.pop(vessel_id, None)
+
+    def close(self):
+        """注销飞行器列表流"""
+        for stream in (self._vessels, self._active):
+            try:
+                stream.remove()
+            except Exception as e:
+                Rlogger("Kernel.Discovery").debug(f"注销飞行器列表流失败: {e}")
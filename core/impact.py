@@ -0,0 +1,471 @@
+"""
+落点预测模块：在天体惯性系中对无动力弹道做数值积分 (重力 + 星球自转与曲率 + 大气阻力)
+
+坐标约定 (与 kRPC body.reference_frame 一致)：天体固连坐标系，原点为天体质心，
+y 轴指向北极，x 轴指向本初子午线与赤道交点；按右手系处理，星球绕 +y 轴以 rotation_rate 自转。
+(若直接使用 KSP 左手系坐标，将 rotation_rate 取负即可。)
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+# Dormand-Prince 5(4) 系数 (最后一行即 5 阶解权重，FSAL)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# 5 阶解与 4 阶解权重之差 (用于误差估计)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+@dataclass(frozen=True, slots=True)
+class ImpactPrediction:
+    """
+    单次落点预测结果。位置/速度均为天体固连坐标系下的值。
+    complete 为 False 表示在时间预算或最长积分时间内未到达终止高度，此时为最后一个积分状态。
+    """
+    position: tuple
+    velocity: tuple   # 相对地表的速度
+    time: float       # 距到达终止高度的时间 (s)
+    latitude: float   # 度
+    longitude: float  # 度
+    speed: float      # 相对地表的速度大小 (m/s)
+    complete: bool
+    steps: int
+    north: float = math.nan  # 相对起点地面投影的北向偏移 (m)，仅 predict_local 填写
+    east: float = math.nan   # 东向偏移 (m)
+
+
+class DensityTable:
+    """
+    大气密度查找表：对任意密度函数 (可能是一次 RPC) 按固定高度间隔采样一次，
+    之后标量查询与数组查询均为线性插值，不再调用原函数。
+    """
+
+    def __init__(self, func, top, step=50.0):
+        self.top = float(top)
+        self.step = float(step)
+        self.heights = np.arange(0.0, self.top + self.step, self.step)
+        self.values = np.array([func(h) for h in self.heights], dtype=np.float64)
+        self._values = self.values.tolist()
+        self._last = len(self._values) - 1
+
+    def __call__(self, altitude):
+        if altitude >= self.top:
+            return 0.0
+        if altitude <= 0.0:
+            return self._values[0]
+        x = altitude / self.step
+        i = int(x)
+        if i >= self._last:
+            return self._values[self._last]
+        lo = self._values[i]
+        return lo + (self._values[i + 1] - lo) * (x - i)
+
+    def batch(self, altitude):
+        altitude = np.asarray(altitude, dtype=np.float64)
+        return np.where(altitude >= self.top, 0.0, np.interp(altitude, self.heights, self.values))
+
+
+def _rotate_y(x, y, z, angle):
+    """绕 y 轴旋转 angle (弧度)"""
+    c, s = math.cos(angle), math.sin(angle)
+    return x * c + z * s, y, -x * s + z * c
+
+
+def _hermite(t0, s0, d0, t1, s1, d1, t):
+    """用两端的状态与导数做三次 Hermite 插值 (仅位置/速度分量)"""
+    h = t1 - t0
+    u = (t - t0) / h
+    h00 = 2 * u**3 - 3 * u**2 + 1
+    h10 = u**3 - 2 * u**2 + u
+    h01 = -2 * u**3 + 3 * u**2
+    h11 = u**3 - u**2
+    return tuple(
+        h00 * a + h10 * h * da + h01 * b + h11 * h * db
+        for a, da, b, db in zip(s0, d0, s1, d1)
+    )
+
+
+class ImpactPredictor:
+    """
+    落点预测器：每艘飞行器持有一个实例 (热启动状态按实例保存)。
+
+    method: "rk4" 固定步长 (dt)，或 "rk45" Dormand-Prince 自适应步长 (rtol/atol)
+    budget: 单次预测的真实时间预算 (s)，超出即返回 complete=False 的部分结果；None 表示不限
+    max_time: 最长积分的飞行时间 (s)，避免对入轨/逃逸轨道无限积分
+    stop_altitude: 终止高度 (m)，默认为 0 (海平面)；也可设为点火高度等提前终止
+    """
+
+    def __init__(self, radius, mu, rotation_rate=0.0, density=None, atmosphere_depth=None,
+                 density_step=50.0, method="rk4", dt=0.5, rtol=1e-9, atol=1e-3,
+                 budget=0.005, max_time=3600.0, stop_altitude=0.0):
+        self.radius = float(radius)
+        self.mu = float(mu)
+        self.rotation_rate = float(rotation_rate)
+        if density is not None and not isinstance(density, DensityTable):
+            density = DensityTable(density, atmosphere_depth or 200000.0, density_step)
+        self.density = density
+        if method not in ("rk4", "rk45"):
+            raise ValueError(f"未知的积分方法: {method}")
+        self.method = method
+        self.dt = dt
+        self.rtol = rtol
+        self.atol = atol
+        self.budget = budget
+        self.max_time = max_time
+        self.stop_altitude = stop_altitude
+
+        # 热启动：上一次完整预测的起始时刻、惯性系轨迹与结果
+        self.last = None
+        self._trajectory = None
+        self._t0 = None
+        self._h = None  # RK45 上一次接受的步长
+
+    @classmethod
+    def from_body(cls, body, density_step=1000.0, **kwargs):
+        """
+        从 kRPC CelestialBody 读取天体参数并一次性构建密度表
+        (约 atmosphere_depth / density_step 次 RPC，之后预测不再访问服务端)
+        """
+        density, depth = None, None
+        if body.has_atmosphere:
+            depth = body.atmosphere_depth
+            density = DensityTable(body.density_at, depth, density_step)
+        return cls(body.equatorial_radius, body.gravitational_parameter, body.rotational_speed,
+                   density=density, atmosphere_depth=depth, **kwargs)
+
+    # --- 动力学 ---
+    def _derivative(self, s, k):
+        """惯性系状态导数；k = 0.5·Cd·A/m (弹道系数的倒数)"""
+        x, y, z, vx, vy, vz = s
+        r2 = x * x + y * y + z * z
+        r = math.sqrt(r2)
+        g = -self.mu / (r2 * r)
+        ax, ay, az = g * x, g * y, g * z
+        if k and self.density is not None:
+            rho = self.density(r - self.radius)
+            if rho > 0.0:
+                w = self.rotation_rate
+                # 相对大气的速度 v - ω×r
+                ux, uz = vx - w * z, vz + w * x
+                c = -k * rho * math.sqrt(ux * ux + vy * vy + uz * uz)
+                ax += c * ux
+                ay += c * vy
+                az += c * uz
+        return (vx, vy, vz, ax, ay, az)
+
+    def _altitude(self, s):
+        return math.sqrt(s[0] * s[0] + s[1] * s[1] + s[2] * s[2]) - self.radius
+
+    def _rk4(self, s, h, k, d1=None):
+        f = self._derivative
+        d1 = d1 or f(s, k)
+        d2 = f(tuple(a + 0.5 * h * b for a, b in zip(s, d1)), k)
+        d3 = f(tuple(a + 0.5 * h * b for a, b in zip(s, d2)), k)
+        d4 = f(tuple(a + h * b for a, b in zip(s, d3)), k)
+        return tuple(
+            a + h / 6 * (b1 + 2 * b2 + 2 * b3 + b4)
+            for a, b1, b2, b3, b4 in zip(s, d1, d2, d3, d4)
+        )
+
+    def _dopri(self, s, h, k, d1):
+        """Dormand-Prince 单步：返回 (新状态, 新状态导数, 归一化误差)"""
+        def advance(coeffs):
+            return tuple(a + h * sum(c * st[j] for c, st in zip(coeffs, stages)) for j, a in enumerate(s))
+
+        stages = [d1]
+        for coeffs in _DP_A[1:6]:
+            stages.append(self._derivative(advance(coeffs), k))
+        new = advance(_DP_A[6])
+        d_new = self._derivative(new, k)
+        stages.append(d_new)
+        err = 0.0
+        for j in range(6):
+            e = h * sum(c * st[j] for c, st in zip(_DP_E, stages))
+            scale = self.atol + self.rtol * max(abs(s[j]), abs(new[j]))
+            err = max(err, abs(e) / scale)
+        return new, d_new, err
+
+    # --- 坐标转换 ---
+    def _to_inertial(self, position, velocity):
+        x, y, z = (float(v) for v in position)
+        vx, vy, vz = (float(v) for v in velocity)
+        w = self.rotation_rate
+        # t=0 时惯性系与固连系重合，惯性速度 = 地表相对速度 + ω×r
+        return (x, y, z, vx + w * z, vy, vz - w * x)
+
+    def _to_body(self, s, t):
+        """惯性系状态 -> t 时刻的固连系位置与相对地表速度"""
+        w = self.rotation_rate
+        x, y, z = _rotate_y(s[0], s[1], s[2], -w * t)
+        vx, vy, vz = _rotate_y(s[3], s[4], s[5], -w * t)
+        return (x, y, z), (vx - w * z, vy, vz + w * x)
+
+    def _result(self, s, t, steps, complete):
+        position, velocity = self._to_body(s, t)
+        x, y, z = position
+        r = math.sqrt(x * x + y * y + z * z)
+        return ImpactPrediction(
+            position=position,
+            velocity=velocity,
+            time=t,
+            latitude=math.degrees(math.asin(max(-1.0, min(1.0, y / r)))),
+            longitude=math.degrees(math.atan2(-z, x)),
+            speed=math.sqrt(sum(v * v for v in velocity)),
+            complete=complete,
+            steps=steps,
+        )
+
+    # --- 热启动 ---
+    def _warm(self, s, now, pos_tol, vel_tol):
+        """
+        若当前状态仍落在上一次预测的轨迹上 (误差在容差内)，直接复用上一次的落点，
+        只把剩余时间减去已流逝的时间；否则返回 None。
+        """
+        if self.last is None or now is None or self._t0 is None:
+            return None
+        elapsed = now - self._t0
+        trajectory = self._trajectory
+        if not (0.0 <= elapsed < trajectory[-1][0]):
+            return None
+        lo, hi = 0, len(trajectory) - 1
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if trajectory[mid][0] <= elapsed:
+                lo = mid
+            else:
+                hi = mid
+        (t0, s0, d0), (t1, s1, d1) = trajectory[lo], trajectory[hi]
+        predicted = _hermite(t0, s0[:3], s0[3:], t1, s1[:3], s1[3:], elapsed)
+        predicted_v = _hermite(t0, s0[3:], d0[3:], t1, s1[3:], d1[3:], elapsed)
+        # 当前状态转换到上一次预测的惯性系 (相差 elapsed 的自转角)
+        w = self.rotation_rate
+        cur = _rotate_y(s[0], s[1], s[2], w * elapsed)
+        cur_v = _rotate_y(s[3], s[4], s[5], w * elapsed)
+        if math.dist(cur, predicted) > pos_tol or math.dist(cur_v, predicted_v) > vel_tol:
+            return None
+        last = self.last
+        return ImpactPrediction(
+            last.position, last.velocity, last.time - elapsed, last.latitude, last.longitude,
+            last.speed, True, 0, last.north, last.east,
+        )
+
+    # --- 预测接口 ---
+    def predict(self, position, velocity, mass=1.0, drag_area=0.0, now=None,
+                warm=True, pos_tol=20.0, vel_tol=1.0):
+        """
+        预测落点。
+        position/velocity: 天体固连坐标系下的位置 (m) 与相对地表速度 (m/s)
+        mass/drag_area: 质量 (kg) 与阻力面积 Cd·A (m²)
+        now: 当前时刻 (任意单调时钟)，提供时启用热启动：状态与上一次预测轨迹一致则直接复用
+        """
+        s = self._to_inertial(position, velocity)
+        k = 0.5 * drag_area / mass if drag_area else 0.0
+
+        if warm:
+            reused = self._warm(s, now, pos_tol, vel_tol)
+            if reused is not None:
+                return reused
+
+        deadline = time.perf_counter() + self.budget if self.budget else None
+        if self.method == "rk4":
+            s, t, steps, complete, trajectory = self._integrate_rk4(s, k, deadline)
+        else:
+            s, t, steps, complete, trajectory = self._integrate_rk45(s, k, deadline)
+
+        result = self._result(s, t, steps, complete)
+        if complete:
+            self.last, self._trajectory, self._t0 = result, trajectory, now
+        return result
+
+    def _integrate_rk4(self, s, k, deadline):
+        t, steps, dt = 0.0, 0, self.dt
+        d = self._derivative(s, k)
+        trajectory = [(t, s, d)]
+        stop = self.stop_altitude
+        while t < self.max_time:
+            new = self._rk4(s, dt, k, d)
+            steps += 1
+            if self._altitude(new) <= stop:
+                s, h = self._cross(s, new, dt, k, d)
+                return s, t + h, steps, True, trajectory
+            s, t = new, t + dt
+            d = self._derivative(s, k)
+            trajectory.append((t, s, d))
+            if deadline and not steps & 15 and time.perf_counter() > deadline:
+                break
+        return s, t, steps, False, trajectory
+
+    def _integrate_rk45(self, s, k, deadline):
+        t, steps = 0.0, 0
+        h = self._h or self.dt
+        d = self._derivative(s, k)
+        trajectory = [(t, s, d)]
+        stop = self.stop_altitude
+        while t < self.max_time:
+            new, d_new, err = self._dopri(s, h, k, d)
+            steps += 1
+            if err <= 1.0:
+                if self._altitude(new) <= stop:
+                    s, step = self._cross(s, new, h, k, d)
+                    return s, t + step, steps, True, trajectory
+                s, d, t = new, d_new, t + h
+                trajectory.append((t, s, d))
+                self._h = h
+            factor = 0.9 * err ** -0.2 if err > 0 else 5.0
+            h *= min(5.0, max(0.2, factor))
+            if deadline and not steps & 15 and time.perf_counter() > deadline:
+                break
+        return s, t, steps, False, trajectory
+
+    def _cross(self, s, new, h, k, d):
+        """穿越终止高度的一步内用割线法求交点：返回 (交点状态, 距步起点的时间)"""
+        stop = self.stop_altitude
+        a_lo, a_hi = self._altitude(s) - stop, self._altitude(new) - stop
+        t_lo, t_hi = 0.0, h
+        state = new
+        for _ in range(5):
+            step = t_lo + (t_hi - t_lo) * a_lo / (a_lo - a_hi)
+            state = self._rk4(s, step, k, d)
+            a = self._altitude(state) - stop
+            if abs(a) < 1e-3:
+                return state, step
+            if a > 0:
+                t_lo, a_lo = step, a
+            else:
+                t_hi, a_hi = step, a
+        return state, step
+
+    def predict_local(self, altitude, velocity, latitude=0.0, longitude=0.0, **kwargs):
+        """
+        以地表参考系输入预测 (与 vessel.flight() 的 velocity 一致：x=上, y=北, z=东)。
+        返回结果额外包含落点相对当前地面投影的北向/东向偏移 (m)。
+        """
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        cl, sl, co, so = math.cos(lat), math.sin(lat), math.cos(lon), math.sin(lon)
+        up = (cl * co, sl, -cl * so)
+        north = (-sl * co, cl, sl * so)
+        east = (-so, 0.0, -co)
+        r = self.radius + altitude
+        vu, vn, ve = velocity
+        position = tuple(r * u for u in up)
+        vel = tuple(vu * u + vn * n + ve * e for u, n, e in zip(up, north, east))
+
+        result = self.predict(position, vel, **kwargs)
+        dlon = (math.radians(result.longitude) - lon + math.pi) % (2 * math.pi) - math.pi
+        return ImpactPrediction(
+            result.position, result.velocity, result.time, result.latitude, result.longitude,
+            result.speed, result.complete, result.steps,
+            north=self.radius * (math.radians(result.latitude) - lat),
+            east=self.radius * cl * dlon,
+        )
+
+    def predict_batch(self, positions, velocities, masses=1.0, drag_areas=0.0):
+        """
+        批量预测 (固定步长 RK4，NumPy 向量化)：positions/velocities 形状为 (N, 3)。
+        返回字典：position/velocity (N, 3)，time/latitude/longitude/speed (N,)，complete (N,)
+        每步有固定的 NumPy 调用开销，飞行器较少 (约 100 艘以下) 时逐舰调用 predict 更快。
+        """
+        pos = np.atleast_2d(np.asarray(positions, dtype=np.float64))
+        vel = np.atleast_2d(np.asarray(velocities, dtype=np.float64))
+        n = len(pos)
+        k = np.broadcast_to(0.5 * np.asarray(drag_areas, dtype=np.float64) / np.asarray(masses, dtype=np.float64), (n,)).copy()
+        w = self.rotation_rate
+        omega = np.array([0.0, w, 0.0])
+
+        state = np.hstack([pos, vel + np.cross(omega, pos)])
+        t = np.zeros(n)
+        done = np.zeros(n, dtype=bool)
+        final = state.copy()
+        stop = self.stop_altitude
+        dt = self.dt
+        deadline = time.perf_counter() + self.budget * n if self.budget else None
+
+        def derivative(s, kk):
+            r = s[:, :3]
+            v = s[:, 3:]
+            r2 = np.einsum("ij,ij->i", r, r)
+            rn = np.sqrt(r2)
+            acc = (-self.mu / (r2 * rn))[:, None] * r
+            if self.density is not None:
+                rho = self.density.batch(rn - self.radius)
+                u = v - np.cross(omega, r)
+                un = np.sqrt(np.einsum("ij,ij->i", u, u))
+                acc -= (kk * rho * un)[:, None] * u
+            return np.hstack([v, acc])
+
+        def rk4(s, h, kk):
+            h = h[:, None]
+            d1 = derivative(s, kk)
+            d2 = derivative(s + 0.5 * h * d1, kk)
+            d3 = derivative(s + 0.5 * h * d2, kk)
+            d4 = derivative(s + h * d3, kk)
+            return s + h / 6 * (d1 + 2 * d2 + 2 * d3 + d4)
+
+        def altitude(s):
+            return np.linalg.norm(s[:, :3], axis=1) - self.radius - stop
+
+        elapsed = 0.0
+        while elapsed < self.max_time and not done.all():
+            idx = np.flatnonzero(~done)
+            s = state[idx]
+            h = np.full(len(idx), dt)
+            new = rk4(s, h, k[idx])
+            a_new = altitude(new)
+            crossed = a_new <= 0
+            if crossed.any():
+                # 割线法求穿越时刻 (向量化，固定 5 次迭代)
+                ci = np.flatnonzero(crossed)
+                s_c, k_c = s[ci], k[ci]
+                a_lo, a_hi = altitude(s_c), a_new[ci]
+                t_lo, t_hi = np.zeros(len(ci)), h[ci]
+                for _ in range(5):
+                    step = t_lo + (t_hi - t_lo) * a_lo / (a_lo - a_hi)
+                    hit = rk4(s_c, step, k_c)
+                    a = altitude(hit)
+                    above = a > 0
+                    t_lo = np.where(above, step, t_lo)
+                    a_lo = np.where(above, a, a_lo)
+                    t_hi = np.where(above, t_hi, step)
+                    a_hi = np.where(above, a_hi, a)
+                rows = idx[ci]
+                final[rows] = hit
+                t[rows] = elapsed + step
+                done[rows] = True
+            keep = idx[~crossed]
+            state[keep] = new[~crossed]
+            elapsed += dt
+            if deadline and time.perf_counter() > deadline:
+                break
+
+        pending = ~done
+        final[pending] = state[pending]
+        t[pending] = elapsed
+        # 惯性系 -> 各自时刻的固连系
+        angle = -w * t
+        c, s_ = np.cos(angle), np.sin(angle)
+        x, y, z = final[:, 0], final[:, 1], final[:, 2]
+        bx, bz = x * c + z * s_, -x * s_ + z * c
+        vx, vy, vz = final[:, 3], final[:, 4], final[:, 5]
+        bvx, bvz = vx * c + vz * s_, -vx * s_ + vz * c
+        position = np.column_stack([bx, y, bz])
+        velocity = np.column_stack([bvx - w * bz, vy, bvz + w * bx])
+        r = np.linalg.norm(position, axis=1)
+        return {
+            "position": position,
+            "velocity": velocity,
+            "time": t,
+            "latitude": np.degrees(np.arcsin(np.clip(y / r, -1.0, 1.0))),
+            "longitude": np.degrees(np.arctan2(-bz, bx)),
+            "speed": np.linalg.norm(velocity, axis=1),
+            "complete": done,
+        }
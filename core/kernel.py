@@ -3,13 +3,27 @@
 """
 
 import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import threading
 import time
 import krpc
 import asyncio
+import numpy as np
 
-from utility import Rlogger
+from utility import Rlogger, MissionLogger, TelemetryRing, TELEMETRY_DTYPE, config
+from utility.telemetry_record import set_record
+from utility.perf import PerfCounters, SamplingProfiler
 from .orbit import OrbitCalc
 from .RockerCore import RockerCore
+from .recorder import FlightRecorder
+from .discovery import VesselIndex
+from .ai_interface import AIRelease
+from .scheduler import RateScheduler
+from .rpc import RPCPool
+from .rpctrace import RPCTracer
 
 
 class Kernel:
@@ -17,110 +31,241 @@ class Kernel:
     火箭控制内核 - 负责控制子进程的生命周期及多火箭实例分配
     """
 
-    def __init__(self, data_queue: mp.Queue, cmd_queue: mp.Queue, ai_req_queue: mp.Queue = None, ai_res_queue: mp.Queue = None):
-        self.data_queue = data_queue
+    rocker_cls = RockerCore  # 单飞行器控制器类型 (子类可替换，如基准测试中的计时版本)
+    discovery_interval = 0.1  # 新飞行器扫描周期 (s)，与控制周期一致
+    rpc_connections = None  # kRPC 连接数 (None 表示读取 [rpc].connections)
+    conn_name = "RSP_Kernel"  # kRPC 连接名
+    recorder_suffix = ""  # 飞行记录文件名后缀 (分片内核区分各分片的记录文件)
+    perf_slot = 0  # 本进程在性能看板中的行号
+    index = None  # 发现索引 (VesselIndex)，监测循环运行期间有效
+
+    def __init__(self, telemetry_ring: TelemetryRing, cmd_queue: mp.Queue, ai_req_queue: mp.Queue = None, ai_res_queue: mp.Queue = None, connect=None, perf_board=None):
+        self.telemetry_ring = telemetry_ring
+        self.perf_board = perf_board  # 性能看板 (PerfBoard，可选)：定期发布性能计数，并接收采样分析请求
         self.cmd_queue = cmd_queue
         self.ai_req_queue = ai_req_queue
         self.ai_res_queue = ai_res_queue
-        
+        # kRPC 连接工厂：默认连接真实 KSP，也可传入 simkrpc.Simulation 离线运行
+        self.connect = connect or krpc.connect
+        self.log_queue = MissionLogger.queue  # 日志写入进程的队列 (主进程未启动写入进程时为 None)
+
         self._process = mp.Process(target=self._run_worker, daemon=True)
         self._process.start()
         Rlogger("Kernel").info(f"控制内核进程已启动 (PID: {self._process.pid})")
 
     def _run_worker(self):
         """子进程入口"""
-        asyncio.run(self._worker_loop())
+        MissionLogger.attach(self.log_queue)
+        if config.get("rpc_trace", {}).get("enabled", False):
+            # 跟踪报告在主循环退出时写出：守护进程随主进程退出时收到 SIGTERM，转为正常退出
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        # 仿真连接提供自己的事件循环 (虚拟时间)，真实连接使用默认事件循环
+        asyncio.run(self._worker_loop(), loop_factory=getattr(self.connect, "loop_factory", None))
 
     async def _worker_loop(self):
         """控制子进程的异步主循环"""
         Rlogger("Kernel.Worker").info("连接 kRPC 服务...")
+        trace_cfg = config.get("rpc_trace", {})
+        # kRPC 调用跟踪 (按需启用)：包装连接工厂，本进程建立的全部连接及其远程对象均被跟踪
+        self.tracer = RPCTracer() if trace_cfg.get("enabled", False) else None
+        connect = self.tracer.connector(self.connect) if self.tracer else self.connect
         try:
-            conn = krpc.connect(name="RSP_Kernel")
+            conn = connect(name=self.conn_name)
         except Exception as e:
             Rlogger("Kernel.Worker").error(f"kRPC 连接失败: {e}")
             return
 
         self.vessels = {}  # vessel_id -> RockerCore
+        self.rpc_pool = RPCPool(conn, connect, self.rpc_connections)  # 各飞行器的 RPC 在各自通道线程上执行
+        self.scheduler = RateScheduler()  # 按飞行阶段分配各飞行器的控制频率
+        self.recorder = self._open_recorder()
+        self.perf = PerfCounters() if config.get("perf", {}).get("enabled", True) else None
 
         Rlogger("Kernel.Worker").info("内核就绪，开始监测飞行器状态")
 
-        async with asyncio.TaskGroup() as tg:
-            # 1. 自动监测新产生的飞行器
-            tg.create_task(self._watch_vessels(conn, tg))
-            # 2. 处理来自 UI 的指令
-            tg.create_task(self._handle_commands())
-            # 3. 持续推送遥测数据
-            tg.create_task(self._stream_telemetry(conn))
-            # 4. 处理 AI 响应分发 (如果使用了 AI 服务)
-            if self.ai_res_queue:
-                tg.create_task(self._dispatch_ai_responses())
+        try:
+            async with asyncio.TaskGroup() as tg:
+                self._start_tasks(conn, tg)
+                if self.perf_board is not None:
+                    tg.create_task(self._publish_perf())
+        finally:
+            self.rpc_pool.close()
+            if self.recorder:
+                self.recorder.close()
+            if self.tracer:
+                self.tracer.dump(trace_cfg.get("dir", "perf_logs"), self.conn_name)
+
+    def _start_tasks(self, conn, tg):
+        """启动内核的常驻任务"""
+        # 1. 自动监测新产生的飞行器
+        tg.create_task(self._watch_vessels(conn, tg))
+        # 2. 处理来自 UI 的指令
+        tg.create_task(self._handle_commands())
+        # 3. 持续推送遥测数据
+        tg.create_task(self._stream_telemetry())
+        # 4. 处理 AI 响应分发 (如果使用了 AI 服务)
+        if self.ai_res_queue:
+            tg.create_task(self._dispatch_ai_responses())
+
+    async def _publish_perf(self):
+        """定期把性能计数发布到性能看板；看板上有新的采样分析请求时启动有限时长的采样"""
+        cfg = config.get("perf", {})
+        interval = cfg.get("interval", 1.0)
+        profiler = None
+        handled = 0.0  # 已响应的采样请求 (截止时刻)
+        while True:
+            until = self.perf_board.profile_until
+            remaining = until - time.time()
+            if remaining > 0 and until != handled and not (profiler and profiler.running):
+                handled = until
+                path = os.path.join(
+                    cfg.get("profile_dir", "perf_logs"),
+                    f"profile_{time.strftime('%Y%m%d_%H%M%S')}_{self.conn_name}.folded",
+                )
+                seconds = min(remaining, cfg.get("profile_max", 60.0))
+                profiler = SamplingProfiler(path, seconds, cfg.get("profile_interval", 0.005)).start()
+                Rlogger("Kernel.Perf").info(f"开始采样分析 {seconds:.0f} s")
+
+            self.perf_board.publish(
+                self.perf_slot, self.perf, len(self.vessels), self.scheduler.load,
+                profiler is not None and profiler.running,
+            )
+            await asyncio.sleep(interval)
+
+    def _open_recorder(self):
+        """按 [recorder] 配置创建飞行数据记录器"""
+        cfg = config.get("recorder", {})
+        if not cfg.get("enabled", True):
+            return None
+        try:
+            log_dir = cfg.get("dir", "flight_logs")
+            os.makedirs(log_dir, exist_ok=True)
+            path = os.path.join(log_dir, f"flight_{time.strftime('%Y%m%d_%H%M%S')}{self.recorder_suffix}.fdr")
+            return FlightRecorder(path)
+        except Exception as e:
+            Rlogger("Kernel.Worker").error(f"飞行数据记录器启动失败，本次不记录: {e}")
+            return None
 
     async def _dispatch_ai_responses(self):
-        """分发 AI 计算结果到对应的 RockerCore"""
+        """
+        分发 AI 计算结果到对应的 RockerCore。
+        由专用读线程阻塞等待响应队列，到达后立即唤醒事件循环，
+        每次唤醒一次性处理全部积压响应，空闲时不占用 CPU。
+        """
+        loop = asyncio.get_running_loop()
+        inbox = asyncio.Queue()
+        reader = threading.Thread(
+            target=self._read_queue,
+            args=(self.ai_res_queue, loop, inbox),
+            name="Kernel.AIReader",
+            daemon=True,
+        )
+        reader.start()
+
         while True:
-            try:
-                if not self.ai_res_queue.empty():
-                    res = self.ai_res_queue.get_nowait()
-                    # 假设 req_id 格式为 "vessel_id:timestamp"
-                    req_id = res.get("id")
-                    if req_id and ":" in req_id:
-                        vid = req_id.split(":")[0]
-                        if vid in self.vessels:
-                            # 将结果推送到 RockerCore 的内部队列或直接调用回调
-                            # 这里简单起见，假设 RockerCore 有个 handle_ai_response 方法
-                            # 或者 RockerCore 使用了 asyncio.Future 等待结果
-                            # 为简单起见，我们暂不实现复杂的 Future 映射，
-                            # 而是让 RockerCore 自行轮询或者通过 Kernel 分发
-                            # 更好的方式是 RockerCore 传入一个回调或者 Queue
-                            self.vessels[vid].on_ai_response(res)
-            except:
-                pass
-            await asyncio.sleep(0.01)
+            batch = await inbox.get()
+            self._route_ai_responses(batch)
 
-    async def _watch_vessels(self, conn, tg):
-        """动态维护飞行器列表"""
+    @staticmethod
+    def _read_queue(source, loop, inbox):
+        """读线程：阻塞获取进程间队列中的消息并批量移交给事件循环"""
         while True:
             try:
-                active_vessel = conn.space_center.active_vessel
-                all_vessels = conn.space_center.vessels
-                
-                for v in all_vessels:
-                    if v.id in self.vessels:
-                        continue
-                        
-                    v_type = v.type
-                    v_name = v.name
-                    
-                    is_valid_type = v_type in [
-                        conn.space_center.VesselType.ship,
-                        conn.space_center.VesselType.probe,
-                        conn.space_center.VesselType.lander,
-                        conn.space_center.VesselType.relay
-                    ]
-                    
-                    is_target_name = "Booster" in v_name or "Stage" in v_name or "RSP" in v_name
-                    
-                    if (is_valid_type or is_target_name) and v.orbit.body == active_vessel.orbit.body:
-                        try:
-                            # 传递 AI 队列
-                            new_rocker = RockerCore(v, self.ai_req_queue)
-                            self.vessels[v.id] = new_rocker
-                            tg.create_task(new_rocker.run_auto_logic())
-                            Rlogger("Kernel.Worker").info(
-                                f"监测到新实体: {new_rocker.name} ({v.id}) Type: {v_type}"
-                            )
-                        except Exception as e:
-                            Rlogger("Kernel.Worker").warning(f"初始化实体失败 {v_name}: {e}")
-
-                dead_ids = [vid for vid, r in self.vessels.items() if not r.is_active]
-                for vid in dead_ids:
-                    del self.vessels[vid]
-                    Rlogger("Kernel.Worker").info(f"清理失效实体: {vid}")
+                batch = [source.get()]
+                while True:
+                    try:
+                        batch.append(source.get_nowait())
+                    except queue.Empty:
+                        break
+            except (EOFError, OSError):
+                # 队列已关闭 (进程退出)
+                return
+            try:
+                loop.call_soon_threadsafe(inbox.put_nowait, batch)
+            except RuntimeError:
+                # 事件循环已关闭
+                return
 
+    def _route_ai_responses(self, batch):
+        """按 vessel_id 将一批响应 (AIResponse) 路由到对应的 RockerCore"""
+        for res in batch:
+            try:
+                rocker = self.vessels.get(res.vessel_id)
+                if rocker:
+                    rocker.on_ai_response(res)
             except Exception as e:
-                 Rlogger("Kernel.Worker").error(f"监测循环异常: {e}")
+                Rlogger("Kernel.Worker").debug("AI 响应分发失败: %s", e)
+
+    async def _watch_vessels(self, conn, tg):
+        """
+        动态维护飞行器列表：发现索引只对新出现的飞行器分类，稳态扫描几乎不产生 RPC，
+        因此按控制周期扫描，新分离的助推器在一个控制周期内即被接管。
+        已接管过的飞行器 (包括控制逻辑已结束的) 在离开飞行器列表前不会被重复接管；接管失败的在下次扫描时重试。
+        """
+        index = self.index = VesselIndex(conn)
+        primary = self.rpc_pool.primary
+        try:
+            while True:
+                try:
+                    # 新飞行器的分类需要 RPC，放到主连接的 RPC 线程上执行
+                    start = time.perf_counter()
+                    accepted = await primary.call(index.scan)
+                    if self.perf:
+                        elapsed = time.perf_counter() - start
+                        self.perf.record("discovery", elapsed, 1, elapsed)
+                    for v in accepted:
+                        tg.create_task(self._adopt(v, tg))
+                    self._reap()
+
+                except Exception as e:
+                     Rlogger("Kernel.Worker").error(f"监测循环异常: {e}")
 
-            await asyncio.sleep(2)
+                await asyncio.sleep(self.discovery_interval)
+        finally:
+            self.index = None
+            index.close()
+
+    def _reap(self):
+        """清理控制逻辑已结束的 RockerCore 并释放其 RPC 通道"""
+        dead_ids = [vid for vid, r in self.vessels.items() if not r.is_active]
+        for vid in dead_ids:
+            rocker = self.vessels.pop(vid)
+            if rocker.rpc:
+                self.rpc_pool.release(rocker.rpc)
+            if self.ai_req_queue and rocker.ai_seq:
+                # 通知 AI 服务释放该飞行器的控制器状态 (PID 行)
+                self.ai_req_queue.put(AIRelease(vid))
+            Rlogger("Kernel.Worker").info(f"清理失效实体: {vid}")
+
+    async def _adopt(self, v, tg):
+        """接管一艘新飞行器：分配 RPC 通道，在通道线程上创建 RockerCore (注册流需要 RPC) 并启动控制逻辑"""
+        lane = self.rpc_pool.assign()
+        start = time.perf_counter()
+        try:
+            vessel = await lane.call(lane.bind, v)
+            # 传递 AI 队列
+            new_rocker = await lane.call(self.rocker_cls, vessel, lane.conn, self.ai_req_queue, self.recorder)
+        except Exception as e:
+            self.rpc_pool.release(lane)
+            Rlogger("Kernel.Worker").warning(f"初始化实体失败 {v.id}: {e}")
+            self._adopt_failed(v.id)
+            return
+        if self.perf:
+            elapsed = time.perf_counter() - start
+            self.perf.record("adopt", elapsed, 2, elapsed)
+        new_rocker.scheduler = self.scheduler
+        new_rocker.rpc = lane
+        new_rocker.perf = self.perf
+        self.vessels[v.id] = new_rocker
+        tg.create_task(new_rocker.run_auto_logic())
+        Rlogger("Kernel.Worker").info(
+            f"监测到新实体: {new_rocker.name} ({v.id}) 模式: {new_rocker.mission_mode}, 通道: {lane.name}"
+        )
+
+    def _adopt_failed(self, vessel_id):
+        """接管失败：从发现索引中移除，下次扫描重新分类并重试"""
+        if self.index is not None:
+            self.index.forget(vessel_id)
 
     async def _handle_commands(self):
         """处理来自 Dashboard 的指令"""
@@ -133,33 +278,47 @@ class Kernel:
                     pass
             await asyncio.sleep(0.1)
 
-    async def _stream_telemetry(self, conn):
-        """采集并发送遥测数据"""
+    async def _stream_telemetry(self):
+        """
+        发送遥测数据：直接复用各 RockerCore 采样阶段发布的快照，不再重复发起 RPC。
+        记录就地写入预分配的结构化数组，避免每帧重建字典。
+        """
+        records = np.zeros(self.telemetry_ring.max_vessels, dtype=TELEMETRY_DTYPE)
+        written = 0
         while True:
-            telemetry = {}
+            start = time.perf_counter()
+            count = 0
             current_vessels = list(self.vessels.items())
+            slots = self.scheduler.slots
+            now = time.monotonic()
             
             for vid, rocker in current_vessels:
+                if count >= len(records):
+                    break
                 try:
                     if not rocker.is_active: 
                         continue
                     
-                    # 简单的频率控制，每5次循环发送一次完整数据?
-                    # 这里保持简单
-                    flight = rocker.vessel.flight(rocker.vessel.surface_reference_frame)
-                    telemetry[vid] = {
-                        "name": rocker.name,
-                        "mode": rocker.mission_mode,
-                        "state": rocker.state,
-                        "alt": flight.mean_altitude,
-                        "spd": flight.speed,
-                        "v_spd": flight.vertical_speed,
-                        "g": flight.g_force,
-                    }
+                    flight = rocker.telemetry.latest
+                    if flight is None:
+                        continue
+                    # 各飞行器的调度指标随遥测发布 (仪表盘显示)，内核整体负载另见性能看板
+                    slot = slots.get(vid)
+                    set_record(
+                        records, count, vid, rocker.name, rocker.mission_mode, rocker.state,
+                        flight.mean_altitude, flight.speed, flight.vertical_speed,
+                        flight.g_force, flight.age(now), flight.seq,
+                        *((slot.rate, slot.period, slot.jitter, slot.overruns) if slot else ()),
+                    )
+                    count += 1
                 except:
                     continue
 
-            if telemetry:
-                self.data_queue.put(telemetry)
+            # 最后一艘飞行器结束时写入一帧空帧，读取方 (仪表盘 / 分片协调进程) 不再保留过期记录
+            if count or written:
+                self.telemetry_ring.write(records[:count])
+                written = count
+            if self.perf:
+                self.perf.record("telemetry", time.perf_counter() - start)
 
             await asyncio.sleep(0.2)
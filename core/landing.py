@@ -0,0 +1,257 @@
+"""
+着陆点火 (自杀燃烧) 求解模块
+
+与 OrbitCalc.suicide_burn_height 的恒质量/纯竖直/恒推力模型不同，这里对满推力逆行点火做数值积分，
+考虑推进剂消耗 (比冲)、推力随气压 (高度) 的变化以及水平速度分量 (重力转弯)。
+积分开销较大，因此在降至点火判定高度时按 (竖直速度, 水平速度, 质量) 网格一次性预计算查找表，
+控制周期内只做三线性插值 (微秒级)。
+阻力在模型中被忽略 (偏保守：真实减速更快)。
+"""
+
+import math
+
+import numpy as np
+
+from utility import config
+
+G0 = 9.80665
+
+
+class EngineModel:
+    """
+    发动机参数：真空推力 (N)、真空/海平面比冲 (s)。
+    燃料流量恒定，推力随比冲按气压线性插值 (KSP 的推力模型)；气压按等温大气 exp(-h/H) 估计。
+    """
+
+    def __init__(self, vacuum_thrust, isp_vacuum, isp_sea_level=None, scale_height=8500.0):
+        self.vacuum_thrust = float(vacuum_thrust)
+        self.isp_vacuum = float(isp_vacuum)
+        self.isp_sea_level = float(isp_sea_level if isp_sea_level is not None else isp_vacuum)
+        self.scale_height = float(scale_height)
+        self.mass_flow = self.vacuum_thrust / (self.isp_vacuum * G0) if self.isp_vacuum > 0 else 0.0
+        self.key = (self.vacuum_thrust, self.isp_vacuum, self.isp_sea_level, self.scale_height)
+
+    @classmethod
+    def from_vessel(cls, vessel, scale_height=None):
+        """
+        从 kRPC vessel 读取当前级的发动机参数 (3 次 RPC)。
+        真空推力取真空 (气压 0) 下的可用推力：计入推力限制，与遥测的 available_thrust 同源
+        (max_vacuum_thrust 不计推力限制，设置了限制时会高估推力、点火过晚)。
+        """
+        if scale_height is None:
+            scale_height = config.get("landing", {}).get("scale_height", 8500.0)
+        return cls(
+            vessel.available_thrust_at(0.0),
+            vessel.vacuum_specific_impulse,
+            vessel.kerbin_sea_level_specific_impulse,
+            scale_height,
+        )
+
+    def thrust(self, altitude):
+        """给定高度的满推力 (标量或数组)"""
+        pressure = np.exp(-np.maximum(altitude, 0.0) / self.scale_height)
+        isp = self.isp_vacuum - (self.isp_vacuum - self.isp_sea_level) * pressure
+        return self.vacuum_thrust * isp / self.isp_vacuum
+
+
+def simulate_burn(engine, speed, angle, mass, dry_mass, gravity, steps=200, passes=2):
+    """
+    向量化积分满推力逆行点火直到竖直速度归零。
+    speed/angle/mass: 同形状数组 (angle 为速度方向与竖直向下方向的夹角，弧度)
+    返回 (竖直下降距离, 点火时长, 终止质量)；推力不足或推进剂耗尽的元素距离为 inf。
+
+    点火过程中的真实高度 = 点火高度 - 已下降距离，而点火高度正是待求量，
+    因此先按海平面推力求一次，再用上一轮结果估计各时刻高度重新积分 (passes 轮)。
+    """
+    speed = np.asarray(speed, dtype=np.float64)
+    angle = np.asarray(angle, dtype=np.float64)
+    mass = np.asarray(mass, dtype=np.float64)
+
+    burn_height = np.zeros_like(speed)
+    for _ in range(passes):
+        vz = -speed * np.cos(angle)  # 向上为正
+        vx = speed * np.sin(angle)
+        m = mass.copy()
+        drop = np.zeros_like(speed)
+        t = np.zeros_like(speed)
+        done = vz >= 0
+
+        # 每个元素按自身的粗略点火时长取步长，固定步数即可覆盖
+        a0 = engine.thrust(0.0) / mass - gravity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dt = np.where(a0 > 0, speed / a0, 0.0) * 1.5 / steps
+
+        def accel(vz, vx, m, alt):
+            v = np.maximum(np.hypot(vz, vx), 1e-9)
+            a = engine.thrust(alt) / m
+            return -a * vz / v - gravity, -a * vx / v
+
+        for _ in range(steps):
+            alt = burn_height - drop
+            # 中点法 (RK2)
+            az1, ax1 = accel(vz, vx, m, alt)
+            vz_mid = vz + 0.5 * dt * az1
+            vx_mid = vx + 0.5 * dt * ax1
+            m_mid = m - 0.5 * dt * engine.mass_flow
+            az2, ax2 = accel(vz_mid, vx_mid, m_mid, alt + 0.5 * dt * vz)
+
+            vz_new = vz + dt * az2
+            step_dt = dt
+            # 本步内竖直速度过零：按线性插值截断
+            crossing = ~done & (vz_new >= 0)
+            if crossing.any():
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    frac = np.where(crossing, -vz / (vz_new - vz), 1.0)
+                step_dt = np.where(crossing, dt * frac, dt)
+                vz_new = np.where(crossing, 0.0, vz_new)
+
+            active = ~done
+            drop = np.where(active, drop - 0.5 * (vz + vz_new) * step_dt, drop)
+            t = np.where(active, t + step_dt, t)
+            m = np.where(active, m - step_dt * engine.mass_flow, m)
+            vx = np.where(active, vx + step_dt * ax2, vx)
+            vz = np.where(active, vz_new, vz)
+            done |= crossing
+            if done.all():
+                break
+
+        burn_height = np.where(done & (m >= dry_mass) & (a0 > 0), drop, np.inf)
+    return burn_height, t, m
+
+
+def peak_descent_speed(flight):
+    """无阻力、无推力下落到地面时的下降速率 (m/s)：下降段速度的保守上限"""
+    descent = max(-flight.vertical_speed, 0.0)
+    return math.sqrt(descent ** 2 + 2.0 * flight.surface_gravity * max(flight.surface_altitude, 0.0))
+
+
+class SuicideBurnTable:
+    """
+    单级飞行器的点火高度查找表：在 (竖直速度, 水平速度, 质量) 网格上预计算满推力逆行点火所需的竖直下降距离。
+    点火高度近似为竖直速度的二次函数、对水平速度变化平缓，按这两个轴建表插值误差最小。
+    lookup() 为纯 Python 三线性插值，每次约几微秒，适合在控制周期内调用。
+    超出网格范围或级配置发生变化 (stale) 时由调用方重建。
+    """
+
+    def __init__(self, engine, mass, dry_mass, gravity, max_speed, max_horizontal_speed=None,
+                 speed_points=48, horizontal_points=9, mass_points=6):
+        self.engine = engine
+        self.dry_mass = float(dry_mass)
+        self.gravity = float(gravity)
+        self.max_speed = float(max_speed)
+        self.max_horizontal_speed = float(max_horizontal_speed or max_speed / 4)
+        self.mass_range = (float(dry_mass), float(mass))
+
+        self.speeds = np.linspace(0.0, self.max_speed, speed_points)
+        self.horizontal = np.linspace(0.0, self.max_horizontal_speed, horizontal_points)
+        self.masses = np.linspace(self.dry_mass, float(mass), mass_points) if mass > dry_mass else np.array([float(mass)] * 2)
+        vz, vx, m = np.meshgrid(self.speeds, self.horizontal, self.masses, indexing="ij")
+        heights, _, _ = simulate_burn(engine, np.hypot(vz, vx), np.arctan2(vx, vz), m, self.dry_mass, self.gravity)
+        self.heights = heights
+
+        # 纯 Python 查表所需的扁平数据
+        self._flat = heights.ravel().tolist()
+        self._shape = heights.shape
+        self._steps = tuple(
+            (axis[1] - axis[0]) if len(axis) > 1 and axis[1] != axis[0] else 1.0
+            for axis in (self.speeds, self.horizontal, self.masses)
+        )
+        self._origin = (self.speeds[0], self.horizontal[0], self.masses[0])
+
+    _cache = {}
+    CACHE_SIZE = 32
+
+    @classmethod
+    def shared(cls, engine, mass, dry_mass, gravity, max_speed, max_horizontal_speed):
+        """
+        带缓存的构建：网格上限向上取整 (质量 100 kg、速度 50 m/s)，
+        同型号助推器同时进入下降段时共享同一张表，只构建一次。
+        """
+        mass = math.ceil(mass / 100.0) * 100.0
+        max_speed = math.ceil(max_speed / 50.0) * 50.0
+        max_horizontal_speed = math.ceil(max_horizontal_speed / 50.0) * 50.0
+        key = (engine.key, float(dry_mass), mass, round(gravity, 4), max_speed, max_horizontal_speed)
+        table = cls._cache.get(key)
+        if table is None:
+            table = cls(engine, mass, dry_mass, gravity, max_speed, max_horizontal_speed)
+            if len(cls._cache) >= cls.CACHE_SIZE:
+                cls._cache.pop(next(iter(cls._cache)))
+            cls._cache[key] = table
+        return table
+
+    @classmethod
+    def for_vessel(cls, vessel, flight):
+        """
+        按当前级参数 (来自 kRPC vessel，4 次 RPC) 与快照获取查找表。
+        下降速度轴覆盖到预测的峰值下降速度 (从当前高度无阻力自由落体到地面)，下降途中不会超出网格。
+        """
+        return cls.shared(
+            EngineModel.from_vessel(vessel), flight.mass, vessel.dry_mass, flight.surface_gravity,
+            max(peak_descent_speed(flight), 100.0),
+            max(flight.horizontal_speed * 1.5, 50.0),
+        )
+
+    def _index(self, value, axis):
+        n = self._shape[axis]
+        x = (value - self._origin[axis]) / self._steps[axis]
+        if x <= 0.0:
+            return 0, 0.0
+        if x >= n - 1:
+            return n - 2, 1.0
+        i = int(x)
+        return i, x - i
+
+    def lookup(self, vertical_speed, horizontal_speed, mass):
+        """三线性插值得到点火高度 (m)；竖直速度取下降速率 (正值)；任一有效角点为 inf 时返回 inf"""
+        i, fi = self._index(vertical_speed, 0)
+        j, fj = self._index(horizontal_speed, 1)
+        k, fk = self._index(mass, 2)
+        flat, (_, nh, nm) = self._flat, self._shape
+        total = 0.0
+        for di, wi in ((0, 1 - fi), (1, fi)):
+            if not wi:
+                continue
+            for dj, wj in ((0, 1 - fj), (1, fj)):
+                if not wj:
+                    continue
+                base = ((i + di) * nh + j + dj) * nm + k
+                w = wi * wj
+                if fk < 1.0:
+                    total += w * (1 - fk) * flat[base]
+                if fk > 0.0:
+                    total += w * fk * flat[base + 1]
+        return total
+
+    def burn_height(self, flight):
+        """由遥测快照 (竖直/水平速度、质量) 查询点火高度"""
+        return self.lookup(-flight.vertical_speed, flight.horizontal_speed, flight.mass)
+
+    def stale(self, flight, tolerance=0.05):
+        """
+        查找表是否需要重建：速度/质量超出网格，或观测推力与模型推力偏差超过 tolerance
+        (分级会改变质量与发动机，推力不符即说明当前级已变化)
+        """
+        low, high = self.mass_range
+        if (-flight.vertical_speed > self.max_speed or flight.horizontal_speed > self.max_horizontal_speed
+                or not (low * 0.999 <= flight.mass <= high * 1.001)):
+            return True
+        expected = self.engine.thrust(flight.mean_altitude)
+        observed = flight.available_thrust
+        if observed <= 0:
+            # 推进剂耗尽：重建也无济于事，避免反复重建
+            return False
+        return abs(observed - expected) > tolerance * expected
+
+
+def landing_throttle(flight, touchdown_speed=2.0):
+    """
+    点火后的油门：按剩余高度把竖直速度匀减速到 touchdown_speed 所需的减速度
+    a_req = (v² - v_td²) / (2h) + g，再除以当前最大加速度。
+    点火时刻由查找表保证足够早，这里只负责把减速度收敛到刚好以接地速度落地。
+    """
+    altitude = max(flight.surface_altitude, 0.5)
+    a_max = flight.available_thrust / flight.mass
+    if a_max <= 0:
+        return 1.0
+    a_req = (flight.vertical_speed ** 2 - touchdown_speed ** 2) / (2 * altitude) + flight.surface_gravity
+    return max(0.0, min(1.0, a_req / a_max))
@@ -4,6 +4,7 @@
 
 import math
 import numpy as np
+from .impact import ImpactPredictor
 
 class OrbitCalc:
     """
@@ -64,23 +65,75 @@ class OrbitCalc:
         return distance
 
     @staticmethod
-    def impact_prediction(position, velocity, drag_coefficient, mass, area, atmosphere_density_func, dt=0.1):
+    def impact_prediction(position, velocity, drag_coefficient, mass, area, atmosphere_density_func, dt=0.5,
+                          radius=6371000.0, mu=3.986004418e14, rotation_rate=7.2921159e-5,
+                          atmosphere_depth=140000.0, method="rk4"):
         """
-        简单的数值积分预测落点 (考虑空气阻力)
-        注意：这只是一个简单的欧拉积分器，实际KSP/RSS建议使用内置预测或更高级的RK4
+        数值积分预测落点 (考虑重力、星球自转与曲率、空气阻力)，默认参数为 RSS 地球。
+        position/velocity: 天体固连坐标系下的位置与相对地表速度
+        返回: 落点位置 (天体固连坐标系)
+        需要逐周期调用、热启动或批量预测时直接使用 core.impact.ImpactPredictor
         """
-        pos = np.array(position)
-        vel = np.array(velocity)
-        
-        # 模拟直到高度 < 0
-        while pos[0] > 0: # 假设pos[0]是高度 (或者需要根据坐标系调整)
-             # 这里简化模型，仅作为算法示例
-             # 实际需要考虑星球曲率和旋转
-             pass
-        return pos
+        predictor = ImpactPredictor(
+            radius, mu, rotation_rate,
+            density=atmosphere_density_func, atmosphere_depth=atmosphere_depth, density_step=250.0,
+            method=method, dt=dt, budget=None,
+        )
+        result = predictor.predict(position, velocity, mass, drag_coefficient * area, warm=False)
+        return np.array(result.position)
 
     @staticmethod
     def phase_angle(r1, r2, mu):
         """计算霍曼转移所需的相位角"""
         return math.pi * (1 - math.sqrt((r1 + r2)**3 / (8 * r2**3)))
 
+    # --- 向量化批量版本 ---
+    # 参数可为标量或数组，按 NumPy 规则广播；与标量版本的运算顺序一致，结果逐元素相同 (误差 < 1e-12)。
+    # 标量版本会抛异常的非法输入在这里不中断整批计算，而是逐元素返回 nan/inf。
+
+    @staticmethod
+    def vis_viva_batch(r, a, mu):
+        """活力公式 (批量)；根号内为负 (r > 2a 的椭圆轨道外) 的元素返回 nan"""
+        r, a, mu = (np.asarray(x, dtype=np.float64) for x in (r, a, mu))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(mu * (2/r - 1/a))
+
+    @staticmethod
+    def hohmann_transfer_batch(r1, r2, mu):
+        """
+        霍曼转移 (批量)
+        返回: (dv1, dv2, total_time) 三个广播后形状相同的数组
+        """
+        r1, r2, mu = (np.asarray(x, dtype=np.float64) for x in (r1, r2, mu))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            a_transfer = (r1 + r2) / 2
+
+            v1_circular = np.sqrt(mu / r1)
+            v1_transfer = np.sqrt(mu * (2/r1 - 1/a_transfer))
+            dv1 = np.abs(v1_transfer - v1_circular)
+
+            v2_circular = np.sqrt(mu / r2)
+            v2_transfer = np.sqrt(mu * (2/r2 - 1/a_transfer))
+            dv2 = np.abs(v2_circular - v2_transfer)
+
+            period = 2 * math.pi * np.sqrt(a_transfer**3 / mu)
+            return dv1, dv2, period / 2
+
+    @staticmethod
+    def suicide_burn_height_batch(v_vertical, v_horizontal, thrust, mass, gravity, angle_of_attack=0):
+        """自杀燃烧高度 (批量)；推力不足以克服重力的元素返回 inf"""
+        v_vertical, thrust, mass, gravity = (
+            np.asarray(x, dtype=np.float64) for x in (v_vertical, thrust, mass, gravity)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            a_net = thrust / mass - gravity
+            distance = (v_vertical**2) / (2 * a_net)
+        return np.where(a_net > 0, distance, np.inf)
+
+    @staticmethod
+    def phase_angle_batch(r1, r2, mu):
+        """霍曼转移相位角 (批量)"""
+        r1, r2 = np.asarray(r1, dtype=np.float64), np.asarray(r2, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return math.pi * (1 - np.sqrt((r1 + r2)**3 / (8 * r2**3)))
+
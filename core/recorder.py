@@ -0,0 +1,300 @@
+"""
+飞行数据记录器模块 (黑匣子)
+"""
+
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from types import SimpleNamespace
+
+import numpy as np
+
+from utility import Rlogger
+from utility.telemetry_record import MissionMode, FlightState
+
+# 文件头：魔数 + 版本 + 单条记录字节数 + 已提交记录数
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "u4"),
+    ("record_size", "u4"),
+    ("count", "u8"),
+])
+MAGIC = b"RSPFDR01"
+VERSION = 1
+
+# 单条定长记录：一个控制周期内某艘飞行器的样本 + 控制输出
+RECORD_DTYPE = np.dtype([
+    ("t", "f8"),                    # 记录时刻 (time.time())
+    ("vid", "S24"),
+    ("name", "S32"),
+    ("seq", "i8"),                  # 样本序号
+    ("mode", "u1"),                 # MissionMode
+    ("state", "u1"),                # FlightState
+    ("situation", "S16"),
+    ("mean_altitude", "f8"),
+    ("surface_altitude", "f8"),
+    ("vertical_speed", "f8"),
+    ("horizontal_speed", "f8"),
+    ("speed", "f8"),
+    ("velocity", "f8", (3,)),
+    ("g_force", "f8"),
+    ("dynamic_pressure", "f8"),
+    ("mass", "f8"),
+    ("available_thrust", "f8"),
+    ("surface_gravity", "f8"),
+    ("throttle", "f4"),             # NaN 表示本次任务尚未下发
+    ("sas_mode", "S16"),
+    ("ap_direction", "f8", (3,)),
+    ("ai_action", "f4", (4,)),
+])
+
+_NAN3 = (math.nan,) * 3
+
+
+def _ai_vector(action):
+    """AI 输出 (标量/序列/None) -> 定长 4 维向量"""
+    if action is None:
+        return (math.nan,) * 4
+    if isinstance(action, (int, float)):
+        return (action, math.nan, math.nan, math.nan)
+    values = [float(x) for x in list(action)[:4]]
+    return tuple(values + [math.nan] * (4 - len(values)))
+
+
+class FlightRecorder:
+    """
+    全速率飞行数据记录器：内存映射的仅追加日志，定长记录。
+    每次追加只是一次内存拷贝，由操作系统异步回写磁盘，不阻塞控制周期。
+    文件按 chunk 成块扩展：剩余空间不足半块时由后台线程扩展文件并映射下一块，追加时只替换映射引用；
+    重映射不需要刷盘 (共享映射的脏页由操作系统回写)，只有 close() 刷新。
+    """
+
+    def __init__(self, path, chunk=65536):
+        self.path = path
+        self.chunk = chunk
+        self._offset = HEADER_DTYPE.itemsize
+
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(np.array([(MAGIC, VERSION, RECORD_DTYPE.itemsize, 0)], dtype=HEADER_DTYPE).tobytes())
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        if self._header["magic"][0] != MAGIC or self._header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"不兼容的飞行记录文件: {path}")
+
+        self.count = int(self._header["count"][0])
+        self._capacity = self.count + chunk
+        self._records = self._map(self._capacity)
+        self._pending = None  # 后台扩展中的下一块映射 (Future)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Recorder.Grow")
+        Rlogger("Recorder").info(f"飞行数据记录器已启动: {path} (已有 {self.count} 条记录)")
+
+    def _map(self, capacity):
+        """扩展文件到 capacity 条记录并映射 (后台线程执行；已写入的记录在新旧映射中共享)"""
+        size = self._offset + capacity * RECORD_DTYPE.itemsize
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode="r+", offset=self._offset, shape=(capacity,))
+
+    def _swap(self):
+        """换用后台扩展好的映射"""
+        capacity = self._capacity + self.chunk
+        self._records = self._pending.result()
+        self._capacity = capacity
+        self._pending = None
+
+    def append(self, row):
+        """追加一条记录 (与 RECORD_DTYPE 字段顺序一致的元组)"""
+        if self._pending is None:
+            if self._capacity - self.count <= self.chunk // 2:
+                self._pending = self._executor.submit(self._map, self._capacity + self.chunk)
+        elif self._pending.done() or self.count >= self._capacity:
+            # 只有写入速率超过后台扩展速度、本块已写满时才在此等待
+            self._swap()
+        self._records[self.count] = row
+        self.count += 1
+        # 先写记录再提交计数，读端只会看到完整记录
+        self._header["count"] = self.count
+
+    def record(self, rocker):
+        """记录 RockerCore 本周期的样本与控制输出"""
+        snap = rocker.snap
+        controls = rocker.controls
+        throttle = controls["throttle"]
+        self.append((
+            time.time(),
+            str(rocker.vessel_id).encode("utf-8")[:24],
+            rocker.name.encode("utf-8")[:32],
+            snap.seq,
+            MissionMode[rocker.mission_mode],
+            FlightState[rocker.state],
+            getattr(snap.situation, "name", str(snap.situation)).encode("utf-8"),
+            snap.mean_altitude,
+            snap.surface_altitude,
+            snap.vertical_speed,
+            snap.horizontal_speed,
+            snap.speed,
+            tuple(snap.velocity),
+            snap.g_force,
+            snap.dynamic_pressure,
+            snap.mass,
+            snap.available_thrust,
+            snap.surface_gravity,
+            math.nan if throttle is None else throttle,
+            (controls["sas_mode"] or "").encode("utf-8"),
+            controls["ap_direction"] or _NAN3,
+            _ai_vector(rocker.ai_control_input),
+        ))
+
+    def close(self):
+        """刷新到磁盘并截掉预分配的空余部分"""
+        if self._records is None:
+            return
+        if self._pending is not None:
+            self._swap()
+        self._executor.shutdown()
+        self._records.flush()
+        self._header.flush()
+        self._records = None
+        self._header = None
+        with open(self.path, "r+b") as f:
+            f.truncate(self._offset + self.count * RECORD_DTYPE.itemsize)
+        Rlogger("Recorder").info(f"飞行数据记录器已关闭: {self.path} ({self.count} 条记录)")
+
+
+class _ReplaySASMode(Enum):
+    stability_assist = 0
+    prograde = 1
+    retrograde = 2
+
+
+class _ReplayVessel:
+    """
+    回放用飞行器替身：同时充当 Flight 对象，属性由记录逐条写入；
+    控制写入只保存在本地，用于与记录中的真实控制输出比对。
+    """
+
+    def __init__(self, record):
+        self.id = record["vid"].decode("utf-8")
+        self.name = record["name"].decode("utf-8")
+        self.orbit = SimpleNamespace(body=SimpleNamespace(surface_gravity=float(record["surface_gravity"]), reference_frame=None))
+        self.control = SimpleNamespace(throttle=0.0, sas=False, sas_mode=_ReplaySASMode.stability_assist)
+        self.auto_pilot = SimpleNamespace(engage=lambda: None, target_direction=None)
+        self.parts = SimpleNamespace(all=[], fairings=[], solar_panels=[], antennas=[], legs=[], wheels=[])
+        self.load(record)
+
+    def load(self, record):
+        for field in ("mean_altitude", "surface_altitude", "vertical_speed", "horizontal_speed",
+                      "speed", "g_force", "dynamic_pressure", "mass", "available_thrust"):
+            setattr(self, field, float(record[field]))
+        self.velocity = tuple(float(x) for x in record["velocity"])
+        self.situation = SimpleNamespace(name=record["situation"].decode("utf-8"))
+
+    def flight(self, reference_frame=None):
+        return self
+
+
+class _ReplayStream:
+    """回放用流替身：每次读取直接取替身飞行器的当前属性"""
+
+    def __init__(self, func, args):
+        self._func = func
+        self._args = args
+
+    def __call__(self):
+        return self._func(*self._args)
+
+    def remove(self):
+        pass
+
+
+class _ReplayConnection:
+    """回放用连接替身"""
+
+    @staticmethod
+    def add_stream(func, *args):
+        return _ReplayStream(func, args)
+
+
+class FlightReplay:
+    """
+    飞行记录回放：按原始节奏 (speed=1.0) 或尽可能快 (speed=None) 重放记录流，
+    可驱动 Dashboard 重现画面，或驱动 RockerCore 决策逻辑比对控制输出。
+    """
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"不是有效的飞行记录文件: {path}")
+        self.path = path
+        self.count = int(header["count"][0])
+        self.records = np.memmap(
+            path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(self.count,)
+        ) if self.count else np.zeros(0, dtype=RECORD_DTYPE)
+
+    def vessel_ids(self):
+        return sorted({vid.decode("utf-8") for vid in self.records["vid"]})
+
+    async def _pace(self, records, speed):
+        """按记录时间戳节奏逐条产出记录"""
+        if not len(records):
+            return
+        t0 = float(records["t"][0])
+        wall0 = time.monotonic()
+        for record in records:
+            if speed:
+                delay = (float(record["t"]) - t0) / speed - (time.monotonic() - wall0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield record
+
+    @staticmethod
+    def to_telemetry(record):
+        """记录 -> Dashboard 使用的单舰遥测字典"""
+        return {
+            "name": record["name"].decode("utf-8"),
+            "mode": MissionMode(record["mode"]).name,
+            "state": FlightState(record["state"]).name,
+            "alt": float(record["mean_altitude"]),
+            "spd": float(record["speed"]),
+            "v_spd": float(record["vertical_speed"]),
+            "g": float(record["g_force"]),
+            "seq": int(record["seq"]),
+            "age": 0.0,
+        }
+
+    async def play_dashboard(self, dashboard, speed=1.0):
+        """将记录流重放到 Dashboard：每到一条记录即以全部飞行器的最新状态渲染一帧"""
+        latest = {}
+        async for record in self._pace(self.records, speed):
+            latest[record["vid"].decode("utf-8")] = self.to_telemetry(record)
+            dashboard.render(latest)
+            if not speed:
+                await asyncio.sleep(0)
+
+    async def play_rocker(self, vessel_id, speed=None, rocker_cls=None):
+        """
+        将某艘飞行器的记录重放到 RockerCore 决策逻辑 (不连接 KSP)。
+        返回逐周期比对结果: [(记录, 回放得到的控制输出), ...]
+        """
+        if rocker_cls is None:
+            from .RockerCore import RockerCore as rocker_cls
+
+        records = self.records[self.records["vid"] == str(vessel_id).encode("utf-8")]
+        if not len(records):
+            return []
+
+        vessel = _ReplayVessel(records[0])
+        rocker = rocker_cls(vessel, _ReplayConnection())
+        rocker.mission_mode = MissionMode(records[0]["mode"]).name
+
+        results = []
+        async for record in self._pace(records, speed):
+            vessel.load(record)
+            await rocker.decide()
+            results.append((record, dict(rocker.controls)))
+            if not rocker.is_active:
+                break
+        return results
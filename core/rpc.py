@@ -0,0 +1,92 @@
+"""
+kRPC 异步访问模块
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from utility import Rlogger, config
+
+
+class RPCLane:
+    """
+    一条 kRPC 连接及其专属 RPC 线程。
+    kRPC 客户端在同一连接上同一时刻只有一个请求在途，因此每条连接只配一个线程；
+    call() 把阻塞调用交给该线程执行并返回可等待对象，等待期间事件循环继续运行其他飞行器的控制周期。
+    同一通道上的调用按提交顺序执行，单艘飞行器的控制写入不会乱序。
+    """
+
+    def __init__(self, conn, name, shared=True):
+        self.conn = conn
+        self.name = name
+        self.shared = shared  # 与主连接共享对象句柄 (主连接本身或仿真连接)
+        self.vessels = 0  # 绑定到本通道的飞行器数
+        self.calls = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    async def call(self, func, *args):
+        """在本通道的 RPC 线程上执行 func(*args)"""
+        self.calls += 1
+        tracer = getattr(self.conn, "tracer", None)
+        if tracer is not None:
+            # 跟踪 kRPC 调用时，RPC 线程上的调用栈从此处 (提交调用的协程) 接续
+            func = tracer.bind_origin(func)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def bind(self, vessel):
+        """
+        取得飞行器在本通道连接上的句柄 (阻塞，应经由 call() 调用)。
+        远程对象绑定在创建它的连接上，主连接上发现的句柄需在本连接上重新查找。
+        """
+        if self.shared:
+            return vessel
+        for v in self.conn.space_center.vessels:
+            if v.id == vessel.id:
+                return v
+        raise RuntimeError(f"No such vessel: {vessel.id}")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if not self.shared:
+            try:
+                self.conn.close()
+            except Exception as e:
+                Rlogger("Kernel.RPC").debug(f"关闭 {self.name} 连接失败: {e}")
+
+
+class RPCPool:
+    """
+    kRPC 连接池：每艘飞行器固定绑定到负载最低的通道，其 RPC 与流都经由该通道的连接，
+    不同通道上的 RPC 可同时在途，一艘飞行器的慢调用不会阻塞其他飞行器。
+    第 0 条通道使用内核的主连接 (飞行器发现等全局查询)。
+    connections: 连接数 (默认读取 [rpc].connections)
+    """
+
+    def __init__(self, conn, connect, connections=None):
+        if connections is None:
+            connections = config.get("rpc", {}).get("connections", 8)
+        self.primary = RPCLane(conn, "RPC-0")
+        self.lanes = [self.primary]
+        for i in range(1, max(connections, 1)):
+            try:
+                # 仿真连接可直接复制 (共享同一仿真世界)，真实 kRPC 建立新连接
+                fork = getattr(conn, "fork", None)
+                lane_conn = fork(name=f"RSP_Kernel.{i}") if fork else connect(name=f"RSP_Kernel.{i}")
+            except Exception as e:
+                Rlogger("Kernel.RPC").warning(f"建立第 {i + 1} 条 kRPC 连接失败，使用 {i} 条连接: {e}")
+                break
+            self.lanes.append(RPCLane(lane_conn, f"RPC-{i}", shared=lane_conn is conn))
+        Rlogger("Kernel.RPC").info(f"kRPC 连接池就绪: {len(self.lanes)} 条连接")
+
+    def assign(self):
+        """选择负载最低的通道并计入一艘飞行器"""
+        lane = min(self.lanes, key=lambda l: l.vessels)
+        lane.vessels += 1
+        return lane
+
+    def release(self, lane):
+        lane.vessels -= 1
+
+    def close(self):
+        for lane in self.lanes:
+            lane.close()
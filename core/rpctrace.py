@@ -0,0 +1,276 @@
+"""
+kRPC 调用跟踪模块
+"""
+
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from utility import Rlogger
+
+# 被包装跟踪的远程对象类型：真实 kRPC 的远程类与服务，其他连接实现 (如离线仿真) 经 register_remote_type 加入
+try:
+    from krpc.service import ServiceBase
+    from krpc.types import ClassBase
+    REMOTE_TYPES = (ClassBase, ServiceBase)
+except ImportError:
+    REMOTE_TYPES = ()
+
+
+def register_remote_type(cls):
+    """注册远程对象基类，其 (子类) 实例由 RPCTracer 包装跟踪；可用作类装饰器"""
+    global REMOTE_TYPES
+    if cls not in REMOTE_TYPES:
+        REMOTE_TYPES += (cls,)
+    return cls
+
+# 只有仓库内的源文件参与调用点归属与调用栈 (标准库 / 第三方帧被略过，包括仓库内虚拟环境中的第三方包)
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 转发层：调用点取这些帧之外最内层的仓库帧
+_PLUMBING_FILES = {os.path.abspath(__file__), os.path.join(_ROOT, "core", "rpc.py")}
+_PLUMBING_FUNCS = {"_call"}
+
+
+class RPCTracer:
+    """
+    kRPC 调用跟踪器 (按需启用)：包装连接及其返回的远程对象，
+    统计每个远程过程 (类型.属性 / 类型.方法()) 与每个调用点 (源文件:行号) 的调用次数与延迟，
+    并按调用栈累计，结束时输出排序报告与 folded 调用栈文件 (可直接生成火焰图)。
+    只依赖远程对象的 Python 接口，真实 kRPC 连接与离线仿真连接 (simkrpc) 均可包装。
+    经由 RPCLane 提交到 RPC 线程的调用，调用栈从提交处 (事件循环中的协程) 接续。
+    """
+
+    def __init__(self):
+        self.procedures = {}  # 过程 -> [次数, 累计延迟]
+        self.sites = {}  # (调用点, 过程) -> [次数, 累计延迟]
+        self.stacks = Counter()  # folded 调用栈 -> 次数
+        self.stack_time = Counter()  # folded 调用栈 -> 累计延迟 (s)
+        self._kinds = {}  # (类型, 属性名) -> property | method | value
+        self._lock = threading.Lock()  # RPC 线程与事件循环线程并发记录
+        self._origin = threading.local()  # 当前线程上的调用来自哪个提交点
+
+    # --- 包装 ---
+    def connector(self, connect):
+        """包装连接工厂：返回的连接均被跟踪"""
+        tracer = self
+
+        def traced_connect(*args, **kwargs):
+            return TracedConnection(connect(*args, **kwargs), tracer)
+
+        return traced_connect
+
+    def wrap(self, value):
+        """远程对象 (及其列表) 包装为跟踪代理，其余值原样返回"""
+        if isinstance(value, REMOTE_TYPES):
+            return _Traced(value, self)
+        if type(value) is list and value and isinstance(value[0], REMOTE_TYPES):
+            return [_Traced(v, self) for v in value]
+        return value
+
+    def _kind(self, cls, name):
+        key = (cls, name)
+        kind = self._kinds.get(key)
+        if kind is None:
+            attr = inspect.getattr_static(cls, name, None)
+            if isinstance(attr, property):
+                kind = "property"
+            elif inspect.isfunction(attr):
+                kind = "method"
+            else:
+                kind = "value"
+            self._kinds[key] = kind
+        return kind
+
+    def bind_origin(self, func):
+        """记录提交点的调用栈，func 在其他线程执行时以此作为调用栈前缀 (RPCLane 使用)"""
+        origin = self._stack(sys._getframe(1))
+        local = self._origin
+
+        def run(*args):
+            outer = getattr(local, "stack", ())
+            local.stack = origin
+            try:
+                return func(*args)
+            finally:
+                local.stack = outer
+
+        return run
+
+    # --- 记录 ---
+    def _stack(self, frame):
+        """由内向外收集仓库内的帧，返回由外向内的 (文件, 函数, 行号) 元组，接续本线程的提交点"""
+        frames = []
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_ROOT) and "site-packages" not in filename:
+                frames.append((filename, frame.f_code.co_name, frame.f_lineno))
+            frame = frame.f_back
+        frames.reverse()
+        return getattr(self._origin, "stack", ()) + tuple(frames)
+
+    def timed(self, procedure, func, *args):
+        """执行一次远程调用并计入统计"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(procedure, time.perf_counter() - start, sys._getframe(1))
+
+    def record(self, procedure, elapsed, frame):
+        stack = self._stack(frame)
+        site = "?"
+        for filename, func, line in reversed(stack):
+            if filename not in _PLUMBING_FILES and func not in _PLUMBING_FUNCS:
+                site = f"{os.path.relpath(filename, _ROOT)}:{line} ({func})"
+                break
+        folded = ";".join(
+            [f"{os.path.basename(f)}:{func}" for f, func, _ in stack if f not in _PLUMBING_FILES] + [procedure]
+        )
+        with self._lock:
+            entry = self.procedures.setdefault(procedure, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry = self.sites.setdefault((site, procedure), [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            self.stacks[folded] += 1
+            self.stack_time[folded] += elapsed
+
+    # --- 输出 ---
+    def report(self, limit=20) -> str:
+        """排序报告：按调用次数排列的远程过程与调用点"""
+        with self._lock:
+            procedures = sorted(self.procedures.items(), key=lambda kv: -kv[1][0])
+            sites = sorted(self.sites.items(), key=lambda kv: -kv[1][0])
+        total = sum(count for count, _ in self.procedures.values()) or 1
+        lines = [f"kRPC 调用跟踪: {total} 次调用", "", "== 远程过程 (按次数) =="]
+        lines.append(f"{'次数':>10} {'占比':>7} {'累计ms':>10} {'均值µs':>9}  过程")
+        for procedure, (count, elapsed) in procedures[:limit]:
+            lines.append(f"{count:>10} {count / total:>7.1%} {elapsed * 1e3:>10.1f} {elapsed / count * 1e6:>9.1f}  {procedure}")
+        lines += ["", "== 调用点 (按次数) =="]
+        lines.append(f"{'次数':>10} {'占比':>7} {'累计ms':>10} {'均值µs':>9}  调用点 -> 过程")
+        for (site, procedure), (count, elapsed) in sites[:limit]:
+            lines.append(
+                f"{count:>10} {count / total:>7.1%} {elapsed * 1e3:>10.1f} {elapsed / count * 1e6:>9.1f}  {site} -> {procedure}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self, weight="count") -> str:
+        """folded 调用栈 (每行 "帧;帧;过程 权重")；weight 为 count (次数) 或 time (累计延迟 µs)"""
+        with self._lock:
+            if weight == "time":
+                items = [(stack, round(t * 1e6)) for stack, t in self.stack_time.items()]
+            else:
+                items = list(self.stacks.items())
+        return "".join(f"{stack} {value}\n" for stack, value in sorted(items, key=lambda kv: -kv[1]) if value)
+
+    def dump(self, directory, label):
+        """写出排序报告 (.txt) 与按次数 / 延迟加权的 folded 调用栈，返回文件路径列表"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"rpc_trace_{time.strftime('%Y%m%d_%H%M%S')}_{label}")
+        outputs = {
+            f"{base}.txt": self.report(),
+            f"{base}.folded": self.collapsed("count"),
+            f"{base}.time.folded": self.collapsed("time"),
+        }
+        for path, text in outputs.items():
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        Rlogger("Kernel.RPCTrace").info(f"kRPC 调用跟踪已写出: {base}.*")
+        return list(outputs)
+
+
+class _Traced:
+    """远程对象的跟踪代理：属性读写与方法调用计为远程过程，返回的远程对象继续被包装"""
+
+    __slots__ = ("_obj", "_tracer")
+
+    def __init__(self, obj, tracer):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_tracer", tracer)
+
+    def __getattr__(self, name):
+        obj, tracer = self._obj, self._tracer
+        if name.startswith("_"):
+            return getattr(obj, name)
+        cls = type(obj)
+        kind = tracer._kind(cls, name)
+        if kind == "property":
+            return tracer.wrap(tracer.timed(f"{cls.__name__}.{name}", getattr, obj, name))
+        value = getattr(obj, name)
+        if kind == "method":
+            procedure = f"{cls.__name__}.{name}()"
+
+            def method(*args, **kwargs):
+                args = [_unwrap(a) for a in args]
+                kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+                return tracer.wrap(tracer.timed(procedure, lambda: value(*args, **kwargs)))
+
+            return method
+        return tracer.wrap(value)
+
+    def __setattr__(self, name, value):
+        obj, tracer = self._obj, self._tracer
+        cls = type(obj)
+        if tracer._kind(cls, name) == "property":
+            tracer.timed(f"{cls.__name__}.{name}=", setattr, obj, name, _unwrap(value))
+        else:
+            setattr(obj, name, _unwrap(value))
+
+    # 远程对象按对象 id 比较：代理与原对象、代理与代理之间的比较委托给原对象
+    def __eq__(self, other):
+        return self._obj == _unwrap(other)
+
+    def __ne__(self, other):
+        return self._obj != _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._obj)
+
+    def __repr__(self):
+        return f"<traced {self._obj!r}>"
+
+
+def _unwrap(value):
+    return value._obj if isinstance(value, _Traced) else value
+
+
+class TracedConnection:
+    """被跟踪的 kRPC 连接：服务对象被包装，注册的流返回被包装的远程对象 (读取流不计为 RPC)"""
+
+    def __init__(self, conn, tracer):
+        self._conn = conn
+        self.tracer = tracer
+        if hasattr(conn, "fork"):
+            self.fork = self._fork
+
+    def __getattr__(self, name):
+        return self.tracer.wrap(getattr(self._conn, name))
+
+    def add_stream(self, func, *args, **kwargs):
+        args = [_unwrap(a) for a in args]
+        stream = self.tracer.timed("AddStream", lambda: self._conn.add_stream(func, *args, **kwargs))
+        return _TracedStream(stream, self.tracer)
+
+    def _fork(self, name=None):
+        """仿真连接的 fork 返回自身时，沿用同一个跟踪连接"""
+        conn = self._conn.fork(name=name)
+        return self if conn is self._conn else TracedConnection(conn, self.tracer)
+
+
+class _TracedStream:
+    def __init__(self, stream, tracer):
+        self._stream = stream
+        self._tracer = tracer
+
+    def __call__(self):
+        return self._tracer.wrap(self._stream())
+
+    def remove(self):
+        self._tracer.timed("RemoveStream", self._stream.remove)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
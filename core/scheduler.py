@@ -0,0 +1,160 @@
+"""
+控制频率调度模块
+"""
+
+from dataclasses import dataclass
+from utility import Rlogger, config
+
+# 调度优先级：超出预算时从低到高依次降频，TERMINAL 永不降频
+PRIORITY_IDLE = 0      # 碎片 / 已着陆 / 已溅落
+PRIORITY_COAST = 1     # 太空滑行
+PRIORITY_ACTIVE = 2    # 上升 / 下降 / 其他
+PRIORITY_TERMINAL = 3  # 末段下降 (着陆点火中或接近地面)
+
+
+@dataclass(slots=True)
+class VesselSchedule:
+    """单艘飞行器的调度状态与指标 (时间单位均为秒，interval/jitter/cost 为指数滑动平均)"""
+    base_rate: float = 10.0   # 按飞行阶段确定的目标频率 (Hz)
+    rate: float = 10.0        # 实际分配的频率 (降频后可能低于 base_rate)
+    priority: int = PRIORITY_ACTIVE
+    period: float = 0.1       # 当前周期 = 1 / rate
+    interval: float = 0.0     # 实测相邻两次 tick 的间隔
+    jitter: float = 0.0       # |实测间隔 - 目标周期|
+    lateness: float = 0.0     # 最近一次 tick 相对截止时间的延迟
+    cost: float = 0.0         # 单次 tick 耗时 (真实 CPU 时间)
+    ticks: int = 0
+    overruns: int = 0         # 延迟超过一个周期的次数
+    last_start: float = None
+
+    @property
+    def shed(self) -> bool:
+        return self.rate < self.base_rate
+
+
+class RateScheduler:
+    """
+    按飞行阶段分配控制频率的截止时间调度器 (内核内全部 RockerCore 共享)。
+    各 RockerCore 每个 tick 结束后调用 update() 上报耗时并取得下一周期；
+    下一次 tick 的截止时间从上一次截止时间起算，tick 耗时不会累积为周期漂移。
+    负载 = Σ(tick 耗时 × 目标频率)，超过 budget (占单核时间的比例) 时，
+    从最低优先级开始按比例降低频率 (不低于 min_rate)，直到负载回到预算内。
+    """
+
+    EWMA = 0.2
+    REBALANCE_INTERVAL = 1.0  # 重新计算降频系数的间隔 (s)
+
+    def __init__(self, **overrides):
+        cfg = dict(config.get("scheduler", {}), **overrides)
+        self.terminal_rate = cfg.get("terminal_rate", 50.0)
+        self.active_rate = cfg.get("active_rate", 10.0)
+        self.coast_rate = cfg.get("coast_rate", 1.0)
+        self.idle_rate = cfg.get("idle_rate", 1.0)
+        self.terminal_altitude = cfg.get("terminal_altitude", 3000.0)
+        self.budget = cfg.get("budget", 0.8)
+        self.min_rate = cfg.get("min_rate", 0.5)
+
+        self.slots = {}  # vessel_id -> VesselSchedule
+        self.factors = {}  # 优先级 -> 降频系数 (1 表示不降频)
+        self.load = 0.0
+        self._rebalanced_at = None
+
+    def classify(self, rocker):
+        """按任务模式与飞行状态确定 (目标频率, 优先级)"""
+        state = rocker.state
+        if rocker.mission_mode == "DEBRIS" or state in ("LANDED", "SPLASHED"):
+            return self.idle_rate, PRIORITY_IDLE
+        if state == "SPACE":
+            return self.coast_rate, PRIORITY_COAST
+        if state == "DESCENT" and (getattr(rocker, "burning", False)
+                                   or rocker.snap.surface_altitude < self.terminal_altitude):
+            return self.terminal_rate, PRIORITY_TERMINAL
+        return self.active_rate, PRIORITY_ACTIVE
+
+    def update(self, rocker, started, deadline, cost):
+        """
+        上报一次 tick：started / deadline 为事件循环时间，cost 为 tick 耗时 (s)。
+        返回下一周期长度 (s)。
+        """
+        slot = self.slots.get(rocker.vessel_id)
+        if slot is None:
+            slot = self.slots[rocker.vessel_id] = VesselSchedule()
+
+        a = self.EWMA
+        if slot.last_start is not None:
+            interval = started - slot.last_start
+            slot.interval = interval if slot.ticks == 1 else slot.interval + a * (interval - slot.interval)
+            slot.jitter += a * (abs(interval - slot.period) - slot.jitter)
+        slot.lateness = started - deadline
+        if slot.lateness > slot.period:
+            slot.overruns += 1
+        slot.cost = cost if not slot.ticks else slot.cost + a * (cost - slot.cost)
+        slot.last_start = started
+        slot.ticks += 1
+
+        slot.base_rate, slot.priority = self.classify(rocker)
+        if self._rebalanced_at is None or started - self._rebalanced_at >= self.REBALANCE_INTERVAL:
+            self._rebalance()
+            self._rebalanced_at = started
+
+        factor = self.factors.get(slot.priority, 1.0)
+        slot.rate = max(min(self.min_rate, slot.base_rate), slot.base_rate * factor)
+        slot.period = 1.0 / slot.rate
+        return slot.period
+
+    def _rebalance(self):
+        """负载超出预算时，从低优先级开始计算各优先级的降频系数"""
+        levels = {}
+        for slot in self.slots.values():
+            full, floor = levels.get(slot.priority, (0.0, 0.0))
+            levels[slot.priority] = (
+                full + slot.cost * slot.base_rate,
+                floor + slot.cost * min(self.min_rate, slot.base_rate),
+            )
+        self.load = sum(full for full, _ in levels.values())
+
+        was_shedding = any(f < 1.0 for f in self.factors.values())
+        factors = {}
+        excess = self.load - self.budget
+        for priority in sorted(levels):
+            if excess <= 0 or priority >= PRIORITY_TERMINAL:
+                break
+            full, floor = levels[priority]
+            if full <= 0:
+                continue
+            reduced = max(full - excess, floor)
+            factors[priority] = reduced / full
+            excess -= full - reduced
+        self.factors = factors
+
+        shedding = any(f < 1.0 for f in factors.values())
+        if shedding != was_shedding:
+            if shedding:
+                Rlogger("Kernel.Scheduler").warning(
+                    f"控制负载 {self.load:.0%} 超出预算 {self.budget:.0%}，降低低优先级飞行器频率: "
+                    + ", ".join(f"P{p}×{f:.2f}" for p, f in sorted(factors.items()))
+                )
+            else:
+                Rlogger("Kernel.Scheduler").info(f"控制负载 {self.load:.0%} 回到预算内，恢复目标频率")
+
+    def remove(self, vessel_id):
+        self.slots.pop(vessel_id, None)
+
+    def metrics(self) -> dict:
+        """各飞行器的调度指标 {vessel_id: {...}}"""
+        return {
+            vid: {
+                "rate": slot.rate,
+                "base_rate": slot.base_rate,
+                "priority": slot.priority,
+                "period": slot.period,
+                "interval": slot.interval,
+                "jitter": slot.jitter,
+                "lateness": slot.lateness,
+                "cost": slot.cost,
+                "ticks": slot.ticks,
+                "overruns": slot.overruns,
+                "shed": slot.shed,
+            }
+            for vid, slot in self.slots.items()
+        }
@@ -0,0 +1,202 @@
+"""
+分片控制内核模块
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import time
+
+import numpy as np
+
+from utility import Rlogger, TelemetryRing, config
+from .kernel import Kernel
+from .discovery import VesselIndex
+
+
+class KernelShard(Kernel):
+    """
+    控制内核分片：独立子进程，拥有自己的 kRPC 连接池与 RockerCore 集合。
+    不做飞行器发现，只接管协调进程经 assign_queue 分配来的飞行器 (按 id 在本分片的连接上查找)；
+    遥测写入本分片的环形缓冲区，AI 请求直接写入共享请求队列，AI 响应由协调进程转发到 ai_res_queue。
+    """
+
+    def __init__(self, index, telemetry_ring: TelemetryRing, ai_req_queue: mp.Queue = None,
+                 ai_res_queue: mp.Queue = None, connect=None, perf_board=None):
+        self.index = index
+        self.assign_queue = mp.Queue()  # 协调进程 -> 分片：待接管的 vessel_id
+        self.conn_name = f"RSP_Kernel.S{index}"
+        self.recorder_suffix = f"_s{index}"
+        self.perf_slot = index + 1  # 第 0 行为协调进程
+        super().__init__(telemetry_ring, None, ai_req_queue, ai_res_queue, connect=connect, perf_board=perf_board)
+
+    def _start_tasks(self, conn, tg):
+        tg.create_task(self._watch_vessels(conn, tg))
+        tg.create_task(self._stream_telemetry())
+        if self.ai_res_queue:
+            tg.create_task(self._dispatch_ai_responses())
+
+    async def _watch_vessels(self, conn, tg):
+        """按控制周期接收分配并清理已结束的 RockerCore"""
+        primary = self.rpc_pool.primary
+        while True:
+            try:
+                for vid in self._assignments():
+                    vessel = await primary.call(self._find_vessel, conn, vid)
+                    if vessel is None:
+                        Rlogger("Kernel.Shard").warning(f"分片 {self.index} 未找到分配的实体: {vid}")
+                        continue
+                    tg.create_task(self._adopt(vessel, tg))
+                self._reap()
+            except Exception as e:
+                Rlogger("Kernel.Shard").error(f"分片 {self.index} 监测循环异常: {e}")
+
+            await asyncio.sleep(self.discovery_interval)
+
+    def _adopt_failed(self, vessel_id):
+        """接管失败：放回分配队列，下个周期重试 (飞行器已不存在时在查找阶段放弃)"""
+        self.assign_queue.put(vessel_id)
+
+    def _assignments(self):
+        """取出全部待接管的 vessel_id (不阻塞)"""
+        ids = []
+        while True:
+            try:
+                ids.append(self.assign_queue.get_nowait())
+            except queue.Empty:
+                return ids
+
+    @staticmethod
+    def _find_vessel(conn, vessel_id):
+        """在本分片的连接上按 id 查找飞行器 (阻塞，应经由 RPC 通道调用)"""
+        for vessel in conn.space_center.vessels:
+            if vessel.id == vessel_id:
+                return vessel
+        return None
+
+
+class ShardedKernel(Kernel):
+    """
+    分片控制内核：协调进程保留飞行器发现，把新飞行器分配给当前负载最低的分片进程 (KernelShard)，
+    每个分片各用一个 GIL 与一组 kRPC 连接，控制吞吐随分片数 (CPU 核数) 增长。
+    协调进程合并各分片的遥测帧写入仪表盘的环形缓冲区，并按 vessel_id 把 AI 响应路由回所属分片。
+    分片的负载 = 遥测帧中的活跃飞行器数 + 已分配但尚未出现在遥测中的飞行器数。
+    shards: 分片数 (默认读取 [kernel].shards)
+    perf_board: 性能看板，需有 shards + 1 行 (协调进程占第 0 行)
+
+    离线仿真下每个进程各自运行一份相同初始场景的仿真世界 (飞行器 id 一致)，
+    需使用限速 (time_scale) 或真实时间仿真，各进程的仿真时间才能保持同步。
+    """
+
+    rpc_connections = 1  # 协调进程只做发现，单条连接即可
+    merge_interval = 0.1  # 遥测合并周期 (s)
+
+    def __init__(self, telemetry_ring: TelemetryRing, cmd_queue: mp.Queue, ai_req_queue: mp.Queue = None,
+                 ai_res_queue: mp.Queue = None, connect=None, shards=None, perf_board=None):
+        if shards is None:
+            shards = config.get("kernel", {}).get("shards", os.cpu_count() or 1)
+        # 分片进程需由主进程创建 (守护进程不能再创建子进程)
+        # 各分片的环形缓冲区平分仪表盘缓冲区的容量 (向上取整)：分配按负载均衡，
+        # 飞行器总数不超过 max_vessels 时每个分片都放得下，合并后的一帧也不超过仪表盘缓冲区
+        shards = max(shards, 1)
+        per_shard = -(-telemetry_ring.max_vessels // shards)
+        self.shard_rings = [TelemetryRing.create(per_shard, telemetry_ring.capacity) for _ in range(shards)]
+        self.shards = [
+            KernelShard(i, ring, ai_req_queue, mp.Queue() if ai_res_queue else None, connect=connect,
+                        perf_board=perf_board)
+            for i, ring in enumerate(self.shard_rings)
+        ]
+        self.owners = {}  # vessel_id -> 分片序号
+        self.pending = [set() for _ in self.shards]  # 各分片已分配、尚未出现在遥测中的 vessel_id (遥测编码)
+        self.active = [set() for _ in self.shards]  # 各分片最新遥测帧中的 vessel_id (遥测编码)
+        super().__init__(telemetry_ring, cmd_queue, ai_req_queue, ai_res_queue, connect=connect, perf_board=perf_board)
+        Rlogger("Kernel").info(f"分片模式: {len(self.shards)} 个分片进程")
+
+    def _start_tasks(self, conn, tg):
+        tg.create_task(self._watch_vessels(conn, tg))
+        tg.create_task(self._handle_commands())
+        tg.create_task(self._merge_telemetry())
+        if self.ai_res_queue:
+            tg.create_task(self._dispatch_ai_responses())
+
+    def _open_recorder(self):
+        # 飞行数据由各分片记录
+        return None
+
+    async def _watch_vessels(self, conn, tg):
+        """发现新飞行器并分配给分片；飞行器离开列表后释放其分配"""
+        index = VesselIndex(conn)
+        primary = self.rpc_pool.primary
+        try:
+            while True:
+                try:
+                    start = time.perf_counter()
+                    accepted = await primary.call(index.scan)
+                    if self.perf:
+                        elapsed = time.perf_counter() - start
+                        self.perf.record("discovery", elapsed, 1, elapsed)
+                    for vid in [vid for vid in self.owners if vid not in index.known]:
+                        self.pending[self.owners.pop(vid)].discard(self._key(vid))
+                    for v in accepted:
+                        self._assign(v.id)
+                except Exception as e:
+                    Rlogger("Kernel.Worker").error(f"监测循环异常: {e}")
+
+                await asyncio.sleep(self.discovery_interval)
+        finally:
+            index.close()
+
+    def _assign(self, vessel_id):
+        """把飞行器分配给负载最低的分片"""
+        shard = min(range(len(self.shards)), key=self._load)
+        self.owners[vessel_id] = shard
+        self.pending[shard].add(self._key(vessel_id))
+        self.shards[shard].assign_queue.put(vessel_id)
+        Rlogger("Kernel.Worker").info(f"分配实体 {vessel_id} -> 分片 {shard} (分片负载 {self._load(shard)})")
+
+    def _load(self, shard):
+        return len(self.active[shard] | self.pending[shard])
+
+    @staticmethod
+    def _key(vessel_id):
+        """vessel_id 在遥测记录中的编码"""
+        return str(vessel_id).encode("utf-8")
+
+    async def _merge_telemetry(self):
+        """合并各分片的最新遥测帧；任一分片有新帧时写入一帧合并结果"""
+        frames = [None] * len(self.shards)
+        seqs = [0] * len(self.shards)
+        while True:
+            changed = False
+            for i, ring in enumerate(self.shard_rings):
+                if ring.seq == seqs[i]:
+                    continue
+                seq, rows = ring.read()
+                if rows is None:
+                    continue
+                frames[i], seqs[i] = rows, seq
+                self.active[i] = set(rows["vid"].tolist())
+                self.pending[i] -= self.active[i]
+                changed = True
+
+            if changed:
+                self.telemetry_ring.write(np.concatenate([f for f in frames if f is not None]))
+
+            await asyncio.sleep(self.merge_interval)
+
+    def _route_ai_responses(self, batch):
+        """按 vessel_id 把 AI 响应转发到所属分片"""
+        for res in batch:
+            shard = self.owners.get(res.vessel_id)
+            if shard is None:
+                continue
+            try:
+                self.shards[shard].ai_res_queue.put(res)
+            except Exception as e:
+                Rlogger("Kernel.Worker").debug("AI 响应转发失败: %s", e)
+
+    def close(self):
+        """释放各分片的遥测缓冲区 (主进程退出时调用)"""
+        for ring in self.shard_rings:
+            ring.close()
@@ -0,0 +1,764 @@
+"""
+离线 kRPC 仿真模块：在没有 KSP 的情况下运行 Kernel / RockerCore / Utils
+
+覆盖本项目用到的 kRPC API 子集 (space_center.vessels、vessel.flight()、control、
+auto_pilot、parts.*、orbit.body 以及流)，底层为简单的质点升降物理模型。
+时间由 SimClock 驱动：Kernel 使用 Simulation.loop_factory 创建的事件循环后，
+所有 asyncio.sleep 都按虚拟时间推进，因此结果可复现，并可以 10-100 倍速乃至不限速运行。
+
+用法:
+    sim = Simulation(time_scale=50)
+    kernel = Kernel(ring, cmd_queue, connect=sim)
+"""
+
+import asyncio
+import math
+import selectors
+import threading
+import time
+from collections import Counter
+from enum import Enum
+
+from .rpctrace import register_remote_type
+
+G0 = 9.80665
+
+
+class VesselType(Enum):
+    base = 0
+    debris = 1
+    lander = 2
+    plane = 3
+    probe = 4
+    relay = 5
+    rover = 6
+    ship = 7
+    station = 8
+
+
+class VesselSituation(Enum):
+    pre_launch = 0
+    orbiting = 1
+    sub_orbital = 2
+    escaping = 3
+    flying = 4
+    landed = 5
+    splashed = 6
+    docked = 7
+
+
+class SASMode(Enum):
+    stability_assist = 0
+    maneuver = 1
+    prograde = 2
+    retrograde = 3
+    normal = 4
+    anti_normal = 5
+    radial = 6
+    anti_radial = 7
+    target = 8
+    anti_target = 9
+
+
+# 天体参数: 半径 (m), 引力参数 (m^3/s^2), 海平面大气密度 (kg/m^3), 标高 (m), 大气层高度 (m)
+EARTH = {"name": "Earth", "radius": 6371000.0, "mu": 3.986004418e14,
+         "rho0": 1.225, "scale_height": 8500.0, "atmosphere_depth": 140000.0}
+KERBIN = {"name": "Kerbin", "radius": 600000.0, "mu": 3.5316e12,
+          "rho0": 1.225, "scale_height": 5600.0, "atmosphere_depth": 70000.0}
+
+# 默认场景：一枚正在下降的助推器 + 一枚入轨级
+DEFAULT_SCENARIO = (
+    {"name": "RSP Booster", "altitude": 25000.0, "vertical_speed": -450.0, "horizontal_speed": 80.0,
+     "dry_mass": 22000.0, "fuel_mass": 9000.0, "max_thrust": 1.6e6, "isp": 311.0, "isp_sl": 282.0, "legs": 4},
+    {"name": "RSP Upper Stage", "altitude": 90000.0, "vertical_speed": 600.0, "horizontal_speed": 5500.0,
+     "dry_mass": 4000.0, "fuel_mass": 20000.0, "max_thrust": 9.0e5, "isp": 348.0,
+     "fairings": 1, "solar_panels": 2, "antennas": 1},
+)
+
+
+def _rpc(name):
+    """声明一个远程属性：每次读写计为一次 RPC，并先把物理推进到当前时刻"""
+
+    def fget(self):
+        self._call(name)
+        return getattr(self, "_" + name)
+
+    def fset(self, value):
+        self._call(name)
+        setattr(self, "_" + name, value)
+
+    return property(fget, fset)
+
+
+@register_remote_type
+class _Remote:
+    """远程对象基类；owner 为所属飞行器，飞行器销毁后访问将抛出 RuntimeError (与 kRPC 一致)"""
+
+    def __init__(self, conn, owner=None):
+        self._conn = conn
+        self._owner = owner
+
+    def _call(self, name):
+        self._conn._rpc(name)
+        if self._owner is not None and not self._owner.alive:
+            raise RuntimeError(f"No such vessel: {self._owner.id}")
+
+
+class SimClock:
+    """
+    仿真时钟 (秒)。
+    time_scale 为 None 时不限速：虚拟时间直接跳到下一个定时器；
+    否则按 time_scale 倍速节流，虚拟时间不会超前于 time_scale × 真实流逝时间。
+    没有 SimEventLoop 驱动时，可通过 advance() 手动推进。
+    """
+
+    def __init__(self, time_scale=None):
+        self.time_scale = time_scale
+        self.t = 0.0
+        self._wall0 = time.monotonic()
+
+    def advance(self, dt):
+        self.t += dt
+
+
+class WallClock:
+    """
+    真实时间时钟：物理状态跟随真实流逝时间，配合默认事件循环使用。
+    控制周期的计算耗时会真实地体现在周期抖动上 (用于性能基准)。
+    """
+
+    time_scale = 1.0
+
+    def __init__(self):
+        self._wall0 = time.monotonic()
+
+    @property
+    def t(self):
+        return time.monotonic() - self._wall0
+
+
+class _SimSelector(selectors.DefaultSelector):
+    """
+    事件循环空闲等待时推进虚拟时间，而不是阻塞真实时间。
+    有线程池任务 (如 RPC 线程上的调用) 在途时按真实时间等待其完成，
+    虚拟时间不前进，即 RPC 不消耗仿真时间。
+    """
+
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+        self.pending = 0  # 在途的线程池任务数
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None or self.pending:
+            # 没有定时器，只能等待外部事件 (如跨线程回调)
+            return super().select(None)
+
+        clock = self._clock
+        target = clock.t + timeout
+        if clock.time_scale:
+            delay = clock._wall0 + target / clock.time_scale - time.monotonic()
+            if delay > 0:
+                events = super().select(delay)
+                if events:
+                    elapsed = (time.monotonic() - clock._wall0) * clock.time_scale
+                    clock.t = max(clock.t, min(target, elapsed))
+                    return events
+        clock.t = target
+        return events
+
+
+class SimEventLoop(asyncio.SelectorEventLoop):
+    """以 SimClock 为时间源的事件循环"""
+
+    def __init__(self, clock):
+        self._sim_clock = clock
+        super().__init__(_SimSelector(clock))
+
+    def time(self):
+        return self._sim_clock.t
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._selector.pending += 1
+
+        def done(_):
+            self._selector.pending -= 1
+
+        future.add_done_callback(done)
+        return future
+
+
+class SimBody(_Remote):
+    name = _rpc("name")
+    surface_gravity = _rpc("surface_gravity")
+    reference_frame = _rpc("reference_frame")
+    equatorial_radius = _rpc("equatorial_radius")
+    gravitational_parameter = _rpc("gravitational_parameter")
+    rotational_speed = _rpc("rotational_speed")  # 仿真不模拟自转，恒为 0
+    has_atmosphere = _rpc("has_atmosphere")
+
+    def __init__(self, conn, spec):
+        super().__init__(conn)
+        self.radius = spec["radius"]
+        self.mu = spec["mu"]
+        self.rho0 = spec["rho0"]
+        self.scale_height = spec["scale_height"]
+        self.atmosphere_depth = spec["atmosphere_depth"]
+        self._name = spec["name"]
+        self._surface_gravity = self.mu / self.radius ** 2
+        self._reference_frame = object()
+        self._equatorial_radius = self.radius
+        self._gravitational_parameter = self.mu
+        self._rotational_speed = 0.0
+        self._has_atmosphere = self.atmosphere_depth > 0
+
+    def density(self, altitude):
+        if altitude >= self.atmosphere_depth:
+            return 0.0
+        return self.rho0 * math.exp(-max(altitude, 0.0) / self.scale_height)
+
+    def density_at(self, altitude):
+        self._call("density_at")
+        return self.density(altitude)
+
+
+class SimOrbit(_Remote):
+    body = _rpc("body")
+
+    def __init__(self, conn, body):
+        super().__init__(conn)
+        self._body = body
+
+
+class SimFlight(_Remote):
+    """vessel.flight() 的返回值；地表参考系 (x=上, y=北, z=东)"""
+
+    def __init__(self, conn, vessel):
+        super().__init__(conn, vessel)
+        self._vessel = vessel
+
+    def _get(name):
+        def fget(self):
+            self._call(name)
+            return getattr(self._vessel, name)
+        return property(fget)
+
+    mean_altitude = _get("mean_altitude")
+    surface_altitude = _get("surface_altitude")
+    vertical_speed = _get("vertical_speed")
+    horizontal_speed = _get("horizontal_speed")
+    speed = _get("speed")
+    velocity = _get("velocity")
+    g_force = _get("g_force")
+    dynamic_pressure = _get("dynamic_pressure")
+    del _get
+
+
+class SimControl(_Remote):
+    throttle = _rpc("throttle")
+    sas = _rpc("sas")
+    sas_mode = _rpc("sas_mode")
+
+    def __init__(self, conn, owner):
+        super().__init__(conn, owner)
+        self._throttle = 0.0
+        self._sas = False
+        self._sas_mode = SASMode.stability_assist
+        self.action_groups = {}
+
+    def set_action_group(self, group, state):
+        self._call("set_action_group")
+        self.action_groups[group] = state
+
+
+class SimAutoPilot(_Remote):
+    target_direction = _rpc("target_direction")
+    reference_frame = _rpc("reference_frame")
+
+    def __init__(self, conn, owner):
+        super().__init__(conn, owner)
+        self.engaged = False
+        self._target_direction = (1.0, 0.0, 0.0)
+        self._reference_frame = None  # 仿真不区分参考系
+
+    def engage(self):
+        self._call("engage")
+        self.engaged = True
+
+    def disengage(self):
+        self._call("disengage")
+        self.engaged = False
+
+
+class SimModule(_Remote):
+    name = _rpc("name")
+    events = _rpc("events")
+    part = _rpc("part")
+
+    def __init__(self, conn, name, events, on_event=None):
+        super().__init__(conn)
+        self._name = name
+        self._part = None
+        self._events = list(events)
+        self._on_event = on_event
+
+    def trigger_event(self, event):
+        self._call("trigger_event")
+        if event not in self._events:
+            raise ValueError(f"No such event: {event}")
+        if self._on_event:
+            self._on_event(event)
+
+
+class SimPart(_Remote):
+    title = _rpc("title")
+    modules = _rpc("modules")
+
+    def __init__(self, conn, vessel, title, modules=()):
+        super().__init__(conn)
+        self._vessel = vessel
+        self._title = title
+        self._modules = list(modules)
+        for module in self._modules:
+            module._part = self
+
+
+class SimFairing(_Remote):
+    jettisoned = _rpc("jettisoned")
+
+    def __init__(self, conn, part):
+        super().__init__(conn)
+        self.part = part
+        self._jettisoned = False
+
+    def jettison(self):
+        self._call("jettison")
+        self._jettisoned = True
+
+
+class SimDeployable(_Remote):
+    """太阳能板/天线/着陆腿/轮子的通用可展开部件"""
+    deployable = _rpc("deployable")
+    deployed = _rpc("deployed")
+
+    def __init__(self, conn, part, deployed=False, deployable=True):
+        super().__init__(conn)
+        self.part = part
+        self._deployed = deployed
+        self._deployable = deployable
+
+
+class SimParts(_Remote):
+    def __init__(self, conn, owner):
+        super().__init__(conn, owner)
+        self.registry = {"all": [], "fairings": [], "solar_panels": [], "antennas": [], "legs": [], "wheels": []}
+
+    def _get(name):
+        def fget(self):
+            self._call("parts." + name)
+            return list(self.registry[name])
+        return property(fget)
+
+    all = _get("all")
+    fairings = _get("fairings")
+    solar_panels = _get("solar_panels")
+    antennas = _get("antennas")
+    legs = _get("legs")
+    wheels = _get("wheels")
+    del _get
+
+    def modules_with_name(self, module_name):
+        self._call("parts.modules_with_name")
+        return [m for part in self.registry["all"] for m in part._modules if m._name == module_name]
+
+    def remove(self, part):
+        """仿真侧操作 (不计 RPC)：移除部件，模拟分级/解耦"""
+        for items in self.registry.values():
+            items[:] = [p for p in items if p is not part and getattr(p, "part", None) is not part]
+
+
+class SimVessel(_Remote):
+    name = _rpc("name")
+    type = _rpc("type")
+    situation = _rpc("situation")
+    mass = _rpc("mass")
+    dry_mass = _rpc("dry_mass")
+    available_thrust = _rpc("available_thrust")
+    max_vacuum_thrust = _rpc("max_vacuum_thrust")
+    vacuum_specific_impulse = _rpc("vacuum_specific_impulse")
+    kerbin_sea_level_specific_impulse = _rpc("kerbin_sea_level_specific_impulse")
+    orbit = _rpc("orbit")
+    control = _rpc("control")
+    auto_pilot = _rpc("auto_pilot")
+    parts = _rpc("parts")
+    surface_reference_frame = _rpc("surface_reference_frame")
+
+    def __init__(self, conn, vid, body, spec):
+        self.id = vid
+        self.alive = True
+        super().__init__(conn, self)
+        self.body = body
+        self._name = spec["name"]
+        self._type = VesselType[spec.get("type", "ship")]
+        self._orbit = SimOrbit(conn, body)
+        self._control = SimControl(conn, self)
+        self._auto_pilot = SimAutoPilot(conn, self)
+        self._parts = SimParts(conn, self)
+        self._surface_reference_frame = object()
+        self._flight = SimFlight(conn, self)
+
+        # 质点状态
+        self.h = spec.get("altitude", 0.0)
+        self.vz = spec.get("vertical_speed", 0.0)
+        self.vx = spec.get("horizontal_speed", 0.0)
+        self._dry_mass = spec.get("dry_mass", 10000.0)
+        self.fuel_mass = spec.get("fuel_mass", 0.0)
+        self.max_thrust = spec.get("max_thrust", 0.0)  # 真空推力 (N)
+        self.thrust_limit = spec.get("thrust_limit", 1.0)  # 发动机推力限制 (0-1，同比例限制推力与燃料流量)
+        self.isp = spec.get("isp", 300.0)  # 真空比冲 (s)
+        self.isp_sl = spec.get("isp_sl", self.isp)  # 海平面比冲 (s)
+        self.cd_area = spec.get("cd_area", 10.0)
+        self.accel = 0.0  # 非引力加速度 (m/s^2)，用于 g_force
+        self.crashed = False
+        self._situation = VesselSituation.landed if self.h <= 0 else self._airborne_situation()
+
+        self._build_parts(spec)
+
+    def _build_parts(self, spec):
+        conn, parts = self._conn, self._parts.registry
+        for i in range(spec.get("fairings", 0)):
+            module = SimModule(conn, "ModuleProceduralFairing", ["Deploy"])
+            part = SimPart(conn, self, f"Procedural Fairing {i + 1}", [module])
+            fairing = SimFairing(conn, part)
+
+            def on_event(event, fairing=fairing):
+                fairing._jettisoned = True
+
+            module._on_event = on_event
+            parts["all"].append(part)
+            parts["fairings"].append(fairing)
+        for kind, title in (("solar_panels", "Solar Panel"), ("antennas", "Antenna"),
+                            ("legs", "Landing Leg"), ("wheels", "Wheel")):
+            for i in range(spec.get(kind, 0)):
+                part = SimPart(conn, self, f"{title} {i + 1}", [SimModule(conn, "ModuleGeneric", [])])
+                parts["all"].append(part)
+                parts[kind].append(SimDeployable(conn, part))
+        # 结构件：让部件数量更接近真实飞行器
+        for i in range(spec.get("structural_parts", 0)):
+            parts["all"].append(SimPart(conn, self, f"Structural {i + 1}", [SimModule(conn, "ModuleGeneric", [])]))
+
+    def flight(self, reference_frame=None):
+        self._call("flight")
+        return self._flight
+
+    # --- 派生量 (供 Flight / 流读取) ---
+    @property
+    def _mass(self):
+        return self._dry_mass + self.fuel_mass
+
+    def _thrust_at(self, pressure):
+        """给定气压 (atm) 下的可用推力：燃料流量恒定，推力随比冲随气压变化，计入推力限制 (与 KSP 一致)"""
+        if self.fuel_mass <= 0:
+            return 0.0
+        return self.thrust_limit * self.max_thrust * (self.isp - (self.isp - self.isp_sl) * pressure) / self.isp
+
+    def available_thrust_at(self, pressure):
+        self._call("available_thrust_at")
+        return self._thrust_at(pressure)
+
+    @property
+    def _available_thrust(self):
+        return self._thrust_at(self.body.density(self.h) / self.body.rho0)
+
+    @property
+    def _max_vacuum_thrust(self):
+        # 与 KSP 一致：不计推力限制
+        return self.max_thrust
+
+    @property
+    def _vacuum_specific_impulse(self):
+        return self.isp
+
+    @property
+    def _kerbin_sea_level_specific_impulse(self):
+        return self.isp_sl
+
+    @property
+    def mean_altitude(self):
+        return self.h
+
+    @property
+    def surface_altitude(self):
+        return self.h
+
+    @property
+    def vertical_speed(self):
+        return self.vz
+
+    @property
+    def horizontal_speed(self):
+        return abs(self.vx)
+
+    @property
+    def speed(self):
+        return math.hypot(self.vz, self.vx)
+
+    @property
+    def velocity(self):
+        return (self.vz, 0.0, self.vx)
+
+    @property
+    def g_force(self):
+        return self.accel / G0
+
+    @property
+    def dynamic_pressure(self):
+        return 0.5 * self.body.density(self.h) * self.speed ** 2
+
+    def _airborne_situation(self):
+        if self.h < self.body.atmosphere_depth:
+            return VesselSituation.flying
+        return VesselSituation.sub_orbital
+
+    def _thrust_direction(self):
+        """推力方向 (竖直分量, 水平分量)，由 SAS 模式或自动驾驶目标决定"""
+        control, pilot = self._control, self._auto_pilot
+        speed = self.speed
+        if control._sas and speed > 0:
+            if control._sas_mode == SASMode.retrograde:
+                return -self.vz / speed, -self.vx / speed
+            if control._sas_mode == SASMode.prograde:
+                return self.vz / speed, self.vx / speed
+        if pilot.engaged:
+            up, _, east = pilot._target_direction
+            norm = math.hypot(up, east)
+            if norm > 0:
+                return up / norm, east / norm
+        return 1.0, 0.0
+
+    def step(self, dt):
+        """半隐式欧拉积分一步"""
+        if self._situation == VesselSituation.landed:
+            if self._control._throttle * self._available_thrust <= self._mass * self.body.mu / self.body.radius ** 2:
+                return
+
+        r = self.body.radius + self.h
+        gravity = self.body.mu / r ** 2
+        mass = self._mass
+
+        thrust = max(0.0, min(1.0, self._control._throttle)) * self._available_thrust
+        dz, dx = self._thrust_direction()
+        speed = self.speed
+        drag = 0.5 * self.body.density(self.h) * speed ** 2 * self.cd_area
+        drag_z = -drag * self.vz / speed if speed > 0 else 0.0
+        drag_x = -drag * self.vx / speed if speed > 0 else 0.0
+
+        az_ng = (thrust * dz + drag_z) / mass
+        ax_ng = (thrust * dx + drag_x) / mass
+        self.accel = math.hypot(az_ng, ax_ng)
+
+        self.vz += (az_ng - gravity + self.vx ** 2 / r) * dt
+        self.vx += ax_ng * dt
+        self.h += self.vz * dt
+        if thrust > 0:
+            flow = max(0.0, min(1.0, self._control._throttle)) * self.thrust_limit * self.max_thrust / (self.isp * G0)
+            self.fuel_mass = max(0.0, self.fuel_mass - flow * dt)
+
+        if self.h <= 0:
+            self.h = 0.0
+            if self.speed > 12.0:
+                self.crashed = True
+                self._conn._destroy(self)
+            self.vz = self.vx = 0.0
+            self._situation = VesselSituation.landed
+        else:
+            self._situation = self._airborne_situation()
+
+
+class SimStream:
+    """kRPC 流替身：读取不计 RPC；仿真时间推进后首次读取时重新取值 (相当于服务端推送)"""
+
+    def __init__(self, conn, func, args, kwargs):
+        self._conn = conn
+        self._call = (func, args, kwargs)
+        self._stamp = -1
+        self._value = None
+        self.removed = False
+
+    def __call__(self):
+        conn = self._conn
+        with conn._lock:
+            conn._advance()
+            if self._stamp != conn.steps and not self.removed:
+                func, args, kwargs = self._call
+                with conn.silent():
+                    try:
+                        self._value = func(*args, **kwargs)
+                    except RuntimeError:
+                        pass  # 对象已销毁：保留最后的值
+                self._stamp = conn.steps
+            return self._value
+
+    def remove(self):
+        self._conn._rpc("RemoveStream")
+        self.removed = True
+        self._conn.streams.discard(self)
+
+
+class _Silent:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        local = self._conn._local
+        local.silent = getattr(local, "silent", 0) + 1
+
+    def __exit__(self, *exc):
+        self._conn._local.silent -= 1
+
+
+class SimSpaceCenter(_Remote):
+    VesselType = VesselType
+    VesselSituation = VesselSituation
+    SASMode = SASMode
+
+    vessels = _rpc("vessels")
+    active_vessel = _rpc("active_vessel")
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._vessels = []
+        self._active_vessel = None
+
+
+class SimConnection:
+    """
+    仿真连接：与 krpc.connect() 返回的 Connection 用法一致。
+    rpc_count / rpc_calls 统计全部远程调用，可用于度量每个控制周期的 RPC 开销。
+    rpc_latency: 每次 RPC 的模拟往返延迟 (s)，等待期间不持有锁，多个线程的 RPC 可同时在途。
+    线程安全：可在多个 RPC 线程与事件循环线程之间共享。
+    """
+
+    def __init__(self, scenario=DEFAULT_SCENARIO, clock=None, step=0.02, body=EARTH, name=None, rpc_latency=0.0):
+        self.name = name
+        self.rpc_latency = rpc_latency
+        self.clock = clock or SimClock()
+        self.dt = step
+        self.sim_time = self.clock.t
+        self.steps = 0
+        self.rpc_count = 0
+        self.rpc_calls = Counter()
+        self.streams = set()
+        self._lock = threading.RLock()
+        self._local = threading.local()  # 线程内的 silent 嵌套深度
+        self._next_id = 1
+
+        self.body = SimBody(self, body)
+        self.space_center = SimSpaceCenter(self)
+        for spec in scenario:
+            self.spawn(spec)
+
+    # --- 仿真侧操作 (不计 RPC) ---
+    def spawn(self, spec):
+        """加入一艘新的飞行器 (例如模拟分离出的助推器)"""
+        vessel = SimVessel(self, self._next_id, self.body, spec)
+        self._next_id += 1
+        self.space_center._vessels.append(vessel)
+        if self.space_center._active_vessel is None:
+            self.space_center._active_vessel = vessel
+        return vessel
+
+    def _destroy(self, vessel):
+        vessel.alive = False
+        self.space_center._vessels = [v for v in self.space_center._vessels if v is not vessel]
+
+    def silent(self):
+        """上下文内的远程访问不计入 RPC (模拟服务端内部读取)"""
+        return _Silent(self)
+
+    def advance(self, dt):
+        """手动推进仿真时钟 (未使用 SimEventLoop 时)"""
+        self.clock.advance(dt)
+        self._advance()
+
+    def _advance(self):
+        """以固定步长把物理状态积分到时钟当前时刻"""
+        with self._lock:
+            target = self.clock.t
+            while self.sim_time + self.dt <= target + 1e-12:
+                for vessel in list(self.space_center._vessels):
+                    vessel.step(self.dt)
+                self.sim_time += self.dt
+                self.steps += 1
+
+    def _rpc(self, name):
+        if getattr(self._local, "silent", 0):
+            return
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+        with self._lock:
+            self.rpc_count += 1
+            self.rpc_calls[name] += 1
+            self._advance()
+
+    def fork(self, name=None):
+        """同一仿真世界上的另一条连接 (供 kRPC 连接池使用)：仿真连接线程安全，直接共享"""
+        return self
+
+    # --- kRPC Connection API ---
+    def add_stream(self, func, *args, **kwargs):
+        self._rpc("AddStream")
+        stream = SimStream(self, func, args, kwargs)
+        self.streams.add(stream)
+        return stream
+
+    def close(self):
+        for stream in list(self.streams):
+            stream.removed = True
+        self.streams.clear()
+
+
+class Simulation:
+    """
+    仿真连接工厂，可作为 Kernel 的 connect 参数 (可 pickle，跨进程传递)。
+    time_scale: 倍速 (如 10、100)；None 表示不限速 (虚拟时间)
+    realtime: 为 True 时使用真实时间与默认事件循环 (忽略 time_scale)
+    rpc_latency: 每次 RPC 的模拟往返延迟 (s)
+    """
+
+    def __init__(self, scenario=DEFAULT_SCENARIO, time_scale=None, step=0.02, body=EARTH, realtime=False,
+                 rpc_latency=0.0):
+        self.scenario = tuple(scenario)
+        self.time_scale = time_scale
+        self.step = step
+        self.body = body
+        self.realtime = realtime
+        self.rpc_latency = rpc_latency
+        self._clock = None
+
+    @classmethod
+    def boosters(cls, count, **kwargs):
+        """批量场景：count 枚高度/速度略有差异的下降助推器"""
+        base = DEFAULT_SCENARIO[0]
+        scenario = [
+            dict(base, name=f"RSP Booster {i + 1}", altitude=base["altitude"] + 250.0 * i)
+            for i in range(count)
+        ]
+        return cls(scenario, **kwargs)
+
+    def loop_factory(self):
+        """创建以仿真时钟为时间源的事件循环 (传给 asyncio.run)"""
+        if self.realtime:
+            self._clock = WallClock()
+            return asyncio.new_event_loop()
+        self._clock = SimClock(self.time_scale)
+        return SimEventLoop(self._clock)
+
+    def __call__(self, name=None, **kwargs):
+        clock = self._clock or (WallClock() if self.realtime else SimClock(self.time_scale))
+        return SimConnection(self.scenario, clock, step=self.step, body=self.body, name=name,
+                             rpc_latency=self.rpc_latency)
@@ -0,0 +1,110 @@
+"""
+遥测快照模块
+"""
+
+import time
+from dataclasses import dataclass
+from utility import Rlogger
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetrySnapshot:
+    """
+    单个控制周期内的飞行状态快照 (不可变)。
+    字段名与 kRPC Flight 对象保持一致，便于直接替换 vessel.flight() 的读取。
+    seq/timestamp 由采样阶段写入，消费者据此区分新旧数据。
+    """
+    seq: int
+    timestamp: float
+    mean_altitude: float
+    surface_altitude: float
+    vertical_speed: float
+    horizontal_speed: float
+    speed: float
+    velocity: tuple
+    g_force: float
+    dynamic_pressure: float
+    situation: object
+    mass: float
+    available_thrust: float
+    surface_gravity: float
+
+    def age(self, now=None) -> float:
+        """快照距今的秒数"""
+        return (time.monotonic() if now is None else now) - self.timestamp
+
+
+class VesselTelemetry:
+    """
+    基于 kRPC 流 (Stream) 的单舰遥测层，也是该舰唯一的采样阶段。
+    每个 vessel 只注册一次流，之后由服务端推送更新；
+    snapshot() 仅读取本地缓存值，不产生任何 RPC，并发布为 latest，
+    控制回路与遥测推送共享同一份样本。
+    """
+
+    # 来自 vessel.flight() (默认的地表参考系) 的字段
+    FLIGHT_FIELDS = (
+        "mean_altitude",
+        "surface_altitude",
+        "g_force",
+        "dynamic_pressure",
+    )
+    # 来自 vessel.flight(天体参考系) 的速度字段：地表参考系的原点随飞行器移动，其中的速度恒为 0
+    BODY_FIELDS = (
+        "vertical_speed",
+        "horizontal_speed",
+        "speed",
+        "velocity",
+    )
+    # 来自 vessel 本身的字段
+    VESSEL_FIELDS = ("situation", "mass", "available_thrust")
+
+    def __init__(self, conn, vessel):
+        self.conn = conn
+        self.vessel = vessel
+        self._streams = {}
+        self._seq = 0
+        self.latest = None  # 最近一次发布的快照
+        # 天体表面重力与参考系在整个任务中不变，注册时读取一次即可
+        body = vessel.orbit.body
+        self.surface_gravity = body.surface_gravity
+        self.reference_frame = body.reference_frame  # 速度字段 (含 velocity 向量) 所在的参考系
+        self.open()
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._streams)
+
+    def open(self):
+        """注册全部遥测流 (幂等)"""
+        if self._streams:
+            return
+        flight = self.vessel.flight()
+        for field in self.FLIGHT_FIELDS:
+            self._streams[field] = self.conn.add_stream(getattr, flight, field)
+        flight = self.vessel.flight(self.reference_frame)
+        for field in self.BODY_FIELDS:
+            self._streams[field] = self.conn.add_stream(getattr, flight, field)
+        for field in self.VESSEL_FIELDS:
+            self._streams[field] = self.conn.add_stream(getattr, self.vessel, field)
+
+    def snapshot(self) -> TelemetrySnapshot:
+        """读取所有流的最新值，组装为带序号与时间戳的快照并发布"""
+        values = {field: stream() for field, stream in self._streams.items()}
+        self._seq += 1
+        self.latest = TelemetrySnapshot(
+            seq=self._seq,
+            timestamp=time.monotonic(),
+            surface_gravity=self.surface_gravity,
+            **values,
+        )
+        return self.latest
+
+    def close(self):
+        """注销全部遥测流，释放服务端资源"""
+        for field, stream in self._streams.items():
+            try:
+                stream.remove()
+            except Exception as e:
+                Rlogger("Telemetry").debug("注销遥测流 %s 失败: %s", field, e)
+        self._streams.clear()
@@ -0,0 +1,235 @@
+"""
+转移窗口规划模块：基于向量化 Lambert 求解器的 porkchop (出发时刻 × 飞行时间) Δv 网格搜索
+
+输入为开普勒根数描述的两条轨道 (不依赖星历，可完全离线运行)；
+大网格按出发时刻分块，由进程池并行计算。
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from utility import Rlogger
+from .orbit import OrbitCalc
+
+
+@dataclass(frozen=True)
+class KeplerOrbit:
+    """
+    开普勒轨道 (椭圆)。角度单位为弧度，epoch 时刻的平近点角为 mean_anomaly。
+    mu 为中心天体引力参数 (m^3/s^2)。
+    """
+    a: float
+    e: float
+    mu: float
+    inclination: float = 0.0
+    raan: float = 0.0
+    arg_periapsis: float = 0.0
+    mean_anomaly: float = 0.0
+    epoch: float = 0.0
+
+    @property
+    def period(self):
+        return 2 * math.pi * math.sqrt(self.a**3 / self.mu)
+
+    def state(self, t):
+        """t 时刻 (标量或数组) 的位置与速度，返回形状 (..., 3) 的两个数组"""
+        t = np.asarray(t, dtype=np.float64)
+        n = math.sqrt(self.mu / self.a**3)
+        M = np.mod(self.mean_anomaly + n * (t - self.epoch), 2 * math.pi)
+
+        # 牛顿法解开普勒方程 E - e·sinE = M
+        E = M + self.e * np.sin(M) if self.e < 0.8 else np.full_like(M, math.pi)
+        for _ in range(30):
+            delta = (E - self.e * np.sin(E) - M) / (1 - self.e * np.cos(E))
+            E = E - delta
+            if np.all(np.abs(delta) < 1e-13):
+                break
+
+        cos_e, sin_e = np.cos(E), np.sin(E)
+        b = math.sqrt(1 - self.e**2)
+        r = self.a * (1 - self.e * cos_e)
+        # 近焦点坐标系
+        x = self.a * (cos_e - self.e)
+        y = self.a * b * sin_e
+        factor = math.sqrt(self.mu * self.a) / r
+        vx = -factor * sin_e
+        vy = factor * b * cos_e
+
+        rot = self._rotation()
+        position = np.stack([x, y], axis=-1) @ rot[:, :2].T
+        velocity = np.stack([vx, vy], axis=-1) @ rot[:, :2].T
+        return position, velocity
+
+    def _rotation(self):
+        """近焦点坐标系 -> 参考坐标系的旋转矩阵 R3(-Ω)·R1(-i)·R3(-ω)"""
+        co, so = math.cos(self.raan), math.sin(self.raan)
+        ci, si = math.cos(self.inclination), math.sin(self.inclination)
+        cw, sw = math.cos(self.arg_periapsis), math.sin(self.arg_periapsis)
+        return np.array([
+            [co * cw - so * sw * ci, -co * sw - so * cw * ci, so * si],
+            [so * cw + co * sw * ci, -so * sw + co * cw * ci, -co * si],
+            [sw * si, cw * si, ci],
+        ])
+
+
+def _stumpff(z):
+    """Stumpff 函数 C(z)、S(z) (向量化，z≈0 时使用级数展开)"""
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+    pos, neg = z > 1e-6, z < -1e-6
+    small = ~(pos | neg)
+
+    sz = np.sqrt(z[pos])
+    c[pos] = (1 - np.cos(sz)) / z[pos]
+    s[pos] = (sz - np.sin(sz)) / sz**3
+
+    sz = np.sqrt(-z[neg])
+    c[neg] = (np.cosh(sz) - 1) / -z[neg]
+    s[neg] = (np.sinh(sz) - sz) / sz**3
+
+    zs = z[small]
+    c[small] = 1 / 2 - zs / 24 + zs**2 / 720
+    s[small] = 1 / 6 - zs / 120 + zs**2 / 5040
+    return c, s
+
+
+def lambert_batch(r1, r2, tof, mu, prograde=True, tol=1e-12, max_iter=100):
+    """
+    向量化 Lambert 求解 (全局变量法，零圈)。
+    r1, r2: (N, 3) 出发/到达位置；tof: (N,) 飞行时间 (s)
+    返回 (v1, v2)，形状 (N, 3)；无解 (如转移角接近 180°) 的行为 nan。
+    """
+    r1 = np.atleast_2d(np.asarray(r1, dtype=np.float64))
+    r2 = np.atleast_2d(np.asarray(r2, dtype=np.float64))
+    tof = np.broadcast_to(np.asarray(tof, dtype=np.float64), (len(r1),))
+    n1 = np.linalg.norm(r1, axis=1)
+    n2 = np.linalg.norm(r2, axis=1)
+
+    cos_dtheta = np.clip(np.einsum("ij,ij->i", r1, r2) / (n1 * n2), -1.0, 1.0)
+    cross_z = r1[:, 0] * r2[:, 1] - r1[:, 1] * r2[:, 0]
+    dtheta = np.arccos(cos_dtheta)
+    retro = cross_z < 0 if prograde else cross_z >= 0
+    dtheta = np.where(retro, 2 * math.pi - dtheta, dtheta)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        A = np.sin(dtheta) * np.sqrt(n1 * n2 / (1 - cos_dtheta))
+        sqrt_mu = math.sqrt(mu)
+
+        def residual(z):
+            c, s = _stumpff(z)
+            y = n1 + n2 + A * (z * s - 1) / np.sqrt(c)
+            f = (y / c) ** 1.5 * s + A * np.sqrt(y) - sqrt_mu * tof
+            # y < 0 说明 z 过小 (飞行时间被低估)
+            return np.where(y < 0, -np.inf, f), y, c
+
+        # F(z) 随 z 单调递增：在 [-4π, 4π²) 上二分
+        lo = np.full(len(r1), -4 * math.pi)
+        hi = np.full(len(r1), 4 * math.pi**2 - 1e-9)
+        for _ in range(max_iter):
+            mid = 0.5 * (lo + hi)
+            f, _, _ = residual(mid)
+            below = f < 0
+            lo = np.where(below, mid, lo)
+            hi = np.where(below, hi, mid)
+            if np.nanmax(hi - lo) < tol:
+                break
+
+        z = 0.5 * (lo + hi)
+        _, y, _ = residual(z)
+        f = 1 - y / n1
+        g = A * np.sqrt(y / mu)
+        gdot = 1 - y / n2
+        v1 = (r2 - f[:, None] * r1) / g[:, None]
+        v2 = (gdot[:, None] * r2 - r1) / g[:, None]
+
+    invalid = ~np.isfinite(A) | (np.abs(A) < 1e-9 * (n1 + n2)) | (y < 0)
+    v1[invalid] = np.nan
+    v2[invalid] = np.nan
+    return v1, v2
+
+
+def _burn_dv(v_inf, body):
+    """双曲剩余速度 -> 从半径 r 的圆停泊轨道出发/捕获所需 Δv (body = (mu, r))；body 为 None 时直接返回 v∞"""
+    if body is None:
+        return v_inf
+    mu, r = body
+    v_hyper = np.sqrt(v_inf**2 + 2 * mu / r)
+    return v_hyper - OrbitCalc.vis_viva_batch(r, r, mu)
+
+
+def _evaluate(origin, target, departures, tofs, mu, prograde, departure_body, arrival_body):
+    """计算一个出发时刻分块的 Δv 网格 (进程池任务，须为模块级函数)"""
+    dep, tof = np.meshgrid(departures, tofs, indexing="ij")
+    r1, v_origin = origin.state(dep.ravel())
+    r2, v_target = target.state((dep + tof).ravel())
+    v1, v2 = lambert_batch(r1, r2, tof.ravel(), mu, prograde)
+
+    dv_dep = _burn_dv(np.linalg.norm(v1 - v_origin, axis=1), departure_body)
+    dv_arr = _burn_dv(np.linalg.norm(v2 - v_target, axis=1), arrival_body)
+    shape = dep.shape
+    return dv_dep.reshape(shape), dv_arr.reshape(shape)
+
+
+@dataclass(frozen=True)
+class PorkchopResult:
+    """porkchop 网格搜索结果：dv* 数组形状为 (出发时刻数, 飞行时间数)，nan 表示无解"""
+    departures: np.ndarray
+    tofs: np.ndarray
+    dv: np.ndarray
+    dv_departure: np.ndarray
+    dv_arrival: np.ndarray
+    best_departure: float
+    best_tof: float
+    best_dv: float
+
+
+class TransferPlanner:
+    """
+    转移窗口搜索引擎。
+    workers: 进程池大小 (默认 CPU 数)；网格点数小于 parallel_threshold 时在当前进程直接计算
+    departure_body / arrival_body: 可选 (mu, 停泊轨道半径)，给出时 Δv 按停泊轨道点火计算，否则为 v∞
+    """
+
+    def __init__(self, origin: KeplerOrbit, target: KeplerOrbit, workers=None, parallel_threshold=40000,
+                 departure_body=None, arrival_body=None, prograde=True):
+        if origin.mu != target.mu:
+            raise ValueError("出发与目标轨道必须围绕同一中心天体")
+        self.origin = origin
+        self.target = target
+        self.mu = origin.mu
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.departure_body = departure_body
+        self.arrival_body = arrival_body
+        self.prograde = prograde
+
+    def porkchop(self, departures, tofs):
+        """在 出发时刻 × 飞行时间 网格上计算 Δv，返回 PorkchopResult (含最优点与完整 Δv 曲面)"""
+        departures = np.asarray(departures, dtype=np.float64)
+        tofs = np.asarray(tofs, dtype=np.float64)
+        args = (self.mu, self.prograde, self.departure_body, self.arrival_body)
+
+        if departures.size * tofs.size < self.parallel_threshold or self.workers <= 1:
+            dv_dep, dv_arr = _evaluate(self.origin, self.target, departures, tofs, *args)
+        else:
+            chunks = np.array_split(departures, min(self.workers * 4, len(departures)))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = list(pool.map(
+                    _evaluate,
+                    *zip(*((self.origin, self.target, chunk, tofs, *args) for chunk in chunks)),
+                ))
+            dv_dep = np.concatenate([p[0] for p in parts])
+            dv_arr = np.concatenate([p[1] for p in parts])
+
+        dv = dv_dep + dv_arr
+        if np.all(np.isnan(dv)):
+            Rlogger("Transfer").warning("porkchop 网格内没有可行的转移")
+            best = (math.nan, math.nan, math.nan)
+        else:
+            i, j = np.unravel_index(np.nanargmin(dv), dv.shape)
+            best = (float(departures[i]), float(tofs[j]), float(dv[i, j]))
+        return PorkchopResult(departures, tofs, dv, dv_dep, dv_arr, *best)
@@ -0,0 +1,40 @@
+"""
+飞行记录回放入口
+
+用法:
+    uv run replay.py flight_logs/flight_20260101_120000.fdr            # 1x 重放到仪表盘
+    uv run replay.py <file> --speed 0                                  # 尽可能快
+    uv run replay.py <file> --rocker <vessel_id>                       # 重放到 RockerCore 决策逻辑并比对油门
+"""
+
+import argparse
+import asyncio
+import math
+from utility import Rlogger, Dashboard
+from core.recorder import FlightReplay
+
+
+async def main(args):
+    replay = FlightReplay(args.file)
+    speed = args.speed or None
+    Rlogger("Replay").info(f"开始回放 {args.file}: {replay.count} 条记录, 飞行器 {replay.vessel_ids()}")
+
+    if args.rocker:
+        results = await replay.play_rocker(args.rocker, speed=speed)
+        mismatched = 0
+        for record, controls in results:
+            recorded = float(record["throttle"])
+            replayed = controls["throttle"]
+            if replayed is not None and not math.isnan(recorded) and replayed != recorded:
+                mismatched += 1
+        print(f"回放周期: {len(results)}, 油门决策不一致: {mismatched}")
+    else:
+        await replay.play_dashboard(Dashboard(None, None), speed=speed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSP 飞行记录回放")
+    parser.add_argument("file", help="飞行记录文件 (.fdr)")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速，0 表示尽可能快")
+    parser.add_argument("--rocker", help="重放到 RockerCore 决策逻辑的飞行器 ID")
+    asyncio.run(main(parser.parse_args()))
@@ -1,13 +1,15 @@
+import argparse
 import asyncio
 import multiprocessing as mp
-from utility import Rlogger, Dashboard
-from core import Kernel
+from utility import Rlogger, MissionLogger, Dashboard, TelemetryRing, PerfBoard, config
+from core import Kernel, ShardedKernel
 from core.ai_service import AIService
+from core.simkrpc import Simulation
 
 
-async def main():
-    # 1. 创建进程间通信队列
-    data_queue = mp.Queue()  # Telemetry: Control -> UI
+async def main(args):
+    # 1. 创建进程间通信通道
+    telemetry_ring = TelemetryRing.create()  # Telemetry: Control -> UI (共享内存)
     cmd_queue = mp.Queue()   # Commands: UI -> Control
     
     # AI 服务队列
@@ -20,10 +22,23 @@ async def main():
     # 3. 启动控制内核（在独立子进程中）
     # 内核会自动连接 kRPC 并管理 RockerCore 实例
     # 将 AI 队列传递给内核，以便内核中的 RockerCore 发起 AI 请求
-    kernel = Kernel(data_queue, cmd_queue, ai_req_queue, ai_res_queue)
+    # --sim 时使用离线仿真代替 KSP (time_scale 为 0 表示不限速)
+    connect = Simulation(time_scale=args.time_scale or None) if args.sim else None
+    # 分片数大于 1 时，飞行器分配到多个内核分片进程并行控制
+    shards = args.shards or config.get("kernel", {}).get("shards", 1)
+    # 性能看板：每个内核进程一行 (分片模式下协调进程占第 0 行)
+    perf_board = PerfBoard.create(rows=shards + 1 if shards > 1 else 1)
+    if args.profile:
+        perf_board.request_profile(args.profile)
+    if shards > 1:
+        kernel = ShardedKernel(telemetry_ring, cmd_queue, ai_req_queue, ai_res_queue, connect=connect, shards=shards,
+                               perf_board=perf_board)
+    else:
+        kernel = Kernel(telemetry_ring, cmd_queue, ai_req_queue, ai_res_queue, connect=connect, perf_board=perf_board)
 
     # 4. 启动仪表盘（在主进程中）
-    ui = Dashboard(data_queue, cmd_queue)
+    ui = Dashboard(telemetry_ring, cmd_queue, perf_board)
+    ui.switch_mode(args.view)
 
     Rlogger("Sync").info("系统重构完成：进入三进程协同模式 (Kernel + AI + UI)。")
 
@@ -33,16 +48,29 @@ async def main():
     except asyncio.CancelledError:
         Rlogger("Sync").info("系统正在关闭...")
     finally:
-        # 清理工作（可选）
-        pass
+        # 释放共享内存
+        if isinstance(kernel, ShardedKernel):
+            kernel.close()
+        telemetry_ring.close()
+        perf_board.close()
 
 
 if __name__ == "__main__":
     # Windows 下使用 multiprocessing 必须在 if __name__ == "__main__": 下
     mp.freeze_support()
+    # 日志写入进程：各进程的日志经队列汇总到同一个文件，须在创建其他子进程之前启动
+    MissionLogger.start_writer()
+    parser = argparse.ArgumentParser(description="RSP 火箭控制系统")
+    parser.add_argument("--sim", action="store_true", help="使用离线 kRPC 仿真代替 KSP")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="仿真倍速，0 表示不限速")
+    parser.add_argument("--shards", type=int, default=None, help="内核分片进程数 (默认读取 [kernel].shards)")
+    parser.add_argument("--view", choices=("surface", "table", "perf"), default="surface", help="仪表盘视图")
+    parser.add_argument("--profile", type=float, default=0, help="启动后对内核进程采样分析的时长 (s)，0 表示不采样")
     try:
-        asyncio.run(main())
+        asyncio.run(main(parser.parse_args()))
     except KeyboardInterrupt:
         pass
     except Exception as e:
         Rlogger("Sync").error(f"系统崩溃: {e}")
+    finally:
+        MissionLogger.stop_writer()
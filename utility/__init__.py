@@ -3,17 +3,32 @@ Utility 模块：航天任务支持工具包
 """
 
 # 1. 内部转发 (Promotion)
-from .log import Rlogger
+from .log import Rlogger, LogThrottle, MissionLogger
 from .utils import Utils
+from .part_index import PartIndex
+from .deployables import DeployableState
 from .config import config
 from .dashboard import Dashboard
+from .telemetry_ring import TelemetryRing
+from .perf import PerfBoard, PerfCounters
+from .telemetry_record import TELEMETRY_DTYPE, MissionMode, FlightState
 
 # 2. 定义对外暴露的接口
 __all__ = [
     "Rlogger",
+    "LogThrottle",
+    "MissionLogger",
     "Utils",
+    "PartIndex",
+    "DeployableState",
     "config",
-    "Dashboard"
+    "Dashboard",
+    "TelemetryRing",
+    "PerfBoard",
+    "PerfCounters",
+    "TELEMETRY_DTYPE",
+    "MissionMode",
+    "FlightState"
 ]
 
 # 3. 蓝桥杯进阶知识点：
@@ -2,26 +2,72 @@
 仪表盘模块
 """
 
+import sys
 import time
 import asyncio
 from .log import Rlogger
+from .config import config
+from .telemetry_record import to_dicts
+from .perf import PERF_STAGES, percentile
 
 
 class Dashboard:
     """
-    仪表盘系统 - 运行在主进程，通过 Queue 消费来自控制进程的遥测数据
+    仪表盘系统 - 运行在主进程，从共享内存环形缓冲区读取控制进程的最新遥测帧
+    渲染采用差分刷新：保留上一帧的行内容，仅通过光标定位重写发生变化的行，
+    刷新率独立于遥测频率，由 [dashboard].max_fps 限制。
+    perf 视图读取性能看板 (PerfBoard)，按相邻两次发布的差值显示各阶段的频率、耗时分位数与 RPC 开销
     """
 
-    def __init__(self, data_queue, cmd_queue):
-        self.data_queue = data_queue
+    WIDTH = 50
+
+    # 预先构造的行模板 (标签, 格式, 数据键)
+    SURFACE_ROWS = (
+        ("海拔高度 (Alt)", "{:>12.2f} m", "alt"),
+        ("飞行速度 (Spd)", "{:>12.2f} m/s", "spd"),
+        ("垂直速度 (V-Spd)", "{:>12.2f} m/s", "v_spd"),
+        ("重力载荷 (G-F)", "{:>12.2f} G", "g"),
+        ("样本年龄 (Age)", "{:>12.2f} s", "age"),
+        ("控制频率 (Rate)", "{:>12.1f} Hz", "rate"),
+        ("控制周期 (Period)", "{:>12.3f} s", "period"),
+        ("周期抖动 (Jitter)", "{:>12.4f} s", "jitter"),
+        ("超期次数 (Overrun)", "{:>12d}", "overruns"),
+    )
+    TABLE_HEADER = (
+        f" {'ID':<10} {'名称':<14} {'模式':<9} {'状态':<9} {'高度(m)':>10} {'速度':>8} {'垂速':>8} {'G':>5}"
+        f" {'Hz':>5} {'抖动ms':>6} {'超期':>5}"
+    )
+    TABLE_ROW = (
+        " {:<10.10} {:<14.14} {:<9.9} {:<9.9} {:>10.0f} {:>8.1f} {:>8.1f} {:>5.2f}"
+        " {:>5.1f} {:>6.2f} {:>5d}"
+    )
+    PERF_HEADER = f" {'阶段':<12} {'次/s':>8} {'均值ms':>8} {'p50ms':>8} {'p99ms':>8} {'RPC/次':>7} {'RPC等待ms':>9}"
+    PERF_ROW = " {:<12.12} {:>8.1f} {:>8.3f} {:>8.3f} {:>8.3f} {:>7.2f} {:>9.3f}"
+    PERF_SUMS = ("count", "total", "rpc", "rpc_wait", "hist", "ai_count", "ai_total", "ai_hist")
+
+    def __init__(self, telemetry_ring, cmd_queue, perf_board=None):
+        self.telemetry_ring = telemetry_ring
         self.cmd_queue = cmd_queue
+        self.perf_board = perf_board  # 性能看板 (可选，perf 视图使用)
+        self.last_seq = 0  # 最近渲染的遥测帧序号
+        self.last_perf = None  # 上一次读取的性能计数汇总 (用于计算窗口差值)
 
         self.tracking_id = None  # 当前追踪的火箭 ID
-        self.display_mode = "surface"  # surface | orbit
+        self.display_mode = "surface"  # surface | orbit | table | perf
+
+        ui_cfg = config.get("dashboard", {})
+        self.max_fps = ui_cfg.get("max_fps", 10)  # 最大重绘频率
+        self.max_rows = ui_cfg.get("max_rows", 30)  # 表格视图最多显示的飞行器数
+        self.surface_rows = tuple(
+            (f" {label:<20}: ", fmt, key) for label, fmt, key in self.SURFACE_ROWS
+        )
 
         # UI 渲染相关
-        print("\033[2J\033[H", end="", flush=True)
-        self.lines = []
+        self.out = sys.stdout
+        self.out.write("\033[2J\033[H")
+        self.out.flush()
+        self.lines = []  # 上一帧已输出到终端的行
+        self.bytes_written = 0  # 累计终端写入量 (用于观察刷新开销)
 
     def switch_vessel(self, vessel_id):
         """发送指令切换追踪目标"""
@@ -33,59 +79,157 @@ class Dashboard:
         self.display_mode = mode
         Rlogger("Dashboard").info(f"UI 切换显示模式: {mode}")
 
-    def render(self, all_telemetry):
-        """渲染单帧界面"""
-        if not all_telemetry:
-            return
-
+    def _layout_single(self, all_telemetry):
+        """单舰详情视图"""
         # 如果没有指定追踪 ID，默认追踪第一个
         if self.tracking_id not in all_telemetry:
             self.tracking_id = next(iter(all_telemetry.keys()))
 
         data = all_telemetry[self.tracking_id]
+        lines = [
+            "=" * self.WIDTH,
+            f"{f'KSP 任务控制中心 - {data['name']}':^{self.WIDTH}}",
+            f"{f'ID: {self.tracking_id} | 模式: {self.display_mode.upper()}':^{self.WIDTH}}",
+            "=" * self.WIDTH,
+        ]
+        # 动态渲染可选数据项 (缺失字段跳过，避免单个字段缺失中断渲染)
+        for prefix, fmt, key in self.surface_rows:
+            value = data.get(key)
+            if value is not None:
+                lines.append(prefix + fmt.format(value))
+        return lines
+
+    def _layout_table(self, all_telemetry):
+        """多舰表格视图"""
+        lines = [
+            "=" * self.WIDTH,
+            f"{'KSP 任务控制中心 - 全部飞行器':^{self.WIDTH}}",
+            "=" * self.WIDTH,
+            self.TABLE_HEADER,
+        ]
+        for vid in sorted(all_telemetry)[: self.max_rows]:
+            data = all_telemetry[vid]
+            lines.append(self.TABLE_ROW.format(
+                vid, data["name"], data["mode"], data["state"],
+                data["alt"], data["spd"], data["v_spd"], data["g"],
+                data.get("rate", 0.0), data.get("jitter", 0.0) * 1e3, data.get("overruns", 0),
+            ))
+        hidden = len(all_telemetry) - self.max_rows
+        if hidden > 0:
+            lines.append(f" ... 另有 {hidden} 个飞行器未显示")
+        return lines
+
+    def _perf_totals(self, rows):
+        """汇总各内核进程的累计计数"""
+        totals = {key: rows[key].sum(axis=0) for key in self.PERF_SUMS}
+        totals["timestamp"] = rows["timestamp"].max()
+        return totals
+
+    def _layout_perf(self, rows):
+        """性能视图：各阶段在上一个发布周期内的统计"""
+        totals = self._perf_totals(rows)
+        prev, self.last_perf = self.last_perf, totals
+        lines = [
+            "=" * self.WIDTH,
+            f"{'KSP 任务控制中心 - 控制回路性能':^{self.WIDTH}}",
+            "=" * self.WIDTH,
+            f" 内核进程: {len(rows)} | 飞行器: {rows['vessels'].sum()} | 负载: "
+            + " / ".join(f"{load:.0%}" for load in rows["load"].tolist())
+            + (" | 采样分析中" if rows["profiling"].any() else ""),
+        ]
+        window = totals["timestamp"] - prev["timestamp"] if prev else 0.0
+        # 首次读取或内核进程重启 (计数回退) 时没有可用的窗口
+        if window <= 0 or (totals["count"] < prev["count"]).any():
+            lines.append(" 等待下一次发布...")
+            return lines
+
+        delta = {key: totals[key] - prev[key] for key in self.PERF_SUMS}
+        lines.append(self.PERF_HEADER)
+        for i, stage in enumerate(PERF_STAGES):
+            count = delta["count"][i]
+            if count <= 0:
+                continue
+            lines.append(self.PERF_ROW.format(
+                stage, count / window, delta["total"][i] / count * 1e3,
+                percentile(delta["hist"][i], 0.5) * 1e3, percentile(delta["hist"][i], 0.99) * 1e3,
+                delta["rpc"][i] / count, delta["rpc_wait"][i] / count * 1e3,
+            ))
+        ai_count = delta["ai_count"]
+        if ai_count > 0:
+            lines.append(
+                f" AI 往返: {ai_count / window:.1f} 次/s | 均值 {delta['ai_total'] / ai_count * 1e3:.1f} ms"
+                f" | p99 {percentile(delta['ai_hist'], 0.99) * 1e3:.1f} ms"
+            )
+        return lines
+
+    def render_perf(self, rows):
+        """渲染性能视图"""
+        lines = self._layout_perf(rows)
+        lines.append("=" * self.WIDTH)
+        lines.append(f" 统计窗口: 相邻两次发布 | 刷新: {time.strftime('%H:%M:%S')}")
+        lines.append("-" * self.WIDTH)
+        self._flush(lines)
 
-        self.lines = []
-        self.lines.append("=" * 50)
-        self.lines.append(f"{f'KSP 任务控制中心 - {data['name']}':^50}")
-        self.lines.append(
-            f"{f'ID: {self.tracking_id} | 模式: {self.display_mode.upper()}':^50}"
-        )
-        self.lines.append("=" * 50)
-
-        # 动态渲染可选数据项
-        telemetry_items = {
-            "海拔高度 (Alt)": f"{data['alt']:>12.2f} m",
-            "飞行速度 (Spd)": f"{data['spd']:>12.2f} m/s",
-            "重力载荷 (G-F)": f"{data['g']:>12.2f} G",
-            "大气密度 (Rho)": f"{data['rho']:>12.4f} kg/m³",
-        }
-
-        for label, value in telemetry_items.items():
-            self.lines.append(f" {label:<20}: {value}\033[K")
-
-        self.lines.append("=" * 50)
-        self.lines.append(
-            f" 已发现火箭数量: {len(all_telemetry)} | 刷新: {time.strftime('%H:%M:%S')}\033[K"
-        )
-        self.lines.append("-" * 50 + "\033[K")
+    def render(self, all_telemetry):
+        """渲染单帧界面 (仅重写变化的行)"""
+        if not all_telemetry:
+            return
 
-        output = "\033[H" + "\n".join(self.lines)
-        print(output, flush=True)
+        if self.display_mode == "table":
+            lines = self._layout_table(all_telemetry)
+        else:
+            lines = self._layout_single(all_telemetry)
+
+        lines.append("=" * self.WIDTH)
+        lines.append(
+            f" 已发现火箭数量: {len(all_telemetry)} | 刷新: {time.strftime('%H:%M:%S')}"
+        )
+        lines.append("-" * self.WIDTH)
+
+        self._flush(lines)
+
+    def _flush(self, lines):
+        """与上一帧逐行比较，使用光标定位只输出变化的行"""
+        prev = self.lines
+        chunks = []
+        for row, line in enumerate(lines):
+            if row >= len(prev) or prev[row] != line:
+                chunks.append(f"\033[{row + 1};1H{line}\033[K")
+        # 新帧更短时清除多余的旧行
+        for row in range(len(lines), len(prev)):
+            chunks.append(f"\033[{row + 1};1H\033[K")
+
+        self.lines = lines
+        if chunks:
+            output = "".join(chunks)
+            self.bytes_written += len(output)
+            self.out.write(output)
+            self.out.flush()
 
     async def watch(self):
-        """持续从队列获取数据并渲染"""
+        """按固定重绘频率读取最新帧并渲染，与遥测写入频率解耦"""
         Rlogger("Dashboard").info("UI 渲染循环启动...")
+        interval = 1 / self.max_fps
+        perf_seqs = None
         try:
             while True:
-                # 非阻塞获取最新数据
-                latest_data = None
-                while not self.data_queue.empty():
-                    latest_data = self.data_queue.get_nowait()
-
-                if latest_data:
-                    self.render(latest_data)
-
-                await asyncio.sleep(0.1)
+                if self.display_mode == "perf" and self.perf_board is not None:
+                    # 性能计数按发布周期更新，任一进程发布了新计数时重绘
+                    rows = self.perf_board.read()
+                    seqs = rows["seq"].tolist()
+                    if len(rows) and seqs != perf_seqs:
+                        perf_seqs = seqs
+                        self.render_perf(rows)
+                    await asyncio.sleep(interval)
+                    continue
+
+                # 只读取最新一帧，中间帧直接跳过
+                seq, rows = self.telemetry_ring.read()
+                if seq != self.last_seq and rows is not None:
+                    self.last_seq = seq
+                    self.render(to_dicts(rows))
+
+                await asyncio.sleep(interval)
         except Exception as e:
             Rlogger("Dashboard").error(f"UI 渲染异常: {e}")
             Rlogger("Dashboard").error(f"仪表盘监控异常: {e}")
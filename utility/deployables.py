@@ -0,0 +1,127 @@
+"""
+可展开部件状态模块
+"""
+
+import time
+from .log import Rlogger, LogThrottle
+
+
+class DeployableState:
+    """
+    可展开部件 (太阳能板/天线/着陆腿/轮子) 的本地状态模型。
+    部件由 PartIndex 发现 (每个索引版本一次)，deployed 状态通过 kRPC 流订阅，
+    状态查询只读本地缓存，不产生 RPC；部件数量变化 (分级) 时同步增删流。
+    写入后、流确认之前以写入值为准 (超过 confirm_timeout 仍未确认则以流的值为准)，
+    避免展开动画期间被重复写入。
+    未提供 conn (如离线回放) 时退化为直接读取 deployed。
+    """
+
+    # 分组 -> 部件类别；payload 只包含可控 (deployable) 的部件
+    GROUPS = {
+        "payload": ("solar_panels", "antennas"),
+        "landing": ("legs", "wheels"),
+    }
+
+    def __init__(self, part_index, conn=None, confirm_timeout=5.0, clock=time.monotonic):
+        self.part_index = part_index
+        self.conn = conn
+        self.confirm_timeout = confirm_timeout
+        self.clock = clock  # 时间来源 (s)：离线仿真时为事件循环的虚拟时间
+        self._generation = None
+        self._groups = {}
+        self._streams = {}  # 部件句柄 -> deployed 流
+        self._written = {}  # 部件句柄 -> (写入值, 写入时刻)
+        self._log = LogThrottle(Rlogger("Deployables"))  # 状态查询在控制周期内执行：失败日志按类型限频
+
+    def _sync(self):
+        """部件索引重建后重新发现部件：为新增部件注册流，注销已消失部件的流"""
+        self.part_index.refresh()
+        if self._generation == self.part_index.generation:
+            return
+        self._generation = self.part_index.generation
+
+        groups = {}
+        for group, categories in self.GROUPS.items():
+            groups[group] = [
+                comp
+                for category in categories
+                for comp in self.part_index.category(category)
+                # deployable 不随时间变化，发现时读取一次即可
+                if group != "payload" or comp.deployable
+            ]
+        present = {comp for items in groups.values() for comp in items}
+
+        for comp in [c for c in self._streams if c not in present]:
+            self._remove_stream(comp)
+        for comp in [c for c in self._written if c not in present]:
+            del self._written[comp]
+        if self.conn is not None:
+            for comp in present:
+                if comp not in self._streams:
+                    try:
+                        self._streams[comp] = self.conn.add_stream(getattr, comp, "deployed")
+                    except Exception as e:
+                        Rlogger("Deployables").debug("注册部件状态流失败 (%s): %s", type(comp).__name__, e)
+        self._groups = groups
+
+    def _remove_stream(self, comp):
+        stream = self._streams.pop(comp)
+        try:
+            stream.remove()
+        except Exception as e:
+            Rlogger("Deployables").debug("注销部件状态流失败: %s", e)
+
+    def _deployed(self, comp, now):
+        stream = self._streams.get(comp)
+        try:
+            value = stream() if stream else comp.deployed
+        except Exception as e:
+            # 部件已不存在：下次查询时强制检查部件数量
+            self._log.debug("read", "读取部件状态失败: %s", e)
+            self.part_index.refresh(force=True)
+            value = None
+
+        written = self._written.get(comp)
+        if written:
+            target, stamp = written
+            if value != target and now - stamp <= self.confirm_timeout:
+                return target
+            del self._written[comp]
+        return bool(value)
+
+    def components(self, group):
+        """分组内的部件句柄"""
+        self._sync()
+        return list(self._groups[group])
+
+    def all_deployed(self, group) -> bool:
+        """分组内部件是否全部展开 (分组为空时为 False)"""
+        self._sync()
+        items = self._groups[group]
+        if not items:
+            return False
+        now = self.clock()
+        return all(self._deployed(comp, now) for comp in items)
+
+    def set_deployed(self, group, value) -> int:
+        """把分组内状态不等于 value 的部件写为 value (已处于目标状态的不再写入)，返回写入数量"""
+        self._sync()
+        now = self.clock()
+        count = 0
+        for comp in self._groups[group]:
+            if self._deployed(comp, now) == value:
+                continue
+            try:
+                comp.deployed = value
+                self._written[comp] = (value, now)
+                count += 1
+            except Exception as e:
+                self._log.debug("write", "组件操作失败 (%s): %s", type(comp).__name__, e)
+        return count
+
+    def close(self):
+        """注销全部部件状态流"""
+        for comp in list(self._streams):
+            self._remove_stream(comp)
+        self._written.clear()
+        self._generation = None
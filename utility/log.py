@@ -1,12 +1,22 @@
 """
 全局日志处理系统 - 任务控制中心专用版
 功能：全静默控制台，仅输出持久化文件日志
+多进程模式下由独立的日志写入进程统一写文件：各进程只把日志记录放入队列，控制周期不承担磁盘写入延迟
 """
 
+import heapq
 import logging
+import multiprocessing as mp
 import os
+import pickle
+import queue
+import signal
+import sys
+import threading
+import time
 import tomllib
 from datetime import datetime
+from multiprocessing import util as mp_util
 
 # --- 默认配置 (当 config.toml 读取失败时使用) ---
 DEFAULT_LOG_DIR = r"x:\share\ksp\logs"
@@ -17,6 +27,9 @@ CONFIG_PATH = r"x:\share\ksp\config.toml"
 
 class MissionLogger:
     _initialized = False
+    log_file = None  # 本次启动的日志文件
+    queue = None  # 日志写入进程的记录队列 (启用后各进程经此队列写日志)
+    _writer = None
 
     @classmethod
     def _load_config(cls):
@@ -72,14 +85,300 @@ class MissionLogger:
             console_handler.setFormatter(logging.Formatter(log_format, date_format))
             logger.addHandler(console_handler)
 
+        cls.log_file = log_file
         cls._initialized = True
         logging.info(
             f"--- 航天控制系统启动 | 日志文件: {os.path.basename(log_file)} ---"
         )
 
+    @classmethod
+    def start_writer(cls):
+        """
+        主进程调用：启动日志写入进程接管本次的日志文件，本进程改为经队列写日志。
+        须在创建其他子进程之前调用，子进程在入口处以 attach(queue) 接入同一队列。
+        """
+        if cls.queue is not None:
+            return cls.queue
+        cls.setup_logger()
+        cfg = cls._load_config()
+        logger = logging.getLogger()
+        for handler in logger.handlers:
+            handler.close()
+
+        cls._writer = LogWriter(cls.log_file, cfg)
+        cls.queue = cls._writer.queue
+        cls._use_queue(cls.queue, logger.level)
+        return cls.queue
+
+    @classmethod
+    def attach(cls, log_queue):
+        """
+        子进程入口调用：接入日志写入进程的队列。
+        log_queue 为 None (未启动写入进程) 时退回本进程直接写文件。
+        """
+        if log_queue is None:
+            cls.setup_logger()
+            return
+        # fork 启动的子进程继承了父进程的处理器但没有其转发线程：总是重新安装
+        level = getattr(logging, cls._load_config().get("log_level", "INFO").upper(), logging.INFO)
+        cls.queue = log_queue
+        cls._use_queue(log_queue, level)
+
+    @classmethod
+    def _use_queue(cls, log_queue, level):
+        logger = logging.getLogger()
+        logger.handlers.clear()
+        logger.setLevel(level)
+        handler = _QueueHandler(log_queue)
+        logger.addHandler(handler)
+        # 进程退出时转发剩余记录 (multiprocessing 子进程退出时不执行 atexit，但会执行带优先级的终结器)
+        mp_util.Finalize(None, handler.close, exitpriority=10)
+        cls._initialized = True
+
+    @classmethod
+    def stop_writer(cls, timeout=2.0):
+        """主进程退出时调用：通知写入进程写完剩余记录后退出"""
+        if cls._writer is None:
+            return
+        logger = logging.getLogger()
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+        cls._writer.close(timeout)
+        cls._writer = None
+
+
+class _QueueHandler(logging.Handler):
+    """
+    调用方只把记录的字段元组放入进程内的 SimpleQueue (无序列化、无管道写入)；
+    转发线程每 FORWARD_INTERVAL 秒取出积压的记录，每 MAX_BATCH 条整批写入 LogChannel 并让出 CPU：
+    既不逐条序列化，也不会因一次序列化大批记录而长时间持有 GIL，阻塞调用方。
+    参数均为简单类型的记录原样转发，由写入进程合并消息；其余参数 (可能无法跨进程传递、之后可能被修改)
+    以及异常堆栈在调用时展开。
+    写入进程跟不上 (管道写满、转发线程阻塞) 时本地至多积压 MAX_PENDING 条，超出的记录丢弃并计数，
+    丢弃数量在恢复转发后以一条警告写入日志。
+    """
+
+    FORWARD_INTERVAL = 0.05
+    MAX_BATCH = 64
+    MAX_PENDING = 50000
+
+    def __init__(self, log_queue):
+        super().__init__()
+        self.queue = log_queue
+        self._local = queue.SimpleQueue()
+        self._dropped = 0  # 因积压超限丢弃的记录数 (emit 在处理器锁内调用)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._forward, name="Log.Forward", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        try:
+            args = record.args
+            if args and not (type(args) is tuple and all(type(a) in _PLAIN_TYPES for a in args)):
+                record.msg = record.getMessage()
+                args = None
+            if record.exc_info:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+                record.exc_info = None
+            # 字段与参数展平为一个只含简单值的元组：记录对象随即释放，积压的元组在下次年轻代回收时即被取消跟踪，
+            # 不会晋升到老年代使其回收变慢
+            if self._local.qsize() >= self.MAX_PENDING:
+                self._dropped += 1
+                return
+            self._local.put((*[getattr(record, field) for field in _RECORD_FIELDS], *(args or ())))
+        except Exception:
+            self.handleError(record)
+
+    def _forward(self):
+        while not self._stop.wait(self.FORWARD_INTERVAL):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        local = self._local
+        if self._dropped:
+            with self.lock:
+                dropped, self._dropped = self._dropped, 0
+            record = logging.LogRecord(
+                "Log", logging.WARNING, __file__, 0,
+                "日志写入跟不上，本地积压超过 %d 条，已丢弃 %d 条记录", (self.MAX_PENDING, dropped), None,
+            )
+            local.put((*[getattr(record, field) for field in _RECORD_FIELDS], *record.args))
+        while not local.empty():
+            batch = []
+            while len(batch) < self.MAX_BATCH and not local.empty():
+                batch.append(local.get_nowait())
+            self.queue.put(batch)
+            _yield()
+
+    def close(self):
+        """停止转发线程并转发剩余记录"""
+        if not self._stop.is_set():
+            self._stop.set()
+            if self._thread.is_alive():
+                self._thread.join(1.0)
+            else:
+                self._drain()
+        super().close()
+
+
+_EXC_FORMATTER = logging.Formatter()
+_yield = getattr(os, "sched_yield", lambda: time.sleep(0))
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+# 跨进程转发的记录字段 (写入进程据此重建 LogRecord；比序列化整个记录对象小且快)，其后依次为消息参数
+_RECORD_FIELDS = (
+    "name", "msg", "levelname", "levelno", "pathname", "filename", "module", "exc_text",
+    "stack_info", "lineno", "funcName", "created", "msecs", "relativeCreated", "thread", "threadName",
+    "processName", "process",
+)
+
+
+class LogChannel:
+    """
+    跨进程的日志批次通道：单向管道 + 写锁。
+    发送方在调用线程内序列化并写入管道 (multiprocessing.Queue 由馈送线程逐个连续序列化积压的对象，
+    积压较多时长时间持有 GIL)；管道写满时发送方在写入中阻塞，不持有 GIL。
+    """
+
+    def __init__(self):
+        self._reader, self._writer = mp.Pipe(duplex=False)
+        self._lock = mp.Lock()
+
+    def put(self, batch):
+        data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._writer.send_bytes(data)
+
+    def get(self, timeout=None):
+        """取出一批；timeout 秒内没有数据时抛出 queue.Empty"""
+        if not self._reader.poll(timeout):
+            raise queue.Empty
+        return pickle.loads(self._reader.recv_bytes())
+
+
+class LogWriter:
+    """
+    日志写入进程：从队列取出各进程转发的记录批次，按记录产生时刻排序后批量写入同一个日志文件。
+    记录在内存中停留 order_window 秒再写出，使不同进程经队列到达的先后差异在文件中被纠正；
+    每批只写入并刷新一次文件。
+    """
+
+    def __init__(self, log_file, cfg):
+        self.log_file = log_file
+        self.log_format = cfg.get("log_format", DEFAULT_FORMAT)
+        self.date_format = cfg.get("date_format", DEFAULT_DATE_FMT)
+        self.console_out = cfg.get("console_output", False)
+        self.flush_interval = cfg.get("flush_interval", 0.2)  # 批量写入周期 (s)
+        self.order_window = cfg.get("order_window", 0.5)  # 排序等待窗口 (s)
+        self.queue = LogChannel()
+
+        self._process = mp.Process(target=self._run_worker, daemon=True)
+        self._process.start()
+
+    def _run_worker(self):
+        # Ctrl+C 由主进程处理：写入进程继续运行，直到收到结束标记后写完剩余记录
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # 写日志是后台工作：降低优先级，CPU 紧张时让出给控制进程
+        # (不用 SCHED_IDLE：持续高负载下写入进程会完全得不到 CPU，管道写满后各进程的日志在本地无限积压)
+        if hasattr(os, "nice"):
+            os.nice(10)
+        formatter = logging.Formatter(self.log_format, self.date_format)
+        parent = mp.parent_process()
+        pending = []  # (产生时刻, 到达序号, 记录) 小根堆
+        arrivals = 0
+        running = True
+        next_flush = time.monotonic() + self.flush_interval
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            while running:
+                for batch in self._collect():
+                    if batch is None:
+                        running = False
+                        continue
+                    for values in batch:
+                        record = logging.makeLogRecord(dict(zip(_RECORD_FIELDS, values)))
+                        record.args = values[len(_RECORD_FIELDS):]
+                        arrivals += 1
+                        heapq.heappush(pending, (record.created, arrivals, record))
+                # 主进程异常退出 (未发送结束标记) 时同样写完剩余记录后退出
+                if parent is not None and not parent.is_alive():
+                    running = False
+                if running and time.monotonic() < next_flush:
+                    continue
+                next_flush = time.monotonic() + self.flush_interval
+                horizon = time.time() - self.order_window if running else float("inf")
+                lines = []
+                while pending and pending[0][0] <= horizon:
+                    lines.append(formatter.format(heapq.heappop(pending)[2]) + "\n")
+                if lines:
+                    text = "".join(lines)
+                    f.write(text)
+                    f.flush()
+                    if self.console_out:
+                        sys.stderr.write(text)
+                        sys.stderr.flush()
+
+    def _collect(self, limit=100):
+        """等待至多一个写入周期，取出队列中已积压的记录批次"""
+        try:
+            batch = [self.queue.get(self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get(0))
+            except queue.Empty:
+                break
+        return batch
+
+    def close(self, timeout=2.0):
+        self.queue.put(None)
+        self._process.join(timeout)
+
+
+class LogThrottle:
+    """
+    按键限频的日志 (控制周期等热路径使用)：同一键在 interval 秒内至多输出一条，
+    被抑制的条数附在下一条输出中。消息使用 % 参数延迟格式化，级别未启用或被限频时不做任何格式化。
+    """
+
+    __slots__ = ("logger", "interval", "_last", "_suppressed")
+
+    def __init__(self, logger, interval=1.0):
+        self.logger = logger
+        self.interval = interval
+        self._last = {}  # 键 -> 上次输出时刻
+        self._suppressed = {}  # 键 -> 上次输出后被抑制的条数
+
+    def log(self, level, key, msg, *args):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            msg += " (此前 %d 条已限频)"
+            args += (suppressed,)
+        self.logger.log(level, msg, *args, stacklevel=3)
+
+    def debug(self, key, msg, *args):
+        self.log(logging.DEBUG, key, msg, *args)
+
+    def info(self, key, msg, *args):
+        self.log(logging.INFO, key, msg, *args)
+
+    def warning(self, key, msg, *args):
+        self.log(logging.WARNING, key, msg, *args)
+
 
-# 自动初始化
-MissionLogger.setup_logger()
+# 自动初始化 (子进程不单独创建日志文件：由入口处的 MissionLogger.attach 接入写入进程或退回直接写文件)
+# spawn 启动的子进程导入本模块时 parent_process() 尚未设置，以进程名判断
+if mp.current_process().name == "MainProcess":
+    MissionLogger.setup_logger()
 
 
 def Rlogger(name):
@@ -0,0 +1,68 @@
+"""
+部件/模块索引模块
+"""
+
+import time
+from .log import Rlogger
+
+
+class PartIndex:
+    """
+    单舰部件句柄索引：按部件类别 (fairings / legs ...) 与 PartModule 名称缓存 kRPC 句柄。
+    句柄在部件存续期间始终有效，因此索引只在部件数量变化 (分级、解耦、抛整流罩) 时失效重建；
+    模块查找使用服务端过滤的 parts.modules_with_name，一次 RPC 取回全部同名模块，
+    不再逐部件读取 modules / name。
+    部件数量的检查本身需要一次 RPC，按 check_interval 限频。
+    """
+
+    CATEGORIES = ("fairings", "solar_panels", "antennas", "legs", "wheels")
+
+    def __init__(self, vessel, check_interval=1.0, clock=time.monotonic):
+        self.vessel = vessel
+        self.check_interval = check_interval
+        self.clock = clock  # 时间来源 (s)：离线仿真时为事件循环的虚拟时间
+        self.part_count = None
+        self.generation = 0  # 索引代数：每次重建加一 (依赖部件句柄的缓存据此判断是否失效，也用于诊断)
+        self._checked_at = None
+        self._categories = {}
+        self._modules = {}
+
+    def invalidate(self):
+        """丢弃全部缓存 (已知部件发生变化时由调用方触发，下次访问时重建)"""
+        self.part_count = None
+        self._checked_at = None
+        self._categories.clear()
+        self._modules.clear()
+
+    def refresh(self, force=False) -> bool:
+        """检查部件数量，变化时清空缓存；返回是否发生了失效"""
+        now = self.clock()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        count = len(self.vessel.parts.all)
+        if count == self.part_count:
+            return False
+        if self.part_count is not None:
+            Rlogger("PartIndex").debug("部件数量变化 %d -> %d，索引重建", self.part_count, count)
+        self._categories.clear()
+        self._modules.clear()
+        self.part_count = count
+        self.generation += 1
+        return True
+
+    def category(self, name):
+        """按类别取部件句柄 (如 "fairings"、"legs")，结果缓存至下一次失效"""
+        self.refresh()
+        items = self._categories.get(name)
+        if items is None:
+            items = self._categories[name] = list(getattr(self.vessel.parts, name))
+        return items
+
+    def modules(self, module_name):
+        """取全部名为 module_name 的 PartModule 句柄，结果缓存至下一次失效"""
+        self.refresh()
+        items = self._modules.get(module_name)
+        if items is None:
+            items = self._modules[module_name] = list(self.vessel.parts.modules_with_name(module_name))
+        return items
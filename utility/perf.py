@@ -0,0 +1,286 @@
+"""
+控制回路性能计数与采样分析模块
+"""
+
+import contextlib
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .log import Rlogger
+
+# 计时阶段 (RockerCore 控制周期的各阶段 + 内核任务)
+PERF_STAGES = (
+    "tick",          # 完整控制周期
+    "update_state",  # 刷新快照并更新飞行状态
+    "recovery",      # 回收任务逻辑
+    "default",       # 默认/入轨任务逻辑
+    "burn_table",    # 着陆点火查找表获取/构建
+    "land",          # 着陆架展开检查
+    "deploy",        # 载荷展开检查
+    "record",        # 飞行数据记录
+    "jettison",      # 整流罩监测 (每次检查)
+    "adopt",         # 接管新飞行器 (创建 RockerCore)
+    "discovery",     # 飞行器发现扫描
+    "telemetry",     # 遥测帧汇总写入
+)
+STAGE_INDEX = {name: i for i, name in enumerate(PERF_STAGES)}
+
+# 耗时直方图：第 b 桶上界为 2^b 微秒 (第 0 桶 ≤ 1 µs，末桶约 8.4 s 以上)
+HIST_BUCKETS = 24
+HIST_BOUNDS = tuple(2.0 ** b * 1e-6 for b in range(HIST_BUCKETS))
+
+# 上下文为空的计时阶段：计数关闭时使用，开销只有一次 with 语句
+NO_STAGE = contextlib.nullcontext()
+
+_S = len(PERF_STAGES)
+PERF_DTYPE = np.dtype([
+    ("seq", "i8"),                          # 行序号锁 (写入期间为负)
+    ("timestamp", "f8"),                    # 发布时刻 (time.time())
+    ("pid", "i8"),
+    ("vessels", "i4"),                      # 受控飞行器数
+    ("load", "f4"),                         # 调度器负载
+    ("profiling", "u1"),                    # 采样分析进行中
+    ("count", "i8", (_S,)),                 # 以下均为进程启动以来的累计值
+    ("total", "f8", (_S,)),                 # 累计耗时 (s)
+    ("rpc", "i8", (_S,)),                   # 阻塞 kRPC 调用次数
+    ("rpc_wait", "f8", (_S,)),              # 等待 RPC 通道的时间 (s)
+    ("hist", "i8", (_S, HIST_BUCKETS)),
+    ("ai_count", "i8"),                     # AI 请求→响应往返
+    ("ai_total", "f8"),
+    ("ai_hist", "i8", (HIST_BUCKETS,)),
+])
+
+# 头部: [采样分析截止时刻 (time.time())，行数]
+_HEADER = np.dtype((np.float64, 2))
+
+
+_perf_counter = time.perf_counter
+_frexp = math.frexp
+
+
+def _bucket(seconds):
+    """耗时 -> 直方图桶号 (按 2 的幂分桶，frexp 取指数即可，无需对数运算)"""
+    if seconds <= 1e-6:
+        return 0
+    return min(_frexp(seconds * 1e6)[1], HIST_BUCKETS - 1)
+
+
+def percentile(hist, q):
+    """由直方图估计分位数 (s)：返回累计计数首次达到 q 的桶的上界"""
+    total = hist.sum()
+    if total <= 0:
+        return 0.0
+    index = int(np.searchsorted(np.cumsum(hist), q * total))
+    return HIST_BOUNDS[min(index, HIST_BUCKETS - 1)]
+
+
+class _Stage:
+    """
+    单个飞行器的单个阶段计时器 (可重复进入)。
+    进入/退出时读取 owner 的 rpc_calls / rpc_wait，差值计入该阶段的 RPC 开销。
+    """
+
+    __slots__ = ("counters", "index", "owner", "start", "calls", "wait")
+
+    def __init__(self, counters, index, owner):
+        self.counters = counters
+        self.index = index
+        self.owner = owner
+
+    def __enter__(self):
+        owner = self.owner
+        self.calls = owner.rpc_calls
+        self.wait = owner.rpc_wait
+        self.start = _perf_counter()
+
+    def __exit__(self, *exc):
+        # 每个控制周期执行多次：直接累加计数列表，不经 record() 的参数解析
+        elapsed = _perf_counter() - self.start
+        counters, i, owner = self.counters, self.index, self.owner
+        counters.count[i] += 1
+        counters.total[i] += elapsed
+        counters.rpc[i] += owner.rpc_calls - self.calls
+        counters.rpc_wait[i] += owner.rpc_wait - self.wait
+        counters.hist[i][_bucket(elapsed)] += 1
+
+
+class PerfCounters:
+    """
+    进程内的定长性能计数器：各阶段的次数 / 累计耗时 / RPC 次数与等待时间 / 耗时直方图，以及 AI 往返时间。
+    只由事件循环线程写入 (单写者)，不加锁；计数只增不减，读取方按两次发布的差值计算窗口统计。
+    """
+
+    def __init__(self):
+        self.count = [0] * _S
+        self.total = [0.0] * _S
+        self.rpc = [0] * _S
+        self.rpc_wait = [0.0] * _S
+        self.hist = [[0] * HIST_BUCKETS for _ in range(_S)]
+        self.ai_count = 0
+        self.ai_total = 0.0
+        self.ai_hist = [0] * HIST_BUCKETS
+
+    def record(self, stage, seconds, rpc=0, rpc_wait=0.0):
+        """记录一次阶段耗时，stage 为阶段名或 STAGE_INDEX 中的序号"""
+        i = stage if isinstance(stage, int) else STAGE_INDEX[stage]
+        self.count[i] += 1
+        self.total[i] += seconds
+        self.rpc[i] += rpc
+        self.rpc_wait[i] += rpc_wait
+        self.hist[i][_bucket(seconds)] += 1
+
+    def record_ai(self, seconds):
+        """记录一次 AI 请求→响应往返时间"""
+        self.ai_count += 1
+        self.ai_total += seconds
+        self.ai_hist[_bucket(seconds)] += 1
+
+    def stages(self, owner):
+        """为一个 RockerCore 创建全部阶段的计时器 {阶段名: 计时器}"""
+        return {name: _Stage(self, i, owner) for i, name in enumerate(PERF_STAGES)}
+
+    def fill(self, row):
+        """把累计值写入一行 PERF_DTYPE 记录"""
+        row["count"] = self.count
+        row["total"] = self.total
+        row["rpc"] = self.rpc
+        row["rpc_wait"] = self.rpc_wait
+        row["hist"] = self.hist
+        row["ai_count"] = self.ai_count
+        row["ai_total"] = self.ai_total
+        row["ai_hist"] = self.ai_hist
+
+
+class PerfBoard:
+    """
+    基于 multiprocessing.shared_memory 的性能看板：每个内核进程 (单进程内核或各分片) 占一行，
+    由各自进程定期发布累计计数，仪表盘读取全部行汇总。每行带序号锁 (seqlock)，规则同 TelemetryRing。
+    头部保存采样分析的截止时刻：任意进程写入后，各内核进程在下次发布时开始有限时长的采样分析。
+    """
+
+    def __init__(self, name=None, rows=1, create=False):
+        size = _HEADER.itemsize + PERF_DTYPE.itemsize * rows
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+
+        self.name = self._shm.name
+        self.rows = rows
+        self._owner = create
+        self._header = np.ndarray((2,), dtype=np.float64, buffer=self._shm.buf)
+        self._rows = np.ndarray((rows,), dtype=PERF_DTYPE, buffer=self._shm.buf, offset=_HEADER.itemsize)
+        if create:
+            self._header[:] = (0.0, rows)
+            self._rows["seq"] = 0
+
+    @classmethod
+    def create(cls, rows=1):
+        """创建并拥有一块新的共享内存 (rows 为内核进程数)"""
+        return cls(rows=rows, create=True)
+
+    def __reduce__(self):
+        return (self.__class__, (self.name, self.rows, False))
+
+    @property
+    def profile_until(self) -> float:
+        return float(self._header[0])
+
+    def request_profile(self, seconds):
+        """请求全部内核进程从现在起采样分析 seconds 秒"""
+        self._header[0] = time.time() + seconds
+
+    def publish(self, slot, counters=None, vessels=0, load=0.0, profiling=False):
+        """发布一个内核进程的当前计数 (counters 为 None 时只更新状态字段)"""
+        row = self._rows[slot]
+        seq = abs(int(row["seq"])) + 1
+        row["seq"] = -seq
+        row["timestamp"] = time.time()
+        row["pid"] = os.getpid()
+        row["vessels"] = vessels
+        row["load"] = load
+        row["profiling"] = profiling
+        if counters is not None:
+            counters.fill(row)
+        row["seq"] = seq
+
+    def read(self, retries=3):
+        """读取全部已发布的行 (副本)，撕裂的行重试，仍失败则跳过"""
+        rows = []
+        for slot in range(self.rows):
+            for _ in range(retries):
+                seq = int(self._rows[slot]["seq"])
+                if seq <= 0:
+                    break
+                row = self._rows[slot].copy()
+                if int(self._rows[slot]["seq"]) == seq:
+                    rows.append(row)
+                    break
+        return np.array(rows, dtype=PERF_DTYPE)
+
+    def close(self):
+        """解除映射；拥有者同时释放共享内存"""
+        self._header = None
+        self._rows = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SamplingProfiler:
+    """
+    有限时长的采样分析器：后台线程按 interval 采样目标线程 (默认为事件循环所在的主线程) 的调用栈，
+    结束后以 folded 格式 (每行 "帧;帧;帧 次数"，可直接生成火焰图) 写入 path。
+    采样期间目标线程无需任何插桩，未采样时没有开销。
+    """
+
+    def __init__(self, path, seconds, interval=0.005, thread_id=None):
+        self.path = path
+        self.seconds = seconds
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.samples = Counter()
+        self._thread = threading.Thread(target=self._run, name="Perf.Profiler", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        end = time.monotonic() + self.seconds
+        while time.monotonic() < end:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+        self._write()
+
+    def _write(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            Rlogger("Perf").info(f"采样分析完成: {sum(self.samples.values())} 个样本 -> {self.path}")
+        except Exception as e:
+            Rlogger("Perf").error(f"采样分析结果写入失败: {e}")
@@ -0,0 +1,108 @@
+"""
+遥测记录格式模块：全系统统一的定长列式遥测表示
+"""
+
+from enum import IntEnum
+from functools import lru_cache
+import numpy as np
+
+
+class MissionMode(IntEnum):
+    """任务模式 (与 RockerCore.mission_mode 字符串一一对应)"""
+    DEFAULT = 0
+    RECOVERY = 1
+    ORBIT = 2
+    DEBRIS = 3
+
+
+class FlightState(IntEnum):
+    """飞行状态 (与 RockerCore.state 字符串一一对应)"""
+    IDLE = 0
+    ASCENT = 1
+    DESCENT = 2
+    SPACE = 3
+    LANDED = 4
+    SPLASHED = 5
+
+
+# 单艘飞行器的遥测记录，字段与 Kernel._stream_telemetry 的输出一致
+TELEMETRY_DTYPE = np.dtype([
+    ("vid", "S24"),     # 飞行器 ID (UTF-8)
+    ("name", "S32"),    # 飞行器名称 (UTF-8，超长截断)
+    ("mode", "u1"),     # MissionMode
+    ("state", "u1"),    # FlightState
+    ("alt", "f8"),      # 海拔高度 (m)
+    ("spd", "f8"),      # 速度 (m/s)
+    ("v_spd", "f8"),    # 垂直速度 (m/s)
+    ("g", "f4"),        # 过载 (G)
+    ("age", "f4"),      # 样本年龄 (s)
+    ("seq", "i8"),      # 样本序号
+    ("rate", "f4"),     # 控制频率 (Hz，调度器分配)
+    ("period", "f4"),   # 控制周期 (s)
+    ("jitter", "f4"),   # 周期抖动 (s，指数滑动平均)
+    ("overruns", "i4"), # 延迟超过一个周期的次数
+])
+
+
+# 字符串 -> 枚举值 查找表 (未知值归为 DEFAULT / IDLE)
+_MODES = {m.name: int(m) for m in MissionMode}
+_STATES = {s.name: int(s) for s in FlightState}
+
+
+@lru_cache(maxsize=1024)
+def _text(value, width):
+    """截断到定长字节宽度，避免截断在多字节字符中间"""
+    raw = str(value).encode("utf-8")
+    if len(raw) <= width:
+        return raw
+    return raw[:width].decode("utf-8", "ignore").encode("utf-8")
+
+
+def set_record(records, index, vid, name, mode, state, alt, spd, v_spd, g, age, seq,
+               rate=0.0, period=0.0, jitter=0.0, overruns=0):
+    """就地填充记录数组中的第 index 条记录 (整行一次赋值)；调度指标未知时为 0"""
+    records[index] = (
+        _text(vid, 24),
+        _text(name, 32),
+        _MODES.get(mode, 0),
+        _STATES.get(state, 0),
+        alt, spd, v_spd, g, age, seq,
+        rate, period, jitter, overruns,
+    )
+
+
+def from_dicts(telemetry) -> np.ndarray:
+    """旧版 {vessel_id: {...}} 字典结构 -> 记录数组"""
+    records = np.zeros(len(telemetry), dtype=TELEMETRY_DTYPE)
+    for index, (vid, data) in enumerate(telemetry.items()):
+        set_record(
+            records, index, vid, data["name"], data["mode"], data["state"],
+            data["alt"], data["spd"], data["v_spd"], data["g"],
+            data.get("age", 0.0), data.get("seq", 0),
+            data.get("rate", 0.0), data.get("period", 0.0), data.get("jitter", 0.0), data.get("overruns", 0),
+        )
+    return records
+
+
+def to_dicts(records) -> dict:
+    """记录数组 -> 旧版 {vessel_id: {...}} 字典结构 (供 Dashboard 等使用)"""
+    # tolist() 一次性转为 Python 原生类型，避免逐字段访问 numpy 标量
+    return {
+        vid.decode("utf-8"): {
+            "name": name.decode("utf-8"),
+            "mode": MissionMode(mode).name,
+            "state": FlightState(state).name,
+            "alt": alt,
+            "spd": spd,
+            "v_spd": v_spd,
+            "g": g,
+            "seq": seq,
+            "age": age,
+            "rate": rate,
+            "period": period,
+            "jitter": jitter,
+            "overruns": overruns,
+        }
+        for vid, name, mode, state, alt, spd, v_spd, g, age, seq, rate, period, jitter, overruns
+        in records.tolist()
+    }
@@ -0,0 +1,119 @@
+"""
+共享内存遥测环形缓冲区模块
+"""
+
+from multiprocessing import shared_memory
+import time
+import numpy as np
+from .log import Rlogger
+from .telemetry_record import TELEMETRY_DTYPE
+
+# 头部: [最新已提交帧序号, 槽位数, 单帧最大飞行器数, 保留]
+_HEADER = np.dtype((np.int64, 4))
+
+
+def _frame_dtype(max_vessels):
+    """单帧 (槽位) 格式：槽位序号 + 飞行器数量 + 时间戳 + 定长记录数组"""
+    return np.dtype([
+        ("seq", "i8"),
+        ("count", "i8"),
+        ("timestamp", "f8"),
+        ("vessels", TELEMETRY_DTYPE, (max_vessels,)),
+    ])
+
+
+class TelemetryRing:
+    """
+    基于 multiprocessing.shared_memory 的定长遥测环形缓冲区。
+    单写多读：Kernel 写入，Dashboard 等任意进程按自己的节奏读取最新帧。
+    每个槽位带序号锁 (seqlock)：写入期间槽位序号为负，读取前后序号不一致即视为撕裂帧并重试。
+    取代原先每帧 pickle 整个字典并推入无界 Queue 的方式。
+    """
+
+    def __init__(self, name=None, max_vessels=64, capacity=8, create=False):
+        frame = _frame_dtype(max_vessels)
+        size = _HEADER.itemsize + frame.itemsize * capacity
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            # 附着方不参与资源追踪，避免子进程退出时误删共享内存
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+
+        self.name = self._shm.name
+        self.max_vessels = max_vessels
+        self.capacity = capacity
+        self._owner = create
+        self._header = np.ndarray((4,), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray(
+            (capacity,), dtype=frame, buffer=self._shm.buf, offset=_HEADER.itemsize
+        )
+        if create:
+            self._header[:] = (0, capacity, max_vessels, 0)
+            self._frames["seq"] = 0
+        self._overflow_warned = False
+
+    @classmethod
+    def create(cls, max_vessels=64, capacity=8):
+        """创建并拥有一块新的共享内存"""
+        return cls(max_vessels=max_vessels, capacity=capacity, create=True)
+
+    def __reduce__(self):
+        # 跨进程传递时只传名称与格式，接收方以附着方式重新映射
+        return (self.__class__, (self.name, self.max_vessels, self.capacity, False))
+
+    @property
+    def seq(self) -> int:
+        """最新已提交帧的序号 (0 表示尚无数据)"""
+        return int(self._header[0])
+
+    def write(self, records):
+        """写入一帧遥测 (TELEMETRY_DTYPE 记录数组)，返回该帧序号"""
+        seq = self.seq + 1
+        slot = self._frames[seq % self.capacity]
+
+        if len(records) > self.max_vessels:
+            if not self._overflow_warned:
+                Rlogger("TelemetryRing").warning(
+                    f"飞行器数量 {len(records)} 超过缓冲区容量 {self.max_vessels}，超出部分将被截断"
+                )
+                self._overflow_warned = True
+            records = records[: self.max_vessels]
+
+        slot["seq"] = -seq  # 标记写入中
+        slot["count"] = len(records)
+        slot["timestamp"] = time.time()
+        slot["vessels"][: len(records)] = records  # 整块内存拷贝
+        slot["seq"] = seq  # 提交
+        self._header[0] = seq
+        return seq
+
+    def read(self, seq=None, retries=3):
+        """
+        读取指定序号 (默认最新) 的一帧，返回 (序号, 记录数组副本)。
+        帧已被覆盖或持续撕裂时返回 (序号, None)。
+        """
+        for _ in range(retries):
+            target = self.seq if seq is None else seq
+            if target <= 0:
+                return 0, None
+            slot = self._frames[target % self.capacity]
+            if slot["seq"] != target:
+                if seq is not None:
+                    return target, None  # 已被新帧覆盖
+                continue
+            rows = slot["vessels"][: slot["count"]].copy()
+            if slot["seq"] == target:
+                return target, rows
+        return target, None
+
+    def close(self):
+        """解除映射；拥有者同时释放共享内存"""
+        self._header = None
+        self._frames = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
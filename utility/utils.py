@@ -3,8 +3,12 @@
 """
 
 import asyncio
-from .log import Rlogger
+import time
+from .log import Rlogger, LogThrottle
 from .config import config
+from .part_index import PartIndex
+from .deployables import DeployableState
+from .perf import NO_STAGE
 
 
 class Utils:
@@ -12,139 +16,159 @@ class Utils:
     火箭辅助系统控制器：采用动态属性监测与防御性编程架构
     """
 
-    def __init__(self, vessel):
+    def __init__(self, vessel, conn=None, log=None):
         self.vessel = vessel
+        # 时间来源 (s)：RockerCore 运行时换为事件循环时钟，离线仿真时即为虚拟时间
+        self.clock = time.monotonic
+        self.part_index = PartIndex(vessel, clock=self.now)
+        self._jettisoned = set()  # 已确认抛离的整流罩 (抛离不可逆，无需再查询)
+        # 可展开部件状态：提供 conn 时经由流订阅，状态查询不产生 RPC
+        self.deployables = DeployableState(self.part_index, conn, clock=self.now)
+        # 控制周期内反复出现的日志按键限频 (log 为输出到的 logger，默认 "Utils")
+        self.log_throttle = LogThrottle(log or Rlogger("Utils"), config.get("logging", {}).get("debug_interval", 1.0))
+
+    def now(self):
+        """当前时刻 (s)，取自 self.clock (可在任意线程调用)"""
+        return self.clock()
+
+    def _flight(self):
+        """飞行数据来源 (子类可覆盖为流缓存快照)"""
+        return self.vessel.flight()
 
     @property
     def isFActive(self) -> bool:
         """
         判断整流罩是否“活跃”（即存在且尚未抛离）。
+        没有整流罩的飞行器视为不活跃，否则 jettison 会无限等待。
         """
-        if self.vessel.parts.fairings and any(
-            f.jettisoned for f in self.vessel.parts.fairings
-        ):
-            # Rlogger("FA").info("存在未抛离的整流罩")
-            return False
-        # Rlogger("FA").info("所有整流罩均抛离")
-        return True
+        for f in self.part_index.category("fairings"):
+            if f in self._jettisoned:
+                continue
+            if not f.jettisoned:
+                return True
+            self._jettisoned.add(f)
+        return False
 
     @property
     def isDeployed(self) -> bool:
         """纯状态检查：判断载荷（太阳能板/天线）是否已展开"""
-        solar = [p for p in self.vessel.parts.solar_panels if p.deployable]
-        antennas = [a for a in self.vessel.parts.antennas if a.deployable]
-        controllable_payloads = solar + antennas
-        if not controllable_payloads:
-            return False
-
-        # 检查是否全部已展开
-        return all(part.deployed for part in controllable_payloads)
+        return self.deployables.all_deployed("payload")
 
     @property
     def isLanded(self) -> bool:
         """纯状态检查：判断着陆装置是否已展开"""
-        legs = self.vessel.parts.legs
-        wheels = self.vessel.parts.wheels
-        if not legs and not wheels:
-            return False
-        # 确保所有部件均已展开
-        return all(l.deployed for l in legs) and all(w.deployed for w in wheels)
+        return self.deployables.all_deployed("landing")
+
+    async def _call(self, func, *args):
+        """
+        执行一段阻塞的 kRPC 访问 (默认直接在当前线程执行)。
+        子类可覆盖为交给专属 RPC 线程执行，避免阻塞其他飞行器共享的事件循环。
+        """
+        return func(*args)
+
+    def _stage(self, name):
+        """性能计时阶段 (默认不计时，子类可覆盖)"""
+        return NO_STAGE
+
+    # 属性查询的方法形式，便于作为 _call() 的参数
+    def _fairing_active(self) -> bool:
+        return self.isFActive
+
+    def _payload_deployed(self) -> bool:
+        return self.isDeployed
+
+    def _gear_deployed(self) -> bool:
+        return self.isLanded
 
     async def jettison(self):
         """
         异步监测系统：采用“检测-确认-反馈”闭环逻辑
         """
         # 如果 isFActive 为 False (即已抛离或不存在)，则无需操作
-        if not self.isFActive:
-            return
+        with self._stage("jettison"):
+            if not await self._call(self._fairing_active):
+                return
 
         Rlogger("Utils").info("整流罩智能监测系统已上线...")
         # 当 isFActive 为 True (即存在且未抛离) 时循环监测
-        while self.isFActive:
-
-            flight = self.vessel.flight()
-            # 抛离条件：海拔 > 40,000m 且动压 < 100 Pa
-            if flight.dynamic_pressure < 100 and flight.mean_altitude > 40000:
+        while True:
+            with self._stage("jettison"):
+                if not await self._call(self._fairing_active):
+                    break
+                flight = self._flight()
+                # 抛离条件：海拔 > 40,000m 且动压 < 100 Pa
                 triggered = False
-                # 1. 地毯式扫描：触发所有 ModuleProceduralFairing 模块中的所有事件
-                for part in self.vessel.parts.all:
-                    for module in part.modules:
-                        if module.name == "ModuleProceduralFairing":
-                            events = module.events
-                            if events:
-                                for event in events:
-                                    try:
-                                        module.trigger_event(event)
-                                        Rlogger("Utils").info(
-                                            f"动态触发事件: {event} (部件: {part.title})"
-                                        )
-                                        triggered = True
-                                    except Exception as e:
-                                        Rlogger("Utils").debug(
-                                            f"触发事件 {event} 失败: {e}"
-                                        )
-
-                # 2. 原版降级兜底
-                if not triggered and self.vessel.parts.fairings:
-                    for f in self.vessel.parts.fairings:
-                        try:
-                            f.jettison()
-                            triggered = True
-                        except:
-                            continue
-
-                if triggered:
-                    Rlogger("Utils").info("整流罩抛离指令已发送，正在等待物理反馈...")
-                    # 等待物理分离
-                    await asyncio.sleep(1)
+                if flight.dynamic_pressure < 100 and flight.mean_altitude > 40000:
+                    triggered = await self._call(self._trigger_fairings)
+
+            if triggered:
+                Rlogger("Utils").info("整流罩抛离指令已发送，正在等待物理反馈...")
+                # 等待物理分离
+                await asyncio.sleep(1)
+                with self._stage("jettison"):
+                    # 抛离会产生碎片、改变部件数量：立即检查而不等待限频
+                    await self._call(self.part_index.refresh, True)
                     # 通过用户定义的 isFActive 确认是否真正抛离
-                    if not self.isFActive:
-                        Rlogger("Utils").info("整流罩抛离成功确认。")
-                        break
+                    jettisoned = not await self._call(self._fairing_active)
+                if jettisoned:
+                    Rlogger("Utils").info("整流罩抛离成功确认。")
+                    break
             await asyncio.sleep(0.5)
 
+    def _trigger_fairings(self) -> bool:
+        """发送整流罩抛离指令 (阻塞)，返回是否有指令发送成功"""
+        triggered = False
+        # 1. 索引扫描：触发所有 ModuleProceduralFairing 模块中的所有事件
+        for module in self.part_index.modules("ModuleProceduralFairing"):
+            for event in module.events:
+                try:
+                    module.trigger_event(event)
+                    Rlogger("Utils").info("动态触发事件: %s (部件: %s)", event, module.part.title)
+                    triggered = True
+                except Exception as e:
+                    Rlogger("Utils").debug("触发事件 %s 失败: %s", event, e)
+
+        # 2. 原版降级兜底
+        if not triggered:
+            for f in self.part_index.category("fairings"):
+                if f in self._jettisoned:
+                    continue
+                try:
+                    f.jettison()
+                    triggered = True
+                except:
+                    continue
+        return triggered
+
     def deploySwap(self):
         """
         一键部署动作：执行状态翻转并返回执行后的状态。
         """
         if self.isFActive:
-            Rlogger("Utils").warning("整流罩尚未抛离，拒绝展开载荷！")
+            self.log_throttle.warning("deploy_refused", "整流罩尚未抛离，拒绝展开载荷！")
             return
 
-        deploy_filter = lambda c: hasattr(c, "deployable") and c.deployable
-        deploy_action = lambda c: setattr(
-            c, "deployed", not getattr(c, "deployed", False)
-        )
-
-        s_count = self._batch_operate(
-            self.vessel.parts.solar_panels, deploy_action, deploy_filter
-        )
-        a_count = self._batch_operate(
-            self.vessel.parts.antennas, deploy_action, deploy_filter
-        )
+        # 整组翻转：全部展开时收回，否则展开；只写入状态不一致的部件
+        target = not self.isDeployed
+        count = self.deployables.set_deployed("payload", target)
+        if not count:
+            return
 
-        status = self.isDeployed
         Rlogger("Utils").info(
-            f"载荷系统状态已翻转，当前状态: {'展开' if status else '收回'} (太阳能板:{s_count}, 天线:{a_count})"
+            f"载荷系统状态已翻转，当前状态: {'展开' if target else '收回'} (写入部件: {count})"
         )
 
     def landSwap(self):
         """
         着陆动作：执行状态翻转并返回执行后的状态。
         """
-        toggle_op = lambda c: setattr(c, "deployed", not getattr(c, "deployed", False))
-        check_op = lambda c: hasattr(c, "deployed")
-
-        self._batch_operate(
-            self.vessel.parts.legs, action=toggle_op, filter_func=check_op
-        )
-        self._batch_operate(
-            self.vessel.parts.wheels, action=toggle_op, filter_func=check_op
-        )
+        target = not self.isLanded
+        count = self.deployables.set_deployed("landing", target)
+        if not count:
+            return
 
-        status = self.isLanded
         Rlogger("Utils").info(
-            f"着陆装置状态已翻转，当前状态: {'收回' if status else '展开'}"
+            f"着陆装置状态已翻转，当前状态: {'展开' if target else '收回'} (写入部件: {count})"
         )
 
     def _group_action(self, action_name: str) -> bool:
@@ -187,7 +211,7 @@ class Utils:
                 success_count += 1
             except Exception as e:
                 # 记录详细异常，方便竞赛调试
-                Rlogger("Utils").debug(f"组件操作失败 ({type(comp).__name__}): {e}")
+                Rlogger("Utils").debug("组件操作失败 (%s): %s", type(comp).__name__, e)
                 continue
 
         return success_count